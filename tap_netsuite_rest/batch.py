@@ -0,0 +1,146 @@
+"""Singer BATCH output: records written to rotating gzip JSONL or Parquet files."""
+
+import copy
+import gzip
+import logging
+import os
+import uuid
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+from singer.messages import BatchMessage, Message, RecordMessage, StateMessage
+
+from tap_netsuite_rest import json_utils
+from tap_netsuite_rest.writer import serialize_message
+
+
+logger = logging.getLogger(__name__)
+
+
+class BatchFile:
+    """One open gzip JSONL file holding RECORD messages of a single stream."""
+
+    def __init__(self, stream_name: str, directory: str) -> None:
+        self.stream_name = stream_name
+        self.path = os.path.abspath(
+            os.path.join(directory, f"{stream_name}-{uuid.uuid4().hex}.jsonl.gz")
+        )
+        self.rows = 0
+        self.bytes = 0
+        self._file = gzip.open(self.path, "wt", encoding="utf-8", compresslevel=6)
+
+    def write(self, line: str) -> None:
+        self._file.write(line)
+        self._file.write("\n")
+        self.rows += 1
+        self.bytes += len(line) + 1
+
+    def close(self) -> List[BatchMessage]:
+        self._file.close()
+        return [
+            BatchMessage(
+                stream=self.stream_name,
+                filepath=self.path,
+                file_format="jsonl",
+                compression="gzip",
+                batch_size=self.rows,
+            )
+        ]
+
+
+class BatchManager:
+    """Divert RECORD messages of selected streams to batch files.
+
+    Streams in parquet_streams get their records written as Parquet through a
+    ParquetStreamWriter, partitioned by parquet_partition_keys[stream]; the other
+    streams get gzip JSONL files of RECORD messages.
+
+    A BATCH message is emitted when a file is rotated or its stream finishes.
+    STATE messages are held while any batch file is open and the latest one is
+    emitted right after the last open file is closed, so a bookmark never gets
+    ahead of records a target can read.
+    """
+
+    def __init__(
+        self,
+        streams: Iterable[str],
+        directory: str,
+        emit: Callable[[Message], None],
+        max_rows: int = 1000000,
+        max_bytes: int = 256 * 1024 * 1024,
+        parquet_streams: Iterable[str] = (),
+        parquet_dir: str = "parquet",
+        parquet_partition_keys: Optional[Dict[str, Optional[str]]] = None,
+        parquet_row_group_size: int = 100000,
+        parquet_max_open_files: int = 64,
+    ) -> None:
+        self.parquet_streams = set(parquet_streams)
+        self.streams = set(streams) | self.parquet_streams
+        self.directory = directory
+        self.parquet_dir = parquet_dir
+        self.parquet_partition_keys = parquet_partition_keys or {}
+        self.parquet_row_group_size = parquet_row_group_size
+        self.parquet_max_open_files = parquet_max_open_files
+        self._schemas: Dict[str, dict] = {}
+        self.emit = emit
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self._files: Dict[str, BatchFile] = {}
+        self._held_state: Optional[StateMessage] = None
+        if self.streams - self.parquet_streams:
+            os.makedirs(directory, exist_ok=True)
+
+    def register_schema(self, stream_name: str, schema: dict) -> None:
+        self._schemas[stream_name] = schema
+
+    def _open(self, stream_name: str):
+        if stream_name in self.parquet_streams:
+            # deferred so runs without Parquet output don't pay for importing pyarrow
+            from tap_netsuite_rest.parquet import ParquetStreamWriter
+
+            return ParquetStreamWriter(
+                stream_name,
+                self._schemas[stream_name],
+                self.parquet_dir,
+                self.parquet_partition_keys.get(stream_name),
+                self.parquet_row_group_size,
+                self.parquet_max_open_files,
+            )
+        return BatchFile(stream_name, self.directory)
+
+    def write_record(self, stream_name: str, message: Union[Message, str]) -> None:
+        batch = self._files.get(stream_name)
+        if batch is None:
+            batch = self._files[stream_name] = self._open(stream_name)
+        if stream_name in self.parquet_streams:
+            if isinstance(message, RecordMessage):
+                batch.write(message.record)
+            else:
+                batch.write(json_utils.loads(message)["record"])
+        else:
+            batch.write(message if isinstance(message, str) else serialize_message(message))
+        if batch.rows >= self.max_rows or batch.bytes >= self.max_bytes:
+            self.close_stream(stream_name)
+
+    def write_state(self, message: StateMessage) -> None:
+        if self._files:
+            self._held_state = StateMessage(value=copy.deepcopy(message.value))
+        else:
+            self.emit(message)
+
+    def close_stream(self, stream_name: str) -> None:
+        batch = self._files.pop(stream_name, None)
+        if batch is None:
+            return
+        for batch_message in batch.close():
+            logger.info(
+                f"[{stream_name}] Closed batch file {batch_message.filepath} "
+                f"with {batch_message.batch_size} records"
+            )
+            self.emit(batch_message)
+        if not self._files and self._held_state is not None:
+            self.emit(self._held_state)
+            self._held_state = None
+
+    def close(self) -> None:
+        for stream_name in list(self._files):
+            self.close_stream(stream_name)
@@ -0,0 +1,18 @@
+"""Local cache directory shared by the tap's persistent stores."""
+
+import os
+
+
+DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "tap-netsuite-rest")
+
+
+def account_id(config: dict) -> str:
+    return config["ns_account"].replace("-", "_").upper()
+
+
+def cache_dir(config: dict, *parts: str) -> str:
+    """Return (and create) a directory under cache_dir, scoped to the NetSuite account."""
+    root = os.path.expanduser(config.get("cache_dir") or DEFAULT_CACHE_DIR)
+    path = os.path.join(root, account_id(config), *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
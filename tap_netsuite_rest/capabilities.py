@@ -0,0 +1,92 @@
+"""Per-account capability profile persisted between runs."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Optional
+
+from tap_netsuite_rest.cache import account_id, cache_dir
+
+
+logger = logging.getLogger(__name__)
+
+
+class CapabilityProfile:
+    """Facts about an account learned from failing requests, reused by later runs.
+
+    Sections hold table access ("tables"), fields SuiteQL rejects per stream
+    ("invalid_fields"), entities_fallback rewrites per stream ("entity_fallbacks"),
+    usable custom segments ("custom_segments") and optional features ("features").
+
+    The profile is discarded when it is older than ttl seconds, was written by
+    another profile version, or was learned with other credentials or another tap
+    version. With ttl=0 nothing is read or written and every run starts empty.
+    """
+
+    VERSION = 1
+
+    def __init__(self, config: dict, tap_version: str, ttl: int = 0) -> None:
+        self.config = config
+        self.ttl = ttl
+        self.fingerprint = hashlib.sha256(
+            f"{account_id(config)}|{config.get('ns_token_key')}|{tap_version}".encode()
+        ).hexdigest()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._data = self._load() if ttl else self._empty()
+
+    @property
+    def path(self) -> str:
+        return os.path.join(cache_dir(self.config), "capabilities.json")
+
+    def _empty(self) -> dict:
+        return {"version": self.VERSION, "fingerprint": self.fingerprint, "created_at": time.time()}
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self._empty()
+        if data.get("version") != self.VERSION or data.get("fingerprint") != self.fingerprint:
+            logger.info("Capability profile was built for another tap version or credentials, rebuilding it")
+            return self._empty()
+        if time.time() - data.get("created_at", 0) >= self.ttl:
+            logger.info("Capability profile expired, rebuilding it")
+            return self._empty()
+        logger.info(f"Using capability profile from {self.path}")
+        return data
+
+    def get(self, section: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._data.get(section, {}).get(key, default)
+
+    def set(self, section: str, key: str, value: Any) -> None:
+        with self._lock:
+            entries = self._data.setdefault(section, {})
+            if entries.get(key) != value:
+                entries[key] = value
+                self._dirty = True
+
+    def add(self, section: str, key: str, item: Any) -> None:
+        """Append an item to the list stored under key, once."""
+        with self._lock:
+            items = self._data.setdefault(section, {}).setdefault(key, [])
+            if item not in items:
+                items.append(item)
+                self._dirty = True
+
+    def save(self) -> Optional[str]:
+        if not self.ttl or not self._dirty:
+            return None
+        with self._lock:
+            path = self.path
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._data, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, path)
+            self._dirty = False
+        return path
@@ -0,0 +1,153 @@
+"""Persistent record hashes used to emit only new or changed records."""
+
+import hashlib
+import json
+import logging
+import sqlite3
+from typing import Any, Iterable, List
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def record_hash(record: dict) -> bytes:
+    """Return a 16 byte digest of a record, independent of key order."""
+    if orjson is not None:
+        try:
+            payload = orjson.dumps(record, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            payload = json.dumps(record, sort_keys=True, default=str).encode()
+    else:
+        payload = json.dumps(record, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def record_key(record: dict, primary_keys: List[str]) -> str:
+    return json.dumps([record.get(key) for key in primary_keys], default=str)
+
+
+class RecordHashStore:
+    """SQLite file holding one hash per (stream, primary key).
+
+    Every sync of a stream is a run; keys seen during the run are stamped with
+    its id, so keys left with an older id once a full run completes were deleted.
+    Hashes of new or changed records are staged and only replace the stored ones
+    in complete_run, once the stream's output was flushed: a run that dies before
+    that emits the same records again rather than suppressing them forever.
+    """
+
+    COMMIT_EVERY = 10000
+    # VACUUM once this share of the file is free pages
+    COMPACT_RATIO = 0.25
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS record_hashes ("
+            "stream TEXT NOT NULL, key TEXT NOT NULL, hash BLOB NOT NULL, run_id INTEGER NOT NULL, "
+            "PRIMARY KEY (stream, key)) WITHOUT ROWID"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS staged_hashes ("
+            "stream TEXT NOT NULL, key TEXT NOT NULL, hash BLOB NOT NULL, "
+            "PRIMARY KEY (stream, key)) WITHOUT ROWID"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS runs (stream TEXT PRIMARY KEY, run_id INTEGER NOT NULL)"
+        )
+        self._db.commit()
+        self._pending = 0
+
+    def start_run(self, stream: str) -> int:
+        row = self._db.execute("SELECT run_id FROM runs WHERE stream = ?", (stream,)).fetchone()
+        run_id = (row[0] if row else 0) + 1
+        self._db.execute(
+            "INSERT INTO runs (stream, run_id) VALUES (?, ?) "
+            "ON CONFLICT(stream) DO UPDATE SET run_id = excluded.run_id",
+            (stream, run_id),
+        )
+        # left behind by a run that didn't complete
+        self._db.execute("DELETE FROM staged_hashes WHERE stream = ?", (stream,))
+        self._db.commit()
+        return run_id
+
+    def changed(self, stream: str, key: str, record: dict, run_id: int) -> bool:
+        """Return True if a record is new or changed, staging its hash until complete_run."""
+        digest = record_hash(record)
+        row = self._db.execute(
+            "SELECT hash FROM staged_hashes WHERE stream = ? AND key = ?", (stream, key)
+        ).fetchone() or self._db.execute(
+            "SELECT hash FROM record_hashes WHERE stream = ? AND key = ?", (stream, key)
+        ).fetchone()
+        if row is not None and row[0] == digest:
+            # only marks the key as seen, a stale stamp never hides a change
+            self._db.execute(
+                "UPDATE record_hashes SET run_id = ? WHERE stream = ? AND key = ?",
+                (run_id, stream, key),
+            )
+            is_changed = False
+        else:
+            self._db.execute(
+                "INSERT INTO staged_hashes (stream, key, hash) VALUES (?, ?, ?) "
+                "ON CONFLICT(stream, key) DO UPDATE SET hash = excluded.hash",
+                (stream, key, digest),
+            )
+            is_changed = True
+        self._pending += 1
+        if self._pending >= self.COMMIT_EVERY:
+            self.commit()
+        return is_changed
+
+    def deleted(self, stream: str, run_id: int) -> Iterable[List[Any]]:
+        """Yield the primary key values not seen during a completed run."""
+        rows = self._db.execute(
+            "SELECT key FROM record_hashes WHERE stream = ? AND run_id < ? "
+            "AND key NOT IN (SELECT key FROM staged_hashes WHERE stream = ?)",
+            (stream, run_id, stream),
+        ).fetchall()
+        for (key,) in rows:
+            yield json.loads(key)
+
+    def complete_run(self, stream: str, run_id: int, forget_deleted: bool = False) -> None:
+        """Store the staged hashes of a run whose records were delivered.
+
+        With forget_deleted, keys the run didn't see are dropped as well, once
+        they were reported as deleted.
+        """
+        self._db.execute(
+            "INSERT INTO record_hashes (stream, key, hash, run_id) "
+            "SELECT stream, key, hash, ? FROM staged_hashes WHERE stream = ? "
+            "ON CONFLICT(stream, key) DO UPDATE SET hash = excluded.hash, run_id = excluded.run_id",
+            (run_id, stream),
+        )
+        self._db.execute("DELETE FROM staged_hashes WHERE stream = ?", (stream,))
+        if forget_deleted:
+            self._db.execute(
+                "DELETE FROM record_hashes WHERE stream = ? AND run_id < ?", (stream, run_id)
+            )
+        self.commit()
+
+    def commit(self) -> None:
+        self._db.commit()
+        self._pending = 0
+
+    def compact(self) -> None:
+        """VACUUM the file when enough pages are free."""
+        self.commit()
+        page_count = self._db.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = self._db.execute("PRAGMA freelist_count").fetchone()[0]
+        if page_count and free_pages / page_count >= self.COMPACT_RATIO:
+            logger.info(f"Compacting record hash store {self.path} ({free_pages}/{page_count} free pages)")
+            self._db.execute("VACUUM")
+
+    def close(self) -> None:
+        self.compact()
+        self._db.close()
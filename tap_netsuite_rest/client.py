@@ -5,22 +5,28 @@ import backoff
 import requests
 import pendulum
 import copy
+import multiprocessing
+import os
 import re
+import sys
 
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta, date
-from typing import Any, Callable, Dict, Optional, cast, Iterable, List
+from typing import Any, Callable, Dict, Optional, Tuple, cast, Iterable, List
 
 from memoization import cached
 from oauthlib import oauth1
 from requests_oauthlib import OAuth1Session
 from hotglue_singer_sdk.exceptions import FatalAPIError, RetriableAPIError
+from hotglue_singer_sdk.helpers._util import utc_now
 from hotglue_singer_sdk.helpers.jsonpath import extract_jsonpath
+from hotglue_singer_sdk.mapper import SameRecordTransform
 from hotglue_singer_sdk.streams import RESTStream, Stream
 from hotglue_singer_sdk import typing as th
 from pendulum import parse
 from requests.exceptions import HTTPError
-import json
 from http.client import RemoteDisconnected
 from dateutil.relativedelta import relativedelta
 import pytz
@@ -31,9 +37,23 @@ from hotglue_singer_sdk.helpers._state import (
 )
 from hotglue_singer_sdk.exceptions import InvalidStreamSortException
 import singer
-from singer import StateMessage
+from singer import RecordMessage, StateMessage
 from hotglue_etl_exceptions import InvalidCredentialsError
 
+from tap_netsuite_rest import dedup, json_utils, transform
+from tap_netsuite_rest.cache import cache_dir
+from tap_netsuite_rest.change_store import record_key
+from tap_netsuite_rest.json_utils import response_json, response_summary
+from tap_netsuite_rest.snapshot import SnapshotWriter, read_snapshot
+from tap_netsuite_rest.type_inference import infer_types
+from tap_netsuite_rest.transform import (
+    RecordPlan,
+    TransformSpec,
+    compile_record_plan,
+    init_worker,
+    transform_page,
+)
+
 
 SCHEMAS_DIR = Path(__file__).parent / Path("./schemas")
 logging.getLogger("backoff").setLevel(logging.CRITICAL)
@@ -47,8 +67,130 @@ SUITEQL_EXCLUDED_FIELDS = frozenset(
     {"links", "refname", "classtranslation", "currencyname"}
 )
 
+# client errors that mean a table is missing or the role can't read it
+NO_ACCESS_RE = re.compile(r"was not found|permission", re.IGNORECASE)
+
+
+class SingerOutputMixin:
+    """Route Singer messages through the tap's output (batch files, buffered writer)."""
+
+    def _write_message(self, message) -> None:
+        write_message = getattr(self._tap, "write_message", None)
+        if write_message is not None:
+            write_message(message, stream_name=self.name)
+        elif isinstance(message, str):
+            sys.stdout.write(message + "\n")
+        else:
+            singer.write_message(message)
+
+    def _close_batches(self) -> None:
+        """Close the batch files of this stream and its children, emitting BATCH messages."""
+        batches = getattr(self._tap, "batches", None)
+        if batches is None:
+            return
+        batches.close_stream(self.name)
+        for child_stream in self.child_streams:
+            child_stream._close_batches()
+
+    def _write_record_message(self, record: dict) -> None:
+        snapshot = getattr(self, "_snapshot", None)
+        for record_message in self._generate_record_messages(record):
+            if snapshot is not None:
+                snapshot.write(record_message.record)
+            if self._suppresses_unchanged() and not self._record_changed(record_message.record):
+                continue
+            self._write_message(record_message)
+
+    def _write_schema_message(self) -> None:
+        for schema_message in self._generate_schema_messages():
+            if self._reports_deleted_records():
+                schema_message.schema = copy.deepcopy(schema_message.schema)
+                schema_message.schema["properties"]["_sdc_deleted_at"] = {
+                    "type": ["string", "null"],
+                    "format": "date-time",
+                }
+            self._write_message(schema_message)
+
+    def _suppresses_unchanged(self) -> bool:
+        """Return True if only new or changed records of this stream are emitted."""
+        return bool(self.primary_keys) and self.name in (
+            self.config.get("suppress_unchanged_streams") or []
+        )
+
+    def _reports_deleted_records(self) -> bool:
+        # deletes can only be told apart from unchanged rows on full-table syncs
+        return (
+            self._suppresses_unchanged()
+            and not self.replication_key
+            and bool(self.config.get("report_deleted_records"))
+        )
+
+    def _record_changed(self, record: dict) -> bool:
+        store = self._tap.change_store
+        if getattr(self, "_change_run_id", None) is None:
+            self._change_run_id = store.start_run(self.name)
+        return store.changed(
+            self.name, record_key(record, self.primary_keys), record, self._change_run_id
+        )
+
+    def _report_deleted(self) -> None:
+        """Report keys missing from a completed full-table run as deleted records."""
+        run_id = getattr(self, "_change_run_id", None)
+        if run_id is None or not self._reports_deleted_records():
+            # nothing was synced, don't mistake a missing table or permission for deletes
+            return
+        deleted_at = utc_now().isoformat()
+        deleted_count = 0
+        for values in self._tap.change_store.deleted(self.name, run_id):
+            record = dict(zip(self.primary_keys, values))
+            record["_sdc_deleted_at"] = deleted_at
+            self._write_message(
+                RecordMessage(
+                    stream=self.stream_maps[0].stream_alias,
+                    record=record,
+                    version=None,
+                    time_extracted=utc_now(),
+                )
+            )
+            deleted_count += 1
+        self.logger.info(f"[{self.name}] Reported {deleted_count} deleted records")
+
+    def _finish_change_tracking(self) -> None:
+        """Store the run's record hashes once its records and final STATE were written out."""
+        run_id = getattr(self, "_change_run_id", None)
+        if run_id is None:
+            return
+        self._tap.flush_output()
+        self._tap.change_store.complete_run(
+            self.name, run_id, forget_deleted=self._reports_deleted_records()
+        )
+        self._change_run_id = None
+
+    def _finish_fingerprint(self) -> None:
+        """Store the fingerprint the completed sync started from, and its snapshot."""
+        fingerprint = getattr(self, "_fingerprint", None)
+        if fingerprint is None:
+            return
+        snapshot = getattr(self, "_snapshot", None)
+        if snapshot is not None:
+            snapshot.commit()
+            self._snapshot = None
+        self.stream_state["fingerprint"] = fingerprint
+        self._fingerprint = None
+        self._write_state_message()
+
+    def _after_sync(self, context: Optional[dict]) -> None:
+        self._log_dedup_store()
+        if context is None:
+            if self._suppresses_unchanged():
+                self._report_deleted()
+            self._finish_fingerprint()
+            self._close_batches()
+            if self._suppresses_unchanged():
+                self._finish_change_tracking()
 
-class NetSuiteStream(RESTStream):
+
+class NetSuiteStream(SingerOutputMixin, RESTStream):
     """NetSuite stream class."""
 
     @property
@@ -69,6 +211,11 @@ class NetSuiteStream(RESTStream):
     custom_filter = None
     replication_key_prefix = None
     select_prefix = None
+    _whole_pages = False
+    # column used to partition Parquet exports (see parquet_streams)
+    parquet_partition_key = None
+    # column holding the transaction id of each row (see parent_incremental_streams)
+    parent_transaction_column = None
     order_by = None
     append_select = None
     time_jump = relativedelta(months=1)
@@ -96,8 +243,12 @@ class NetSuiteStream(RESTStream):
             path: URL path for this entity stream.
         """
         super().__init__(name=name, schema=schema, tap=tap, path=path)
-        self.record_ids = set()
-        self.invalid_fields = []
+        self.record_ids = dedup.make_store(self.config)
+        profile = self._tap.capability_profile
+        self.invalid_fields = list(profile.get("invalid_fields", self.name, []))
+        for entity in getattr(self, "entities_fallback", None) or []:
+            if entity["name"] in profile.get("entity_fallbacks", self.name, []):
+                self._apply_entity_fallback(entity)
 
     @property
     def http_headers(self) -> dict:
@@ -149,7 +300,12 @@ class NetSuiteStream(RESTStream):
         factor=2,
     )
     def probe_table_access(self, table: str) -> bool:
-        """Return True if a minimal SuiteQL query against table succeeds."""
+        """Return whether a minimal SuiteQL query against table succeeds.
+
+        Only definitive answers are returned: a 200, or a 4xx saying the record
+        isn't found or can't be accessed. Anything else raises, transient errors
+        after the backoff, so the caller doesn't remember it.
+        """
         session = self.get_session()
         prepared_req = session.prepare_request(
             requests.Request(
@@ -159,13 +315,45 @@ class NetSuiteStream(RESTStream):
                 json={"q": f"SELECT * FROM {table}"},
             )
         )
-        try:
-            response = session.send(prepared_req, timeout=self.timeout)
-            self.validate_response(response)
-            return response.status_code == 200
-        except Exception as e:
-            self.logger.error(f"Error probing table {table}: {e}")
+        response = session.send(prepared_req, timeout=self.timeout)
+        if response.status_code == 200:
+            return True
+        if 500 <= response.status_code < 600 or response.status_code == 429:
+            raise RetriableAPIError(f"Probing table {table} failed with {response.status_code}: {response.text}")
+        # no validate_response: it would rewrite the stream's query on a 400
+        if 400 <= response.status_code < 500 and NO_ACCESS_RE.search(response.text):
+            self.logger.info(f"No access to table {table}: {response.text}")
             return False
+        raise FatalAPIError(f"Probing table {table} failed with {response.status_code}: {response.text}")
+
+    def probe_tables_access(self, tables: List[str]) -> bool:
+        """Return True if one SuiteQL query reading every table with SELECT * succeeds.
+
+        Each table is read like probe_table_access does, in a derived table of at
+        most one row, so the cross product stays a single row. A failure only
+        means at least one of the tables isn't accessible; it isn't retried here,
+        the caller bisects the group and single tables are retried.
+        """
+        derived = ", ".join(
+            f"(SELECT * FROM {table} WHERE ROWNUM <= 1) p{i}" for i, table in enumerate(tables)
+        )
+        columns = ", ".join(f"p{i}.*" for i in range(len(tables)))
+        session = self.get_session()
+        prepared_req = session.prepare_request(
+            requests.Request(
+                method="POST",
+                url=f"{self.url_base}?limit=1",
+                headers=self.http_headers,
+                json={"q": f"SELECT {columns} FROM {derived}"},
+            )
+        )
+        response = session.send(prepared_req, timeout=self.timeout)
+        if 500 <= response.status_code < 600 or response.status_code == 429:
+            raise RetriableAPIError(f"Group probe failed with {response.status_code}: {response.text}")
+        # no validate_response: a failing group is expected and is narrowed down by the caller
+        if response.status_code != 200:
+            self.logger.debug(f"Group probe of {len(tables)} tables failed: {response.text}")
+        return response.status_code == 200
 
     def prepare_request(
         self, context: Optional[dict], next_page_token: Optional[Any]
@@ -199,11 +387,12 @@ class NetSuiteStream(RESTStream):
         self, response: requests.Response, previous_token: Optional[Any]
     ) -> Optional[Any]:
         """Return a token for identifying next page or None if no more pages."""
-        has_next = next(extract_jsonpath("$.hasMore", response.json()))
-        offset = next(extract_jsonpath("$.offset", response.json()))
+        summary = response_summary(response)
+        has_next = next(extract_jsonpath("$.hasMore", summary))
+        offset = next(extract_jsonpath("$.offset", summary))
         offset += self.page_size
 
-        totalResults = next(extract_jsonpath("$.totalResults", response.json()))
+        totalResults = next(extract_jsonpath("$.totalResults", summary))
         self.logger.info(f"[{self.name}] Total results = {totalResults}. Offset = {offset}")
 
         if not self.stream_state.get("replication_key") and self.name == "inventory_item_locations" and totalResults > self.cap_total_results:
@@ -217,7 +406,7 @@ class NetSuiteStream(RESTStream):
             ):
                 if self.replication_key:
                     json_path = f"$.items[-1].{self.replication_key}"
-                    last_dt = next(extract_jsonpath(json_path, response.json()))
+                    last_dt = next(extract_jsonpath(json_path, summary))
                     try:
                         self.query_date = pendulum.parse(last_dt).subtract(seconds=1)
                     except Exception:
@@ -342,7 +531,7 @@ class NetSuiteStream(RESTStream):
         if not has_next and offset < totalResults:
             if self.replication_key:
                 json_path = f"$.items[-1].{self.replication_key}"
-                last_dt = next(extract_jsonpath(json_path, response.json()))
+                last_dt = next(extract_jsonpath(json_path, summary))
                 try:
                     self.query_date = pendulum.parse(last_dt)
                 except Exception:
@@ -470,10 +659,11 @@ class NetSuiteStream(RESTStream):
             )
         return False
 
-    def _probe_suiteql_field_is_invalid(
+    def _probe_suiteql_field(
         self, field_name: str, where: Optional[str] = None
-    ) -> Optional[bool]:
-        """Return True if the field is invalid, False if valid, None if inconclusive."""
+    ) -> Optional[str]:
+        """Return "valid", "invalid" when NetSuite names the field in a 400, "suspect"
+        when the query fails with a 500 UNEXPECTED_ERROR, or None if inconclusive."""
         response = self._suiteql_probe_response(
             [self._field_name_to_select_expr(field_name)],
             where=where,
@@ -481,13 +671,13 @@ class NetSuiteStream(RESTStream):
         if response is None:
             return None
         if response.status_code == 200:
-            return False
+            return "valid"
         if response.status_code == 400:
             invalid_names = self._extract_invalid_suiteql_fields_from_400(response)
             if field_name.lower() in invalid_names:
-                return True
+                return "invalid"
         if response.status_code == 500 and "UNEXPECTED_ERROR" in response.text:
-            return True
+            return "suspect"
         self.logger.debug(
             "SuiteQL field probe inconclusive for %s on stream %s: status=%s; response: %s",
             field_name,
@@ -510,7 +700,7 @@ class NetSuiteStream(RESTStream):
         ]
 
     def _identify_and_skip_invalid_suiteql_field(self) -> bool:
-        """Probe selected fields individually and skip every one that breaks SuiteQL."""
+        """Probe selected fields and skip every one that breaks SuiteQL."""
         prefix = self.select_prefix or self.table
 
         # sanity check to make sure the stream is accessible
@@ -530,23 +720,41 @@ class NetSuiteStream(RESTStream):
             return False
 
         any_skipped = False
-        for field_name in field_names:
-            field_invalid = self._probe_suiteql_field_is_invalid(
+        for field_name, verdict in self._find_invalid_suiteql_fields(field_names, probe_where).items():
+            self.invalid_fields.append(field_name)
+            if verdict == "invalid":
+                # a 500 can be transient, only fields NetSuite names are remembered
+                self._tap.capability_profile.add("invalid_fields", self.name, field_name)
+            self.logger.info(
+                "Field %s causes SuiteQL errors on stream %s, skipping it from the query",
                 field_name,
-                where=probe_where,
+                self.name,
             )
-            if field_invalid is None:
-                continue
-            if field_invalid:
-                self.invalid_fields.append(field_name)
-                self.logger.info(
-                    "Field %s causes SuiteQL errors on stream %s, skipping it from the query",
-                    field_name,
-                    self.name,
-                )
-                any_skipped = True
+            any_skipped = True
         return any_skipped
 
+    def _find_invalid_suiteql_fields(
+        self, field_names: List[str], where: Optional[str] = None
+    ) -> Dict[str, str]:
+        """Return the fields that break SuiteQL with their _probe_suiteql_field verdict.
+
+        A group that queries fine is cleared with one request and failing groups
+        are split, so k bad fields out of n take about k * log2(n) probes. Single
+        fields are checked with _probe_suiteql_field, which leaves inconclusive
+        fields in the query.
+        """
+        if len(field_names) == 1:
+            field_name = field_names[0]
+            verdict = self._probe_suiteql_field(field_name, where=where)
+            return {field_name: verdict} if verdict in ("invalid", "suspect") else {}
+        select_exprs = [self._field_name_to_select_expr(f) for f in field_names]
+        if self._probe_suiteql_select(select_exprs, where=where):
+            return {}
+        middle = len(field_names) // 2
+        invalid = self._find_invalid_suiteql_fields(field_names[:middle], where)
+        invalid.update(self._find_invalid_suiteql_fields(field_names[middle:], where))
+        return invalid
+
     def _extract_invalid_suiteql_fields_from_400(
         self, response: requests.Response
     ) -> List[str]:
@@ -555,7 +763,7 @@ class NetSuiteStream(RESTStream):
             "Search error occurred: Field" in response.text
             or "Invalid search query" in response.text
         ):
-            error_details = response.json()["o:errorDetails"][0]["detail"]
+            error_details = response_json(response)["o:errorDetails"][0]["detail"]
             field_names = [
                 match.group(1).lower()
                 for match in re.finditer(r"(?i)field '(\w+)'", error_details)
@@ -587,6 +795,7 @@ class NetSuiteStream(RESTStream):
         for field_name in field_names:
             if field_name not in self.invalid_fields:
                 self.invalid_fields.append(field_name)
+                self._tap.capability_profile.add("invalid_fields", self.name, field_name)
                 newly_skipped.append(field_name)
                 self.logger.info(
                     "Field %s is not valid for SuiteQL on stream %s, skipping it from the query",
@@ -682,6 +891,16 @@ class NetSuiteStream(RESTStream):
         self.logger.info(f"Making query ({payload['q']})")
         return payload
 
+    def _apply_entity_fallback(self, entity: dict) -> None:
+        """Rewrite the query without an entity the role can't read."""
+        if "select_replace" in entity:
+            replacement = entity.get("select_replace_with", "")
+            self.select = self.select.replace(entity['select_replace'], replacement)
+        if "join_replace" in entity:  
+            self.join = self.join.replace(entity['join_replace'], "")
+        if entity['name'] == "accountingbook":
+            self.gl_use_only_primary_accounting_book = lambda: False
+
     def validate_response(self, response: requests.Response) -> None: # noqa: C901
         """Validate HTTP response."""
         if response.status_code == 400:
@@ -689,13 +908,8 @@ class NetSuiteStream(RESTStream):
                 for entity in self.entities_fallback:
                     if "Record \'{}\' was not found.".lower().format(entity['name']) in response.text.lower():
                         self.logger.info(f"Missing {entity['name']} permission. Retrying with updated query...")
-                        if "select_replace" in entity:
-                            replacement = entity.get("select_replace_with", "")
-                            self.select = self.select.replace(entity['select_replace'], replacement)
-                        if "join_replace" in entity:  
-                            self.join = self.join.replace(entity['join_replace'], "")
-                        if entity['name'] == "accountingbook":
-                            self.gl_use_only_primary_accounting_book = lambda: False
+                        self._apply_entity_fallback(entity)
+                        self._tap.capability_profile.add("entity_fallbacks", self.name, entity["name"])
                         raise RetryRequest(response.text)
 
             # looks for invalid fields in the response to skip them and retry the request
@@ -774,32 +988,40 @@ class NetSuiteStream(RESTStream):
         prepared_request = self.prepare_request(
             context, next_page_token=next_page_token
         )
+        # streamed responses are only read as records are consumed
+        self.requests_session.stream = self.stream_json_pages and not self._whole_pages
         resp = self._request(prepared_request, context)
+        if self.requests_session.stream:
+            # the body is read outside the request retry, a page cut short is requested again
+            resp._refetch = lambda: self.request_decorator(self.make_request)(context, next_page_token)
         return resp
 
-    def request_records(self, context: Optional[dict]) -> Iterable[dict]:
-        # override the request_records method to handle updated query
+    @property
+    def stream_json_pages(self) -> bool:
+        return bool(self.config.get("stream_json_pages")) and json_utils.can_stream_items()
+
+    def parse_response(self, response: requests.Response) -> Iterable[dict]:
+        """Parse the response and return an iterator of result rows."""
+        if self.records_jsonpath == "$.items[*]":
+            yield from json_utils.iter_response_items(response, refetch=getattr(response, "_refetch", None))
+            return
+        yield from extract_jsonpath(self.records_jsonpath, input=response_json(response))
+
+    def _request_pages(self, context: Optional[dict]) -> Iterable[requests.Response]:
+        """Yield every response page for the context, following pagination."""
+        if getattr(self, "_parent_window", None) and self._parent_window[0]:
+            yield from self._request_changed_transaction_pages(context)
+            return
+        yield from self._request_query_pages(context)
+
+    def _request_query_pages(self, context: Optional[dict]) -> Iterable[requests.Response]:
         next_page_token: Any = None
         finished = False
         decorated_request = self.request_decorator(self.make_request)
 
         while not finished:
             resp = decorated_request(context, next_page_token)
-
-            # store primary keys to avoid duplicated records if primary keys is available
-            for row in self.parse_response(resp):
-                # need to use final_row otherwise the pk may be missing
-                final_row = self.post_process(row, context)
-                if self.primary_keys:
-                    if len(self.primary_keys) == 1:
-                        pk = final_row[self.primary_keys[0]]
-                    else:
-                        pk = "-".join([str(final_row[key]) for key in self.primary_keys])
-                    if pk not in self.record_ids:
-                        self.record_ids.add(pk)
-                        yield row
-                else:
-                    yield row
+            yield resp
             previous_token = copy.deepcopy(next_page_token)
             next_page_token = self.get_next_page_token(
                 response=resp, previous_token=previous_token
@@ -812,6 +1034,373 @@ class NetSuiteStream(RESTStream):
             # Cycle until get_next_page_token() no longer returns a value
             finished = next_page_token is None
 
+    def request_records(self, context: Optional[dict]) -> Iterable[dict]:
+        # override the request_records method to handle updated query
+        for resp in self._request_pages(context):
+            # store primary keys to avoid duplicated records if primary keys is available
+            for row in self.parse_response(resp):
+                # need to use final_row otherwise the pk may be missing
+                final_row = self.post_process(row, context)
+                if final_row is None:
+                    continue
+                if self.primary_keys:
+                    pk = transform.record_primary_key(final_row, self.primary_keys)
+                    bookmark = final_row.get(self.replication_key) if self.replication_key else None
+                    if not self.record_ids.seen(pk, bookmark):
+                        yield row
+                else:
+                    yield row
+
+    def _transform_pool_steps(self) -> Optional[Tuple[str, ...]]:
+        """Return the post_process steps a pool worker must replay, or None if unsupported."""
+        post_process = type(self).post_process
+        if post_process is TransactionRootStream.post_process:
+            return (TransformSpec.TYPES, TransformSpec.ADDRESSES)
+        if post_process is NetsuiteDynamicStream.post_process:
+            return (TransformSpec.TYPES,)
+        if post_process is Stream.post_process:
+            return ()
+        return None
+
+    def _serialized_sync_unsupported_reason(self, context: Optional[dict]) -> Optional[str]:
+        """Return why the stream can't skip the per-record SDK path, if it can't."""
+        if not self.selected:
+            return "stream is not selected"
+        if context is not None or self.partitions:
+            return "stream is partitioned"
+        if self.has_selected_descendents:
+            return "stream has selected child streams"
+        if type(self).request_records is not NetSuiteStream.request_records:
+            return "stream overrides request_records"
+        if type(self).parse_response is not NetSuiteStream.parse_response:
+            return "stream overrides parse_response"
+        if self.records_jsonpath != "$.items[*]":
+            return "stream uses a custom records_jsonpath"
+        if self._transform_pool_steps() is None:
+            return "stream overrides post_process"
+        if self._suppresses_unchanged():
+            return "unchanged records are suppressed"
+        if getattr(self, "_snapshot", None) is not None:
+            return "records are written to a snapshot"
+        if len(self.stream_maps) != 1 or not isinstance(self.stream_maps[0], SameRecordTransform):
+            return "stream maps are configured"
+        return None
+
+    def _use_transform_pool(self, context: Optional[dict]) -> bool:
+        """Return True when the stream is opted into the process-pool transform stage."""
+        if self.name not in (self.config.get("transform_pool_streams") or []):
+            return False
+        reason = self._serialized_sync_unsupported_reason(context)
+        if reason:
+            self.logger.warning(
+                f"[{self.name}] transform pool disabled: {reason}. Using the regular sync."
+            )
+            return False
+        return True
+
+    def _record_plan(self) -> Optional[RecordPlan]:
+        steps = self._transform_pool_steps()
+        if steps is None:
+            return None
+        return compile_record_plan(self.schema, self.mask, steps)
+
+    def _use_passthrough(self, context: Optional[dict]) -> bool:
+        """Return True when rows can be written without per-field conversion."""
+        if not self.config.get("raw_passthrough", True):
+            return False
+        if self._serialized_sync_unsupported_reason(context):
+            return False
+        return self._record_plan() is not None
+
+    def _transform_spec(self) -> TransformSpec:
+        return TransformSpec(
+            stream_name=self.name,
+            stream_alias=self.stream_maps[0].stream_alias,
+            schema=self.schema,
+            mask=self.mask,
+            steps=self._transform_pool_steps(),
+            primary_keys=self.primary_keys,
+            replication_key=self.replication_key,
+            plan=self._record_plan(),
+        )
+
+    def _transform_pool_records(self, context: Optional[dict]) -> Iterable[Tuple[Any, Any, str]]:
+        """Yield (pk, bookmark, RECORD line) for every row, converted in worker processes.
+
+        Raw page bytes are shipped to the pool while the next page is fetched; results
+        are consumed strictly in request order.
+        """
+        spec = self._transform_spec()
+        workers = self.config.get("transform_pool_workers") or os.cpu_count() or 1
+        pending = deque()
+        self.logger.info(f"[{self.name}] Converting records in a pool of {workers} processes")
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            # pickled once per worker instead of with every page
+            initargs=(json_utils.backend(), spec),
+        ) as executor:
+            for response in self._request_pages(context):
+                pending.append(executor.submit(transform_page, response.content))
+                while pending and (len(pending) > workers * 2 or pending[0].done()):
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def _passthrough_records(self, context: Optional[dict]) -> Iterable[Tuple[Any, Any, str]]:
+        """Yield (pk, bookmark, RECORD line) for every row using the compiled record plan."""
+        spec = self._transform_spec()
+        self.logger.info(f"[{self.name}] Schema needs no conversion, passing rows through")
+        for response in self._request_pages(context):
+            yield from spec.serialize_page(response_json(response).get("items") or [])
+
+    def _sync_serialized_records(
+        self, records: Iterable[Tuple[Any, Any, str]], context: Optional[dict]
+    ) -> None:
+        """Sync records whose RECORD messages were already serialized."""
+        record_count = 0
+        state = self.get_context_state(context)
+        self._write_starting_replication_value(context)
+
+        for pk, bookmark, line in records:
+            if pk is not None and self.record_ids.seen(pk, bookmark):
+                continue
+            self._check_max_record_limit(record_count)
+            if record_count % self.STATE_MSG_FREQUENCY == 0 and record_count:
+                self._write_state_message()
+            self._write_message(line)
+            if self.replication_key and bookmark is not None:
+                self._increment_stream_state(
+                    {self.replication_key: bookmark}, context=context
+                )
+            record_count += 1
+
+        finalize_state_progress_markers(state)
+        self._write_record_count_log(record_count=record_count, context=context)
+        self._write_state_message()
+
+    def _serialized_records(self, context: Optional[dict]) -> Optional[Iterable[Tuple[Any, Any, str]]]:
+        """Return pre-serialized records when a fast path applies, otherwise None."""
+        # the fast paths decode whole pages, so they are downloaded under the request retry
+        self._whole_pages = True
+        if self._use_transform_pool(context):
+            return self._transform_pool_records(context)
+        if self._use_passthrough(context):
+            return self._passthrough_records(context)
+        self._whole_pages = False
+        return None
+
+    def _log_dedup_store(self) -> None:
+        if not self.primary_keys or not len(self.record_ids):
+            return
+        size_mb = self.record_ids.memory_bytes() / (1024 * 1024)
+        self.logger.info(
+            f"[{self.name}] dedup store {self.record_ids.name} holds "
+            f"{len(self.record_ids)} keys using ~{size_mb:.1f} MB of memory"
+        )
+
+    def _sync_records(self, context: Optional[dict] = None) -> None:
+        if self._skip_unchanged_table(context):
+            return
+        self._start_parent_incremental(context)
+        records = self._serialized_records(context)
+        if records is not None:
+            self._sync_serialized_records(records, context)
+        else:
+            super()._sync_records(context)
+        self._after_sync(context)
+
+    def _suiteql_first_row(self, q: str) -> Optional[Dict[str, Any]]:
+        """Run SuiteQL and return the first row, or None on failure / empty."""
+        session = self.get_session()
+        prepared_req = session.prepare_request(
+            requests.Request(
+                method="POST",
+                url=f"{self.url_base}?limit=1",
+                headers=self.http_headers,
+                json={"q": q},
+            )
+        )
+        prepared_req.headers.update({"Content-Type": "application/json"})
+        response = session.send(prepared_req, timeout=self.timeout)
+        if response.status_code != 200:
+            self.logger.debug(
+                "SuiteQL probe returned %s: %s",
+                response.status_code,
+                (response.text or "")[:500],
+            )
+            return None
+        items = response_json(response).get("items") or []
+        if not items:
+            return None
+        return {k.lower(): v for k, v in items[0].items()}
+
+    def _suiteql_rows(self, q: str, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Run a helper SuiteQL query and return its first `limit` rows, retrying server errors."""
+        def send():
+            session = self.get_session()
+            prepared_req = session.prepare_request(
+                requests.Request(
+                    method="POST",
+                    url=f"{self.url_base}?limit={limit}",
+                    headers=self.http_headers,
+                    json={"q": q},
+                )
+            )
+            response = session.send(prepared_req, timeout=self.timeout)
+            if 500 <= response.status_code < 600 or response.status_code == 429:
+                raise RetriableAPIError(f"{response.status_code} running ({q}): {response.text}")
+            if response.status_code != 200:
+                raise FatalAPIError(f"{response.status_code} running ({q}): {response.text}")
+            return response
+
+        response = self.request_decorator(send)()
+        return [{k.lower(): v for k, v in item.items()} for item in response_json(response).get("items") or []]
+
+    def _parent_incremental(self) -> bool:
+        return bool(self.parent_transaction_column) and self.name in (
+            self.config.get("parent_incremental_streams") or []
+        )
+
+    def _start_parent_incremental(self, context: Optional[dict]) -> None:
+        """Fix the transaction modification window this sync covers.
+
+        The window ends at the newest transaction lastmodifieddate as NetSuite
+        reports it, so the bookmark never depends on the local clock. Without a
+        bookmark the whole table is read, like a full-table sync.
+        """
+        self._parent_window = None
+        if context is not None or not self._parent_incremental():
+            return
+        rows = self._suiteql_rows(
+            "SELECT TO_CHAR(MAX(lastmodifieddate), 'YYYY-MM-DD HH24:MI:SS') AS max_modified FROM transaction",
+            limit=1,
+        )
+        until = rows[0].get("max_modified") if rows else None
+        if until is None:
+            return
+        since = self.stream_state.get("parent_replication_key_value")
+        self._parent_window = (since, until)
+        if since:
+            self.logger.info(f"[{self.name}] Syncing rows of transactions modified from {since} to {until}")
+
+    def _changed_transaction_ids(self, since: str, until: str) -> Iterable[List[str]]:
+        """Yield batches of ids of transactions modified in [since, until], paged by id."""
+        time_format = "'YYYY-MM-DD HH24:MI:SS'"
+        batch_size = self.config.get("parent_incremental_batch_size", 500)
+        last_id = None
+        while True:
+            # the window starts at the bookmark itself: re-reading its second is harmless, missing it isn't
+            where = (
+                f"lastmodifieddate >= TO_TIMESTAMP('{since}', {time_format}) "
+                f"AND lastmodifieddate <= TO_TIMESTAMP('{until}', {time_format})"
+            )
+            if last_id is not None:
+                where += f" AND id > {last_id}"
+            rows = self._suiteql_rows(f"SELECT id FROM transaction WHERE {where} ORDER BY id", limit=batch_size)
+            if not rows:
+                return
+            yield [str(row["id"]) for row in rows]
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1]["id"]
+
+    def _request_changed_transaction_pages(self, context: Optional[dict]) -> Iterable[requests.Response]:
+        """Yield the pages of rows belonging to transactions changed in the window."""
+        since, until = self._parent_window
+        base_filter = self.custom_filter
+        prefix = self.select_prefix or self.table
+        try:
+            for ids in self._changed_transaction_ids(since, until):
+                ids = ", ".join(f"'{id}'" for id in ids)
+                id_filter = f"{prefix}.{self.parent_transaction_column} IN ({ids})"
+                self.custom_filter = f"{base_filter} AND {id_filter}" if base_filter else id_filter
+                yield from self._request_query_pages(context)
+        finally:
+            self.custom_filter = base_filter
+
+    def _after_sync(self, context: Optional[dict]) -> None:
+        window = getattr(self, "_parent_window", None)
+        if context is None and window is not None:
+            self.stream_state["parent_replication_key_value"] = window[1]
+            self._parent_window = None
+            self._write_state_message()
+        super()._after_sync(context)
+
+    def _fingerprints_table(self) -> bool:
+        return not self.replication_key and self.name in (
+            self.config.get("fingerprint_skip_streams") or []
+        )
+
+    def _change_fingerprint(self) -> Optional[dict]:
+        """Return the row count and latest modification date / id of the stream table.
+
+        Returns None, so the table is always synced, when it has no modification
+        column: count and max id miss edits to existing rows.
+        """
+        properties = self.schema.get("properties", {})
+        prefix = self.select_prefix or self.table
+        column = next((name for name in ("lastmodifieddate", "lastmodified") if name in properties), None)
+        if column is None:
+            self.logger.info(
+                f"[{self.name}] Table has no lastmodifieddate or lastmodified column, "
+                "so edits can't be detected; syncing it without a fingerprint"
+            )
+            return None
+        exprs = [
+            "COUNT(*) AS row_count",
+            f"TO_CHAR(MAX({prefix}.{column}), 'YYYY-MM-DD HH24:MI:SS') AS max_modified",
+        ]
+        if "id" in properties:
+            exprs.append(f"MAX({prefix}.id) AS max_id")
+        query = f"SELECT {', '.join(exprs)} FROM {self.query_table or self.table} {self.join or ''}"
+        if isinstance(self.custom_filter, str) and self.custom_filter:
+            query += f" WHERE {self.custom_filter}"
+        try:
+            return self._suiteql_first_row(query)
+        except Exception as e:
+            self.logger.warning(f"[{self.name}] Could not fingerprint the table: {e}")
+            return None
+
+    def _skip_unchanged_table(self, context: Optional[dict]) -> bool:
+        """Return True when the table didn't change since the last completed sync.
+
+        Skipped streams re-emit the records of their last sync from a local
+        snapshot when fingerprint_snapshot is on.
+        """
+        if context is not None or not self._fingerprints_table():
+            return False
+        fingerprint = self._change_fingerprint()
+        snapshot_path = None
+        if self.config.get("fingerprint_snapshot"):
+            snapshot_path = os.path.join(cache_dir(self.config, "snapshots"), f"{self.name}.jsonl.gz")
+        unchanged = fingerprint is not None and fingerprint == self.stream_state.get("fingerprint")
+        if unchanged and (snapshot_path is None or os.path.exists(snapshot_path)):
+            emitted = 0
+            if snapshot_path is not None:
+                for record in read_snapshot(snapshot_path):
+                    self._write_message(
+                        RecordMessage(
+                            stream=self.stream_maps[0].stream_alias,
+                            record=record,
+                            version=None,
+                            time_extracted=utc_now(),
+                        )
+                    )
+                    emitted += 1
+            self.logger.info(
+                f"[{self.name}] Table unchanged since the last sync ({fingerprint}), "
+                f"skipped it and re-emitted {emitted} records from the snapshot"
+            )
+            self._close_batches()
+            return True
+        self._fingerprint = fingerprint
+        if fingerprint is not None and snapshot_path is not None:
+            self._snapshot = SnapshotWriter(snapshot_path)
+        return False
+
     def _write_state_message(self) -> None:
         """Write out a STATE message with the latest state."""
         tap_state = self.tap_state
@@ -821,28 +1410,10 @@ class NetSuiteStream(RESTStream):
                 if tap_state["bookmarks"][stream_name].get("partitions"):
                     tap_state["bookmarks"][stream_name]["partitions"] = []
 
-        singer.write_message(StateMessage(value=tap_state))
+        self._write_message(StateMessage(value=tap_state))
 
     def process_number(self, field, value):
-        return_value = value
-        # Attempt to cast to float only if the value is a string with decimals
-        if isinstance(value, str) and "." in value:
-            try:
-                return_value = float(value)
-            except ValueError:
-                self.logger.error(
-                    f"Could not cast {field} : `{value}` to number"
-                )
-                raise Exception(ValueError)
-        # only parse if it's a string
-        elif isinstance(value, str):
-            # Attempt to cast to int if there are no decimals
-            try:
-                return_value = int(value)
-            except ValueError:
-                self.logger.error(f"Could not cast {field} : `{value}` to integer")
-                raise Exception(ValueError)
-        return return_value
+        return transform.process_number(field, value, self.logger)
 
     def _join_filters(self, filters):
         return f"({' '.join(filters)})"
@@ -905,6 +1476,9 @@ class NetsuiteDynamicSchema(NetSuiteStream):
     def __init__(self, *args, **kwargs):
         self.float_fields = []
         self.integer_fields = []
+        # the class attributes are shared by every stream, each instance gets its own lists
+        self.date_fields = list(self.date_fields)
+        self.bool_fields = list(self.bool_fields)
         return super().__init__(*args, **kwargs)
 
     def send_schema_prepared_request(
@@ -916,6 +1490,166 @@ class NetsuiteDynamicSchema(NetSuiteStream):
         self.validate_response(response)
         return response
 
+    @property
+    def metadata_catalog_url(self) -> str:
+        account = self.config["ns_account"].replace("_", "-").replace("SB", "sb")
+        return f"https://{account}.suitetalk.api.netsuite.com/services/rest/record/v1/metadata-catalog"
+
+    @property
+    def metadata_table(self) -> Optional[str]:
+        """Return the table whose metadata-catalog schema get_schema will ask for, if any."""
+        if self.use_dynamic_fields:
+            return None
+        if self.config.get("use_input_catalog", True) and self._tap.input_catalog and self._tap.input_catalog.get(self.name):
+            return None
+        return self.table
+
+    def fetch_metadata_catalog_batch(self, tables: List[str]) -> Dict[str, dict]:
+        """Return the metadata-catalog schemas of several record types from one request.
+
+        The OpenAPI document lists each record type under components.schemas; tables
+        missing from it aren't described by the catalog and are left out. Nested
+        records are $ref entries there, they are typed as objects like the
+        per-table schema+json response does.
+        """
+        send_request = self.request_decorator(
+            self.send_schema_prepared_request,
+            max_tries=self.schema_discovery_max_tries,
+            factor=2,
+        )
+        prepared_req = self.get_session().prepare_request(
+            requests.Request(
+                method="GET",
+                url=self.metadata_catalog_url,
+                params={"select": ",".join(tables)},
+                headers=self.http_headers,
+            )
+        )
+        prepared_req.headers.update({"Accept": "application/swagger+json"})
+        response = send_request(prepared_req)
+        components = (response_json(response).get("components") or {}).get("schemas") or {}
+        by_name = {name.lower(): schema for name, schema in components.items()}
+
+        schemas = {}
+        for table in tables:
+            schema = by_name.get(table.lower())
+            if not schema or not schema.get("properties"):
+                continue
+            schema = dict(schema)
+            schema["properties"] = {
+                field: value if "type" in value else {**value, "type": "object"}
+                for field, value in schema["properties"].items()
+            }
+            schemas[table] = schema
+        return schemas
+
+    def _fetch_metadata_catalog(self, send_request) -> dict:
+        """Return the metadata-catalog JSON schema of the stream table."""
+        self.logger.info(f"Getting schema for {self.table} - stream: {self.name}")
+
+        url = f"{self.metadata_catalog_url}/{self.table}"
+        prepared_req = self.get_session().prepare_request(
+            requests.Request(
+                method="GET",
+                url=url,
+                headers=self.http_headers,
+            )
+        )
+        prepared_req.headers.update({"Accept": "application/schema+json"})
+        self.logger.debug("get_schema(%s): metadata-catalog GET send", self.name)
+        response = send_request(prepared_req)
+        self.logger.debug(
+            "get_schema(%s): metadata-catalog GET done status=%s",
+            self.name,
+            response.status_code,
+        )
+        return response_json(response)
+
+    def _fetch_custom_fields(self) -> dict:
+        """Return the type of every custom field of the account, keyed by script id.
+
+        Raises instead of returning the pages read so far, so a partial list is
+        never cached and used to type later syncs.
+        """
+        offset = 0
+        custom_fields = {}
+
+        def send(offset):
+            self.logger.debug(
+                "get_schema(%s): customfield suiteql send offset=%s",
+                self.name,
+                offset,
+            )
+            s = self.get_session()
+            prepared_req = s.prepare_request(
+                requests.Request(
+                    method="POST",
+                    url=f"{self.url_base}?offset={offset}&limit=1000",
+                    headers=self.http_headers,
+                    json={
+                        "q": "SELECT * FROM customfield"
+                    }
+                )
+            )
+            response = s.send(prepared_req, timeout=self.timeout)
+            self.logger.debug(
+                "get_schema(%s): customfield suiteql done offset=%s status=%s",
+                self.name,
+                offset,
+                response.status_code,
+            )
+            if 500 <= response.status_code < 600 or response.status_code == 429:
+                raise RetriableAPIError(f"{response.status_code} fetching custom fields: {response.text}")
+            if response.status_code != 200:
+                raise FatalAPIError(f"{response.status_code} fetching custom fields: {response.text}")
+            return response
+
+        self.logger.info("Fetching custom fields data")
+        while offset is not None:
+            response = self.request_decorator(send)(offset)
+            offset = self.get_next_page_token(response, offset)
+            custom_fields.update({cf.get("scriptid").lower(): cf.get("fieldvaluetype") for cf in response_json(response).get("items", [])})
+        return custom_fields
+
+    def _fetch_sample_fields(self, send_request) -> dict:
+        """Infer field names and types from the first 1k records."""
+        self.logger.info(f"Getting schema for {self.table} - stream: {self.name}")
+        url = f"{self.url_base}?offset=0&limit=1000"
+
+        prepared_req = self.get_session().prepare_request(
+            requests.Request(
+                method="POST",
+                url=url,
+                headers=self.http_headers,
+                json={
+                    "q": f"SELECT * FROM {self.table} ORDER BY {self.replication_key} DESC" if self.replication_key else f"SELECT * FROM {self.table}"
+                }
+            )
+        )
+
+        self.logger.debug(
+            "get_schema(%s): suiteql schema inference POST send url=%s",
+            self.name,
+            url,
+        )
+        response = send_request(prepared_req)
+        self.logger.debug(
+            "get_schema(%s): suiteql schema inference POST done status=%s",
+            self.name,
+            response.status_code,
+        )
+        self.logger.debug(
+            "get_schema(%s): suiteql schema inference parsing response JSON",
+            self.name,
+        )
+        # NOTE: this will only get fields in the first 1k records, we could still miss things
+        items = response_json(response).get("items")
+        return infer_types(
+            items,
+            infer_numeric=self.config.get("infer_numeric_types", False),
+            exclude=list(self.primary_keys or []) + [self.replication_key],
+        )
+
     @backoff.on_exception(backoff.expo, (
         HTTPError,
         RetriableAPIError,
@@ -924,7 +1658,7 @@ class NetsuiteDynamicSchema(NetSuiteStream):
         RemoteDisconnected,
     ), max_tries=5, factor=2)
     def get_schema(self): # noqa: C901
-        s = self.get_session()
+        registry = self._tap.schema_registry
         send_request = self.request_decorator(
             self.send_schema_prepared_request,
             max_tries=self.schema_discovery_max_tries,
@@ -942,26 +1676,9 @@ class NetsuiteDynamicSchema(NetSuiteStream):
                 # TODO: refactor this to not force the except like this lol
                 raise Exception("Switching to dynamic fields...")
 
-            self.logger.info(f"Getting schema for {self.table} - stream: {self.name}")
-
-            account = self.config["ns_account"].replace("_", "-").replace("SB", "sb")
-            url = f"https://{account}.suitetalk.api.netsuite.com/services/rest/record/v1/metadata-catalog/{self.table}"
-            prepared_req = s.prepare_request(
-                requests.Request(
-                    method="GET",
-                    url=url,
-                    headers=self.http_headers,
-                )
+            self.schema_response = registry.get(
+                "metadata", self.table, lambda: self._fetch_metadata_catalog(send_request)
             )
-            prepared_req.headers.update({"Accept": "application/schema+json"})
-            self.logger.debug("get_schema(%s): metadata-catalog GET send", self.name)
-            response = send_request(prepared_req)
-            self.logger.debug(
-                "get_schema(%s): metadata-catalog GET done status=%s",
-                self.name,
-                response.status_code,
-            )
-            self.schema_response = response.json()
         except Exception as e:
             self.logger.warning(f"Failed to get schema using metadata-catalog for {self.table} - stream: {self.name}, Error: {e}")
         
@@ -970,103 +1687,28 @@ class NetsuiteDynamicSchema(NetSuiteStream):
         # fetch custom fields
         add_custom_fields_streams = ["invoices", "bills", "invoice_lines", "bill_lines", "bill_expenses"]
         if not self.schema_response  and self._tap.custom_fields is None and self.name in add_custom_fields_streams:
-            # request custom fields types
-            offset = 0
-            custom_fields = {}
-
-            self.logger.info("Fetching custom fields data")
-            while offset is not None:
-                self.logger.debug(
-                    "get_schema(%s): customfield suiteql send offset=%s",
-                    self.name,
-                    offset,
-                )
-                prepared_req = s.prepare_request(
-                    requests.Request(
-                        method="POST",
-                        url=f"{self.url_base}?offset={offset}&limit=1000",
-                        headers=self.http_headers,
-                        json={
-                            "q": "SELECT * FROM customfield"
-                        }
-                    )
-                )
-                response = s.send(prepared_req, timeout=self.timeout)
-                self.logger.debug(
-                    "get_schema(%s): customfield suiteql done offset=%s status=%s",
-                    self.name,
-                    offset,
-                    response.status_code,
-                )
-                if response.status_code not in [200]:
-                    self.logger.error(f"Failed to fetch custom fields for {self.table} - stream: {self.name}, Error: {response.text}, not able to add custom fields to the schema")
-                    break
-                offset = self.get_next_page_token(response, offset)
-                custom_fields.update({cf.get("scriptid").lower(): cf.get("fieldvaluetype") for cf in response.json().get("items", [])})
-            
-            self._tap.custom_fields = custom_fields
+            try:
+                self._tap.custom_fields = self._tap.lookups.custom_fields(self)
+            except Exception as e:
+                self.logger.error(f"Failed to fetch custom fields for {self.table} - stream: {self.name}, Error: {e}, not able to add custom fields to the schema")
 
 
         # fetch top 1000 records to infer fields and types
         if not self.schema_response or self.filter_fields:
             self.fields = set()
 
-            self.logger.info(f"Getting schema for {self.table} - stream: {self.name}")
-            url = f"{self.url_base}?offset=0&limit=1000"
-
-            prepared_req = s.prepare_request(
-                requests.Request(
-                    method="POST",
-                    url=url,
-                    headers=self.http_headers,
-                    json={
-                        "q": f"SELECT * FROM {self.table} ORDER BY {self.replication_key} DESC" if self.replication_key else f"SELECT * FROM {self.table}"
-                    }
-                )
-            )
-
-            self.logger.debug(
-                "get_schema(%s): suiteql schema inference POST send url=%s",
-                self.name,
-                url,
-            )
-
-
             try:
-                response = send_request(prepared_req)
-                self.logger.debug(
-                    "get_schema(%s): suiteql schema inference POST done status=%s",
-                    self.name,
-                    response.status_code,
+                numeric = ".numeric" if self.config.get("infer_numeric_types") else ""
+                sample = registry.get(
+                    "sample",
+                    f"{self.table}.{self.replication_key or ''}{numeric}",
+                    lambda: self._fetch_sample_fields(send_request),
                 )
-                self.logger.debug(
-                    "get_schema(%s): suiteql schema inference parsing response JSON",
-                    self.name,
-                )
-                # NOTE: this will only get fields in the first 1k records, we could still miss things
-                for item in response.json().get("items"):
-                    self.fields.update(set(item.keys()))
-
-                # decide which ones are date fields
-                pot_date_fields = [f for f in self.fields if 'date' in f and 'custbody' not in f and 'custrecord' not in f]
-                for f in pot_date_fields:
-                    match = [i for i in response.json().get("items") if i.get(f)]
-                    if len(match) > 0:
-                        try:
-                            try:
-                                parse(match[0][f])
-                            except:
-                                pendulum.from_format(match[0][f], "MM/DD/YYYY")
-                            self.date_fields.append(f)
-                        except:
-                            pass
-
-                # decide who ones are boolean fields
-                def all_bool(f):
-                    match = [i for i in response.json().get("items") if i.get(f) in ["T", "F", None]]
-                    return len(match) == len(response.json().get("items"))
-
-                self.bool_fields = [f for f in self.fields if all_bool(f)]
+                self.fields.update(sample["fields"])
+                self.date_fields.extend(sample["date_fields"])
+                self.bool_fields = list(sample["bool_fields"])
+                self.integer_fields.extend(sample.get("integer_fields", []))
+                self.float_fields.extend(sample.get("float_fields", []))
 
                 self.fields -= SUITEQL_EXCLUDED_FIELDS
 
@@ -1165,6 +1807,46 @@ class NetsuiteDynamicStream(NetsuiteDynamicSchema):
     bool_fields = []
     use_dynamic_fields = False
     default_fields = []
+    # modification timestamp columns full-table streams can be promoted to replicate on
+    auto_replication_keys = ["lastmodifieddate", "lastmodified"]
+
+    @property
+    def replication_key_promoted(self) -> bool:
+        """Return True if the stream replicates on a key it doesn't declare itself."""
+        # streams declaring a key shadow the SDK property with a class attribute
+        return isinstance(getattr(type(self), "replication_key", None), property) and bool(
+            self.replication_key
+        )
+
+    def promote_replication_key(self) -> Optional[str]:
+        """Make a full-table stream incremental on its modification timestamp column.
+
+        Only plain single-table queries are promoted; streams with parents, joins
+        or their own query building keep their full-table sync.
+        """
+        if (
+            self.replication_key
+            or self.parent_stream_type
+            or self.query_table
+            or self.join
+            or isinstance(self, BulkParentStream)
+            or type(self).prepare_request_payload is not NetSuiteStream.prepare_request_payload
+            or type(self).request_records is not NetSuiteStream.request_records
+        ):
+            return None
+        properties = self.schema.get("properties", {})
+        for column in self.auto_replication_keys:
+            if (properties.get(column) or {}).get("format") == "date-time":
+                self.replication_key = column
+                self.logger.info(f"[{self.name}] Replicating incrementally on {column}")
+                return column
+        return None
+
+    def get_starting_time(self, context):
+        if self.replication_key_promoted and self.get_starting_timestamp(context) is None:
+            # the stream used to be full table, its first sync still reads every row
+            return None
+        return super().get_starting_time(context)
 
     @property
     def select(self):
@@ -1197,89 +1879,10 @@ class NetsuiteDynamicStream(NetsuiteDynamicSchema):
         else:
             return None
     
-    def process_types(self, row, schema=None): # noqa: C901
+    def process_types(self, row, schema=None):
         if schema is None:
             schema = self.schema["properties"]
-        for field, value in row.items():
-            if field not in schema:
-                # Skip fields not found in the schema
-                continue
-
-            field_info = schema[field]
-            field_type = field_info.get("type", ["null"])[0]
-            # Process nested properties
-            if "properties" in field_info:
-                row[field] = self.process_types(value, field_info["properties"])
-            # Process nested properties
-            if "items" in field_info:
-                if isinstance(value, list):
-                    row[field] = [
-                        self.process_types(v, field_info["items"].get("properties"))
-                        for v in value
-                    ]
-            field_format = field_info.get("format", None)
-            if field_type == "string" and field_format == "date-time":
-                # if it's already correctly a datetime, don't need to do anything
-                if isinstance(value, datetime):
-                    row[field] = value
-                    continue
-
-                try:
-                    # Attempt to parse string as date-time
-                    # If successful, no need to cast
-                    _ = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ")
-                except ValueError:
-                    # If parsing fails, consider it as a type mismatch and attempt to cast
-                    try:
-                        row[field] = parse(value)
-                    except:
-                        row[field] = pendulum.from_format(value, "MM/DD/YYYY")
-            elif field_type == "boolean":
-                if not isinstance(value, bool):
-                    # Attempt to cast to boolean
-                    if value.lower() in ["true", "t"]:
-                        row[field] = True
-                    elif value.lower() in ["false", "f"]:
-                        row[field] = False
-                    else:
-                        # No need to raise an error, just continue with the loop
-                        continue
-
-            elif field_type == "number" or field_type == "integer":
-                if isinstance(value, str):
-                    row[field] = self.process_number(field, value)
-
-            elif field_type == "string":
-                if not isinstance(value, str):
-                    # Attempt to cast to string
-                    row[field] = str(value)
-            elif field_type == "array":
-                array_types = field_info.get("type", ["null"])
-                if isinstance(value, list):
-                    continue
-                else:
-                    for array_type in array_types:
-                        if array_type == "string":
-                            try:
-                                # Attempt to cast to JSON
-                                parsed_value = json.loads(value)
-                                if isinstance(parsed_value, list):
-                                    row[field] = parsed_value
-                                else:
-                                    # We only want valid lists
-                                    raise ValueError
-                            except (ValueError, json.JSONDecodeError, TypeError):
-                                if not isinstance(value, str):
-                                    # Attempt to cast to string
-                                    row[field] = str(value)
-                        if array_type == "number" or array_type == "integer":
-                            row[field] = self.process_number(field, value)
-
-            else:
-                # Unsupported type
-                # No need to raise an error, just continue with the loop
-                continue
-        return row
+        return transform.process_types(row, schema, self.logger)
     
     def post_process(self, row: dict, context: Optional[dict]) -> dict:
         """As needed, append or transform raw data to match expected structure."""
@@ -1318,6 +1921,15 @@ class BulkParentStream(NetsuiteDynamicStream):
     def _sync_records(  # noqa C901  # too complex
         self, context: Optional[dict] = None
     ) -> None:
+        if self._skip_unchanged_table(context):
+            return
+        self._start_parent_incremental(context)
+        records = self._serialized_records(context)
+        if records is not None:
+            self._sync_serialized_records(records, context)
+            self._after_sync(context)
+            return
+
         record_count = 0
         current_context: Optional[dict]
         context_list: Optional[List[dict]]
@@ -1394,6 +2006,7 @@ class BulkParentStream(NetsuiteDynamicStream):
         self._write_record_count_log(record_count=record_count, context=context)
         # Reset interim bookmarks before emitting final STATE message:
         self._write_state_message()
+        self._after_sync(context)
 
 class TransactionRootStream(NetsuiteDynamicStream):
     select = None
@@ -1450,23 +2063,16 @@ class TransactionRootStream(NetsuiteDynamicStream):
     def post_process(self, row: dict, context: Optional[dict] = None) -> Optional[dict]:
         # Collapse duplicate spaces in address fields
         row = super().post_process(row, context)
-        if row.get("shippingaddress"):
-            row["shippingaddress"] = re.sub(r'(, )+', ', ', row["shippingaddress"]).strip(', ')
-            if row["shippingaddress"] == "":
-                row.pop("shippingaddress")
-        if row.get("billingaddress"):
-            row["billingaddress"] = re.sub(r'(, )+', ', ', row["billingaddress"]).strip(', ')
-            if row["billingaddress"] == "":
-                row.pop("billingaddress")
-        
-
-        return row
+        return transform.collapse_address_fields(row)
 
 
-class NetsuiteSOAPStream(Stream):
+class NetsuiteSOAPStream(SingerOutputMixin, Stream):
     """NetSuite SOAP stream class."""
     page_size = 100
 
+    def _write_state_message(self) -> None:
+        self._write_message(StateMessage(value=self.tap_state))
+
 
     def prepare_request_payload(self, context):
         return {}
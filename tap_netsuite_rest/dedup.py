@@ -0,0 +1,245 @@
+"""Primary-key stores used to drop duplicated records within a sync."""
+
+import sqlite3
+import sys
+from array import array
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any, Optional
+
+from pendulum import parse
+
+
+class SetStore:
+    """Remember every key for the lifetime of the stream."""
+
+    name = "set"
+
+    def __init__(self) -> None:
+        self._keys = set()
+
+    def seen(self, key: Any, bookmark: Any = None) -> bool:
+        """Return True if key was recorded before, otherwise record it."""
+        if key in self._keys:
+            return True
+        self._keys.add(key)
+        return False
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def memory_bytes(self) -> int:
+        # sizing every key would walk millions of objects, extrapolate from a sample
+        sample = list(islice(self._keys, 1000))
+        per_key = sum(sys.getsizeof(k) for k in sample) / len(sample) if sample else 0
+        return int(sys.getsizeof(self._keys) + per_key * len(self._keys))
+
+
+class WindowStore(SetStore):
+    """Remember keys only while their replication key value is close to the newest one.
+
+    Duplicates come from pages overlapping around the bookmark, so with records
+    ordered by the replication key a key can be forgotten once the bookmark has
+    moved more than window_seconds past it. Keys without a bookmark are kept for
+    the whole sync and never queued for eviction.
+    """
+
+    name = "window"
+
+    def __init__(self, window_seconds: int = 3600) -> None:
+        super().__init__()
+        self.window = timedelta(seconds=window_seconds)
+        self._order = deque()
+        self._newest: Optional[datetime] = None
+        self._last_bookmark = None
+        self._last_moment: Optional[datetime] = None
+
+    def _moment(self, bookmark: Any) -> Optional[datetime]:
+        if bookmark is None:
+            return None
+        if bookmark == self._last_bookmark:
+            return self._last_moment
+        if isinstance(bookmark, datetime):
+            moment = bookmark
+        else:
+            try:
+                moment = datetime.fromisoformat(str(bookmark))
+            except ValueError:
+                try:
+                    moment = parse(str(bookmark))
+                except Exception:
+                    return None
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        self._last_bookmark, self._last_moment = bookmark, moment
+        return moment
+
+    def seen(self, key: Any, bookmark: Any = None) -> bool:
+        if key in self._keys:
+            return True
+        moment = self._moment(bookmark)
+        if moment is not None and (self._newest is None or moment > self._newest):
+            self._newest = moment
+            self._evict()
+        self._keys.add(key)
+        if moment is not None:
+            self._order.append((moment, key))
+        return False
+
+    def _evict(self) -> None:
+        cutoff = self._newest - self.window
+        while self._order and self._order[0][0] < cutoff:
+            _, key = self._order.popleft()
+            self._keys.discard(key)
+
+    def memory_bytes(self) -> int:
+        return super().memory_bytes() + sys.getsizeof(self._order) + 64 * len(self._order)
+
+
+class IntegerStore(SetStore):
+    """Keep integer keys in compressed buckets, roughly two bytes per key.
+
+    Keys are split by their high bits into buckets of 65536 values. A bucket
+    starts as a sorted array of the low 16 bits and becomes an 8 KB bitmap once
+    it holds more than 4096 keys, so memory follows the number of keys rather
+    than the largest id. Two-part keys of integers ("line-transaction") are
+    packed into one number. Digit strings are flagged apart from ints, so 1 and
+    "1" stay different keys as they are in SetStore. Other keys (leading zeros,
+    ids of 2**32 and above, more parts) fall back to a regular set.
+    """
+
+    name = "integer"
+    MAX_PART = 1 << 32
+    # mark packed two-part keys and digit strings so they never collide with int ids
+    PAIR_FLAG = 1 << 64
+    STR_FLAG = 1 << 65
+    ARRAY_LIMIT = 4096
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._buckets = {}
+        self._count = 0
+
+    def _part(self, value: Any) -> Optional[int]:
+        if isinstance(value, int) and not isinstance(value, bool):
+            number = value
+        elif isinstance(value, str) and value.isdigit() and (value == "0" or value[0] != "0"):
+            number = int(value)
+        else:
+            return None
+        return number if 0 <= number < self.MAX_PART else None
+
+    def _as_int(self, key: Any) -> Optional[int]:
+        number = self._part(key)
+        if number is not None:
+            return self.STR_FLAG | number if isinstance(key, str) else number
+        if not isinstance(key, str):
+            return None
+        parts = key.split("-")
+        if len(parts) != 2:
+            return None
+        first, second = self._part(parts[0]), self._part(parts[1])
+        if first is None or second is None:
+            return None
+        return self.PAIR_FLAG | (first << 32) | second
+
+    def seen(self, key: Any, bookmark: Any = None) -> bool:
+        number = self._as_int(key)
+        if number is None:
+            return super().seen(key, bookmark)
+        high, low = number >> 16, number & 0xFFFF
+        bucket = self._buckets.get(high)
+        if bucket is None:
+            self._buckets[high] = array("H", [low])
+        elif isinstance(bucket, bytearray):
+            index, mask = low >> 3, 1 << (low & 7)
+            if bucket[index] & mask:
+                return True
+            bucket[index] |= mask
+        else:
+            position = bisect_left(bucket, low)
+            if position < len(bucket) and bucket[position] == low:
+                return True
+            bucket.insert(position, low)
+            if len(bucket) > self.ARRAY_LIMIT:
+                self._buckets[high] = self._to_bitmap(bucket)
+        self._count += 1
+        return False
+
+    @staticmethod
+    def _to_bitmap(values: array) -> bytearray:
+        bitmap = bytearray(8192)
+        for value in values:
+            bitmap[value >> 3] |= 1 << (value & 7)
+        return bitmap
+
+    def __len__(self) -> int:
+        return self._count + super().__len__()
+
+    def memory_bytes(self) -> int:
+        buckets = sum(sys.getsizeof(bucket) for bucket in self._buckets.values())
+        return sys.getsizeof(self._buckets) + buckets + super().memory_bytes()
+
+
+class DiskStore:
+    """Keep keys in a private temporary SQLite database that spills to disk.
+
+    SQLite deletes the database when the connection is closed; only its page
+    cache (cache_mb) is held in memory.
+    """
+
+    name = "disk"
+    COMMIT_EVERY = 100000
+
+    def __init__(self, cache_mb: int = 64) -> None:
+        # an empty filename creates a temporary on-disk database
+        self._db = sqlite3.connect("")
+        self._db.execute("PRAGMA journal_mode=OFF")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.execute(f"PRAGMA cache_size=-{cache_mb * 1024}")
+        self._db.execute("CREATE TABLE keys (key TEXT PRIMARY KEY) WITHOUT ROWID")
+        self.cache_mb = cache_mb
+        self._count = 0
+
+    def seen(self, key: Any, bookmark: Any = None) -> bool:
+        # repr keeps 1 and "1" apart, as they are in SetStore
+        cursor = self._db.execute("INSERT OR IGNORE INTO keys VALUES (?)", (repr(key),))
+        if cursor.rowcount == 0:
+            return True
+        self._count += 1
+        if self._count % self.COMMIT_EVERY == 0:
+            self._db.commit()
+        return False
+
+    def __len__(self) -> int:
+        return self._count
+
+    def memory_bytes(self) -> int:
+        page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+        page_count = self._db.execute("PRAGMA page_count").fetchone()[0]
+        return min(page_size * page_count, self.cache_mb * 1024 * 1024)
+
+    def disk_bytes(self) -> int:
+        page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+        page_count = self._db.execute("PRAGMA page_count").fetchone()[0]
+        return page_size * page_count
+
+
+STORES = {
+    SetStore.name: SetStore,
+    WindowStore.name: WindowStore,
+    IntegerStore.name: IntegerStore,
+    DiskStore.name: DiskStore,
+}
+
+
+def make_store(config: dict):
+    """Build the dedup store selected by the dedup_store config option."""
+    kind = config.get("dedup_store") or SetStore.name
+    if kind not in STORES:
+        raise ValueError(f"Unknown dedup_store {kind}, expected one of {list(STORES)}")
+    if kind == WindowStore.name:
+        return WindowStore(config.get("dedup_window_seconds", 3600))
+    return STORES[kind]()
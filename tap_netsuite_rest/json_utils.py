@@ -0,0 +1,200 @@
+"""JSON decoding helpers: a pluggable fast backend and per-response memoization."""
+
+import http.client
+import json
+import logging
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+import requests
+import urllib3
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ["auto", "orjson", "json"]
+SUMMARY_KEYS = ("count", "hasMore", "offset", "totalResults")
+_backend = "orjson" if orjson is not None else "json"
+
+
+def set_backend(name: str) -> str:
+    """Select the JSON decoder; "auto" uses orjson when it is installed."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend {name}, expected one of {BACKENDS}")
+    if name == "orjson" and orjson is None:
+        raise ValueError("JSON backend orjson was requested but it is not installed")
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+    _backend = name
+    return _backend
+
+
+def backend() -> str:
+    """Return the selected JSON decoder, e.g. to select it again in a worker process."""
+    return _backend
+
+
+def loads(content: Any) -> Any:
+    """Decode JSON bytes or text with the selected backend."""
+    if _backend == "orjson":
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # let the standard decoder raise its usual error (or handle non UTF-8 bodies)
+            pass
+    return json.loads(content)
+
+
+def page_summary(data: Any) -> Any:
+    """Return the page fields pagination needs, detached from the records.
+
+    Records are processed in place after they are parsed, so the last item is
+    copied before any of them is handed out.
+    """
+    if not isinstance(data, dict):
+        return data
+    summary = {key: value for key, value in data.items() if key != "items"}
+    items = data.get("items")
+    if items:
+        summary["items"] = [dict(items[-1]) if isinstance(items[-1], dict) else items[-1]]
+    return summary
+
+
+def response_json(response: requests.Response) -> Any:
+    """Return the decoded body of a response, decoding it at most once."""
+    if not hasattr(response, "_decoded_json"):
+        data = loads(response.content)
+        response._page_summary = page_summary(data)
+        response._decoded_json = data
+    return response._decoded_json
+
+
+def response_summary(response: requests.Response) -> Any:
+    """Return hasMore/offset/totalResults and the last item of a SuiteQL page."""
+    if not hasattr(response, "_page_summary"):
+        response_json(response)
+    return response._page_summary
+
+
+class PageChangedError(Exception):
+    """A page read again after a failed read doesn't match the records already yielded."""
+
+
+def can_stream_items() -> bool:
+    return ijson is not None
+
+
+def _read_errors() -> Tuple[type, ...]:
+    errors = (
+        requests.exceptions.ChunkedEncodingError,
+        requests.exceptions.ConnectionError,
+        urllib3.exceptions.HTTPError,
+        http.client.IncompleteRead,
+        ConnectionError,
+    )
+    if ijson is not None:
+        # a body cut short without a transport error reads as truncated JSON
+        errors += (ijson.IncompleteJSONError,)
+    return errors
+
+
+def iter_response_items(
+    response: requests.Response,
+    records_key: str = "items",
+    refetch: Optional[Callable[[], requests.Response]] = None,
+    max_refetches: int = 3,
+) -> Iterable[dict]:
+    """Yield the records of a page as they are parsed from the response stream.
+
+    Only works on responses sent with stream=True whose body was not read yet;
+    otherwise the memoized decoded body is used. The pagination fields are
+    stored in the page summary as soon as they are parsed. If reading the body
+    fails midway, the page is requested again with refetch() and the records
+    already yielded are skipped, after checking the last of them is still at
+    the same position; PageChangedError is raised when it isn't.
+    """
+    if ijson is None or response._content_consumed:
+        yield from response_json(response).get(records_key) or []
+        return
+
+    summary = {}
+    response._page_summary = summary
+    yielded = 0
+    refetches = 0
+    source = response
+    while True:
+        events = _summary_events(source, summary)
+        last = summary["items"][0] if yielded else None
+        try:
+            for item in _resume(ijson.items(events, f"{records_key}.item"), yielded, last):
+                # keep a copy, records are post-processed in place once yielded
+                summary["items"] = [dict(item)]
+                yielded += 1
+                yield item
+        except _read_errors() as e:
+            source.close()
+            if refetch is None or refetches >= max_refetches:
+                raise
+            refetches += 1
+            logger.warning(f"Reading a page failed after {yielded} records ({e}), requesting it again")
+            source = refetch()
+            if source._content_consumed:
+                # the retry wasn't streamed, its body is already complete
+                items = response_json(source).get(records_key) or []
+                last = summary["items"][0] if yielded else None
+                summary.update(source._page_summary)
+                yield from _resume(items, yielded, last)
+                return
+            continue
+        except GeneratorExit:
+            # the consumer stopped early, parse the rest of the page for the trailing fields
+            try:
+                for _ in events:
+                    pass
+            except Exception:
+                pass
+            source.close()
+            raise
+        source.close()
+        return
+
+
+def _resume(items: Iterable[Any], skipped: int, last: Any) -> Iterator[Any]:
+    """Yield the items after the first `skipped`, which must end with `last`."""
+    position = 0
+    for item in items:
+        position += 1
+        if position < skipped:
+            continue
+        if position == skipped:
+            _check_refetched_item(last, item, skipped)
+            continue
+        yield item
+    if position < skipped:
+        _check_refetched_item(last, None, skipped)
+
+
+def _check_refetched_item(expected: Any, item: Any, position: int) -> None:
+    if item != expected:
+        raise PageChangedError(
+            f"Record {position} of the page changed when it was requested again "
+            f"(was {expected}, now {item}), the page can't be resumed"
+        )
+
+
+def _summary_events(response: requests.Response, summary: dict) -> Iterator[tuple]:
+    response.raw.decode_content = True
+    for prefix, event, value in ijson.parse(response.raw, use_float=True):
+        if prefix in SUMMARY_KEYS:
+            summary[prefix] = value
+        yield prefix, event, value
@@ -0,0 +1,110 @@
+"""Tap-wide cache of small lookup tables shared by every stream."""
+
+import logging
+from typing import Dict, List, Optional
+
+from hotglue_singer_sdk.exceptions import FatalAPIError
+
+from tap_netsuite_rest.schema_registry import SchemaRegistry
+
+
+logger = logging.getLogger(__name__)
+
+
+class LookupCache:
+    """Rows of small lookup tables by id, read with one query per table per run.
+
+    Tables are loaded on first use through the stream asking for them and shared
+    with every other stream. With a ttl they are also written to
+    <cache_dir>/<account>/lookups and reused by later runs until they expire.
+    A table the role can't read is cached as None.
+    """
+
+    TABLE_COLUMNS = {
+        "account": ["accountsearchdisplayname", "displaynamewithhierarchy", "accttype", "acctnumber"],
+        "accountingbook": ["name", "isprimary"],
+        "accountingperiod": ["periodname", "startdate", "enddate"],
+        "classification": ["name"],
+        "currency": ["name", "symbol"],
+        "department": ["name", "fullname"],
+        "employee": ["entityid"],
+        "location": ["name"],
+        "subsidiary": ["name", "fullname", "currency"],
+    }
+    PAGE_SIZE = 1000
+
+    def __init__(self, config: dict, ttl: int = 0) -> None:
+        self.registry = SchemaRegistry(config, ttl, subdir="lookups")
+
+    def table(self, table: str, stream) -> Optional[Dict[str, dict]]:
+        """Return the rows of a lookup table by id, running queries with the stream's session."""
+        return self.registry.get("table", table, lambda: self._load_table(table, stream))
+
+    def _load_table(self, table: str, stream) -> Optional[Dict[str, dict]]:
+        columns = ", ".join(["id"] + self.TABLE_COLUMNS[table])
+        rows = {}
+        last_id = None
+        while True:
+            where = f"WHERE id > {last_id}" if last_id is not None else ""
+            try:
+                page = stream._suiteql_rows(
+                    f"SELECT {columns} FROM {table} {where} ORDER BY id", limit=self.PAGE_SIZE
+                )
+            except FatalAPIError as e:
+                if f"record '{table}' was not found" in str(e).lower():
+                    logger.info(f"Missing {table} permission, {table} lookups are unavailable")
+                    return None
+                raise
+            rows.update((str(row["id"]), row) for row in page)
+            if len(page) < self.PAGE_SIZE:
+                logger.info(f"Loaded {len(rows)} {table} rows for lookups")
+                return rows
+            last_id = page[-1]["id"]
+
+    def accounts(self, stream) -> Optional[Dict[str, dict]]:
+        return self.table("account", stream)
+
+    def accounting_books(self, stream) -> Optional[Dict[str, dict]]:
+        return self.table("accountingbook", stream)
+
+    def classes(self, stream) -> Optional[Dict[str, dict]]:
+        return self.table("classification", stream)
+
+    def currencies(self, stream) -> Optional[Dict[str, dict]]:
+        return self.table("currency", stream)
+
+    def departments(self, stream) -> Optional[Dict[str, dict]]:
+        return self.table("department", stream)
+
+    def employees(self, stream) -> Optional[Dict[str, dict]]:
+        return self.table("employee", stream)
+
+    def locations(self, stream) -> Optional[Dict[str, dict]]:
+        return self.table("location", stream)
+
+    def periods(self, stream) -> Optional[Dict[str, dict]]:
+        return self.table("accountingperiod", stream)
+
+    def subsidiaries(self, stream) -> Optional[Dict[str, dict]]:
+        return self.table("subsidiary", stream)
+
+    def custom_fields(self, stream) -> dict:
+        """Return the value type of every custom field, keyed by lowercase script id."""
+        # failures raise and are never cached; the registry only remembers
+        # non-retriable ones, and only for this run
+        return self.registry.get("customfields", "customfield", stream._fetch_custom_fields)
+
+    def custom_segments(self, stream) -> Optional[List[dict]]:
+        """Return the name and scriptid of every custom segment, or None if SuiteQL can't read them."""
+        def fetch():
+            try:
+                return stream._suiteql_rows("SELECT name, scriptid FROM customsegment", limit=self.PAGE_SIZE)
+            except FatalAPIError as e:
+                if "record 'customsegment' was not found" in str(e).lower():
+                    return None
+                raise
+
+        return self.registry.get("customsegments", "customsegment", fetch, remember_errors=False)
+
+    def log_stats(self) -> None:
+        self.registry.log_stats()
@@ -0,0 +1,226 @@
+"""Columnar Parquet export for wide, regular report streams."""
+
+import json
+import os
+import re
+import uuid
+from collections import OrderedDict
+from typing import List, Optional
+
+from singer.messages import BatchMessage
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+NULL_PARTITION = "__null__"
+
+
+def is_available() -> bool:
+    return pa is not None
+
+
+def arrow_type(property_schema: dict):
+    """Map a JSON schema property to an Arrow type.
+
+    Date-time fields are kept as the strings the stream emits, and nested
+    objects or arrays are stored as JSON text.
+    """
+    types = property_schema.get("type", ["string"])
+    if isinstance(types, str):
+        types = [types]
+    types = [t for t in types if t != "null"] or ["string"]
+    if types[0] == "integer":
+        return pa.int64()
+    if types[0] == "number":
+        return pa.float64()
+    if types[0] == "boolean":
+        return pa.bool_()
+    return pa.string()
+
+
+def arrow_schema(schema: dict):
+    return pa.schema(
+        [pa.field(name, arrow_type(prop)) for name, prop in schema["properties"].items()]
+    )
+
+
+def _convert(value, arrow_type):
+    if value is None:
+        return None
+    if arrow_type == pa.string():
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return str(value)
+    if arrow_type == pa.float64():
+        return float(value)
+    if arrow_type == pa.int64():
+        return int(value)
+    if arrow_type == pa.bool_():
+        if isinstance(value, str):
+            return value.lower() in ["true", "t"]
+        return bool(value)
+    return value
+
+
+class ParquetPartition:
+    """Arrow record batches and an open Parquet file for one partition value.
+
+    Rows are held as Python dicts only until chunk_size of them are converted
+    to an Arrow record batch; batches are written as one row group once they
+    add up to row_group_size rows.
+    """
+
+    CHUNK_SIZE = 4096
+
+    def __init__(self, path: str, schema, row_group_size: int) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.schema = schema
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._pending: List[dict] = []
+        self._batches = []
+        self._batched_rows = 0
+        self._sink = pa.OSFile(path, "wb")
+        self._writer = pq.ParquetWriter(self._sink, schema)
+        self._closed_bytes = None
+
+    @property
+    def bytes(self) -> int:
+        """Bytes written to the file so far."""
+        if self._closed_bytes is not None:
+            return self._closed_bytes
+        return self._sink.tell()
+
+    def append(self, record: dict) -> None:
+        self._pending.append(record)
+        self.rows += 1
+        if len(self._pending) >= min(self.CHUNK_SIZE, self.row_group_size):
+            self._convert_pending()
+            if self._batched_rows >= self.row_group_size:
+                self.flush()
+
+    def _array(self, field, values):
+        try:
+            return pa.array(values, type=field.type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # values arrive as SuiteQL strings or already converted, normalize them
+            return pa.array([_convert(v, field.type) for v in values], type=field.type)
+
+    def _convert_pending(self) -> None:
+        if not self._pending:
+            return
+        rows = self._pending
+        try:
+            batch = pa.RecordBatch.from_pylist(rows, schema=self.schema)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrays = [self._array(field, [row.get(field.name) for row in rows]) for field in self.schema]
+            batch = pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        self._batches.append(batch)
+        self._batched_rows += batch.num_rows
+        self._pending = []
+
+    def flush(self) -> None:
+        self._convert_pending()
+        if not self._batches:
+            return
+        self._writer.write_table(
+            pa.Table.from_batches(self._batches, schema=self.schema),
+            row_group_size=self.row_group_size,
+        )
+        self._batches = []
+        self._batched_rows = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+        self._closed_bytes = self._sink.tell()
+        self._sink.close()
+
+
+class ParquetStreamWriter:
+    """Write a stream's records to Parquet files partitioned by one column.
+
+    Files are laid out as <directory>/<stream>/<key>_<value>/part-*.parquet and keep
+    the partition column, so each file is self-contained. Rows are buffered per
+    partition as Arrow record batches and written one row group at a time.
+
+    At most max_open_files partitions have a file open; opening another one
+    closes the least recently written. A partition seen again later gets a new
+    part file.
+    """
+
+    def __init__(
+        self,
+        stream_name: str,
+        json_schema: dict,
+        directory: str,
+        partition_key: Optional[str],
+        row_group_size: int = 100000,
+        max_open_files: int = 64,
+    ) -> None:
+        self.stream_name = stream_name
+        self.schema = arrow_schema(json_schema)
+        self.directory = directory
+        self.partition_key = partition_key
+        self.row_group_size = row_group_size
+        self.max_open_files = max(1, max_open_files)
+        self.rows = 0
+        self._partitions: "OrderedDict[str, ParquetPartition]" = OrderedDict()
+        self._closed: List[ParquetPartition] = []
+
+    @property
+    def bytes(self) -> int:
+        """Bytes written to the stream's Parquet files so far."""
+        return sum(p.bytes for p in self._closed) + sum(p.bytes for p in self._partitions.values())
+
+    def _partition_dir(self, value) -> str:
+        stream_dir = os.path.join(self.directory, self.stream_name)
+        if not self.partition_key:
+            return stream_dir
+        value = NULL_PARTITION if value in (None, "") else re.sub(r"[^\w.-]", "_", str(value))
+        return os.path.join(stream_dir, f"{self.partition_key}_{value}")
+
+    def _open(self, value) -> ParquetPartition:
+        if len(self._partitions) >= self.max_open_files:
+            _, oldest = self._partitions.popitem(last=False)
+            oldest.close()
+            self._closed.append(oldest)
+        path = os.path.abspath(
+            os.path.join(self._partition_dir(value), f"part-{uuid.uuid4().hex}.parquet")
+        )
+        partition = self._partitions[value] = ParquetPartition(path, self.schema, self.row_group_size)
+        return partition
+
+    def write(self, record: dict) -> None:
+        value = record.get(self.partition_key) if self.partition_key else None
+        partition = self._partitions.get(value)
+        if partition is None:
+            partition = self._open(value)
+        else:
+            self._partitions.move_to_end(value)
+        partition.append(record)
+        self.rows += 1
+
+    def close(self) -> List[BatchMessage]:
+        for partition in self._partitions.values():
+            partition.close()
+        messages = [
+            BatchMessage(
+                stream=self.stream_name,
+                filepath=partition.path,
+                file_format="parquet",
+                batch_size=partition.rows,
+            )
+            for partition in self._closed + list(self._partitions.values())
+        ]
+        self._partitions = OrderedDict()
+        self._closed = []
+        return messages
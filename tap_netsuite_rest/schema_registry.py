@@ -0,0 +1,156 @@
+"""Tap-wide registry of table metadata shared by every stream reading the same table."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from http.client import RemoteDisconnected
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+from hotglue_singer_sdk.exceptions import RetriableAPIError
+
+from tap_netsuite_rest.cache import account_id, cache_dir
+
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+def is_retriable(error: Exception) -> bool:
+    """Return True for errors a later attempt may not hit: 5xx/429 and transport failures."""
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(
+        error,
+        (
+            RetriableAPIError,
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+            requests.exceptions.ChunkedEncodingError,
+            RemoteDisconnected,
+        ),
+    )
+
+
+class SchemaRegistry:
+    """Fetch each (account, kind, table) entry once per run, optionally cached on disk.
+
+    Concurrent callers asking for the same entry wait for the one fetch in
+    flight instead of sending their own. With a ttl, results are also written
+    to <cache_dir>/<account>/<subdir> and reused by later runs until they expire;
+    every entry stores a content hash so refetches report which tables changed.
+    Failed fetches are remembered for the run, unless the error is retriable,
+    but never written to disk.
+    """
+
+    def __init__(self, config: dict, ttl: int = 0, subdir: str = "schemas") -> None:
+        self.config = config
+        self.account = account_id(config)
+        self.ttl = ttl
+        self.subdir = subdir
+        self._values: Dict[Tuple[str, str], Any] = {}
+        self._errors: Dict[Tuple[str, str], Exception] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.stats = {"fetched": 0, "memory_hits": 0, "disk_hits": 0, "changed": 0}
+
+    def _path(self, kind: str, table: str) -> str:
+        name = re.sub(r"[^\w.-]", "_", f"{kind}-{table}")
+        return os.path.join(cache_dir(self.config, self.subdir), f"{name}.json")
+
+    def _read(self, kind: str, table: str) -> Optional[dict]:
+        if not self.ttl:
+            return None
+        try:
+            with open(self._path(kind, table)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, kind: str, table: str, value: Any, digest: str) -> None:
+        path = self._path(kind, table)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"fetched_at": time.time(), "hash": digest, "value": value}, f)
+        os.replace(tmp_path, path)
+
+    def get(
+        self, kind: str, table: str, fetch: Callable[[], Any], remember_errors: bool = True
+    ) -> Any:
+        """Return the entry for a table, calling fetch() only if no one has it yet."""
+        key = (kind, table)
+        with self._lock_for(key):
+            if key in self._values:
+                self.stats["memory_hits"] += 1
+                return self._values[key]
+            if key in self._errors:
+                raise self._errors[key]
+
+            cached = self._read(kind, table)
+            if cached is not None and time.time() - cached.get("fetched_at", 0) < self.ttl:
+                self.stats["disk_hits"] += 1
+                self._values[key] = cached["value"]
+                return cached["value"]
+
+            try:
+                value = fetch()
+            except Exception as e:
+                if remember_errors and not is_retriable(e):
+                    self._errors[key] = e
+                raise
+            self._store(kind, table, value, cached)
+            return value
+
+    def _store(self, kind: str, table: str, value: Any, cached: Optional[dict]) -> None:
+        self.stats["fetched"] += 1
+        self._values[(kind, table)] = value
+        if self.ttl:
+            digest = content_hash(value)
+            if cached is not None and cached.get("hash") != digest:
+                self.stats["changed"] += 1
+                logger.info(f"Metadata for {kind} {table} changed since it was cached")
+            self._write(kind, table, value, digest)
+
+    def _lock_for(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def has(self, kind: str, table: str) -> bool:
+        """Return True if the entry is known for this run or fresh in the disk cache."""
+        key = (kind, table)
+        if key in self._values or key in self._errors:
+            return True
+        cached = self._read(kind, table)
+        return cached is not None and time.time() - cached.get("fetched_at", 0) < self.ttl
+
+    def put(self, kind: str, table: str, value: Any) -> None:
+        """Store an entry fetched together with others, e.g. by a batched request."""
+        with self._lock_for((kind, table)):
+            if (kind, table) not in self._values:
+                self._store(kind, table, value, self._read(kind, table))
+
+    def fail(self, kind: str, table: str, error: Exception) -> None:
+        """Remember for this run that an entry can't be fetched, unless a retry may succeed."""
+        if is_retriable(error):
+            return
+        with self._lock_for((kind, table)):
+            if (kind, table) not in self._values:
+                self._errors[(kind, table)] = error
+
+    def log_stats(self) -> None:
+        if not any(self.stats.values()):
+            return
+        logger.info(
+            f"Cached {self.subdir} for {self.account}: {self.stats['fetched']} fetched "
+            f"({self.stats['changed']} changed), {self.stats['disk_hits']} from disk cache, "
+            f"{self.stats['memory_hits']} shared between streams"
+        )
@@ -0,0 +1,31 @@
+"""Local snapshots of full-table streams, re-emitted when their table didn't change."""
+
+import gzip
+import json
+import os
+from typing import Iterator
+
+
+class SnapshotWriter:
+    """Gzip JSONL file that replaces the previous snapshot once the sync completed."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.rows = 0
+        self._tmp_path = f"{path}.tmp"
+        self._file = gzip.open(self._tmp_path, "wt", encoding="utf-8", compresslevel=6)
+
+    def write(self, record: dict) -> None:
+        self._file.write(json.dumps(record, default=str))
+        self._file.write("\n")
+        self.rows += 1
+
+    def commit(self) -> None:
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+
+def read_snapshot(path: str) -> Iterator[dict]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
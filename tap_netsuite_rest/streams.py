@@ -1,9 +1,12 @@
 """Stream type classes for tap-netsuite-rest."""
 
-from typing import Any, Dict, Optional, Iterable, Tuple
+from typing import Any, Dict, List, Optional, Iterable, Set, Tuple
 import uuid
+import backoff
 import requests
 import base64
+from http.client import RemoteDisconnected
+from concurrent.futures import ThreadPoolExecutor
 
 from hotglue_singer_sdk import typing as th
 
@@ -13,11 +16,14 @@ from tap_netsuite_rest.client import (
     TransactionRootStream,
     BulkParentStream,
     NetsuiteSOAPStream,
+    RetryRequest,
 )
 from hotglue_singer_sdk.helpers.jsonpath import extract_jsonpath
+from tap_netsuite_rest import suiteql
+from tap_netsuite_rest.json_utils import response_json, response_summary
 from datetime import datetime, timedelta
 from pendulum import parse
-from hotglue_singer_sdk.exceptions import FatalAPIError
+from hotglue_singer_sdk.exceptions import FatalAPIError, RetriableAPIError
 
 import os
 job_id = os.environ.get("JOB_ID")
@@ -427,6 +433,7 @@ class TrialBalanceReportStream(NetSuiteStream):
     start_date_f = None
     end_date = None
     primary_keys = ["id"]
+    parquet_partition_key = "posting_period"
 
     schema = th.PropertiesList(
         th.Property("account_type", th.StringType),
@@ -443,9 +450,142 @@ class TrialBalanceReportStream(NetSuiteStream):
         th.Property("debit_amount", th.StringType),
     ).to_dict()
 
+    def _parent_incremental(self) -> bool:
+        return self.name in (self.config.get("parent_incremental_streams") or [])
+
+    def _touched_posting_periods(self, since: str, until: str) -> List[str]:
+        """Return the posting periods of transactions modified in [since, until], oldest first."""
+        time_format = "'YYYY-MM-DD HH24:MI:SS'"
+        periods = []
+        last_id = None
+        while True:
+            # posting is not filtered so that transactions turned non-posting refresh their period too
+            where = (
+                f"Transaction.lastmodifieddate >= TO_TIMESTAMP('{since}', {time_format}) "
+                f"AND Transaction.lastmodifieddate <= TO_TIMESTAMP('{until}', {time_format})"
+            )
+            if last_id is not None:
+                where += f" AND AccountingPeriod.ID > {last_id}"
+            rows = self._suiteql_rows(
+                f"""
+                SELECT
+                    AccountingPeriod.ID AS posting_period,
+                    TO_CHAR(AccountingPeriod.StartDate, 'YYYY-MM-DD') AS start_date
+                FROM Transaction
+                    INNER JOIN AccountingPeriod ON (AccountingPeriod.ID = Transaction.PostingPeriod)
+                WHERE {where}
+                GROUP BY AccountingPeriod.ID, AccountingPeriod.StartDate
+                ORDER BY AccountingPeriod.ID ASC
+                """
+            )
+            periods.extend(rows)
+            if len(rows) < 1000:
+                break
+            last_id = rows[-1]["posting_period"]
+        # paged by id, emitted like the full query orders them
+        periods.sort(key=lambda row: (row["start_date"] or "", int(row["posting_period"])))
+        return [str(row["posting_period"]) for row in periods]
+
+    def _period_request(self, period: str) -> dict:
+        """Snapshot the request of one period's aggregate.
+
+        Built on the main thread, so worker threads only sign and send it and
+        never read or change the stream's query state.
+        """
+        context = {"posting_periods": [period]}
+        return {
+            "method": self.rest_method,
+            "url": self.get_url(context),
+            "params": self.get_url_params(context, None),
+            "headers": dict(self.http_headers),
+            "json": self.prepare_request_payload(context, None),
+        }
+
+    def _period_pages(self, request: dict) -> List[requests.Response]:
+        """Fetch every page of one period's aggregate in a worker thread.
+
+        Transport errors, 5xx and 429 are retried here. Any other failing
+        response ends the period and is returned last, for the main thread to
+        validate; validate_response may change the stream's query.
+        """
+        session = self.get_session()
+
+        @backoff.on_exception(
+            backoff.expo,
+            (
+                RetriableAPIError,
+                requests.exceptions.Timeout,
+                requests.exceptions.ConnectionError,
+                RemoteDisconnected,
+            ),
+            max_tries=10,
+            factor=3,
+        )
+        def send(offset: int) -> requests.Response:
+            prepared_request = session.prepare_request(
+                requests.Request(**dict(request, params=dict(request["params"], offset=offset)))
+            )
+            # not streamed, the body is read under the retry
+            response = session.send(prepared_request, timeout=self.timeout)
+            if 500 <= response.status_code < 600 or response.status_code == 429:
+                raise RetriableAPIError(f"{response.status_code} Server Error: {response.text}")
+            return response
+
+        pages = []
+        offset = 0
+        try:
+            while True:
+                response = send(offset)
+                pages.append(response)
+                if response.status_code != 200 or not response_summary(response).get("hasMore"):
+                    return pages
+                offset += self.page_size
+        finally:
+            session.close()
+
+    def _serial_period_pages(self, period: str) -> Iterable[requests.Response]:
+        """Fetch one period's aggregate through the stream's own request path."""
+        context = {"posting_periods": [period]}
+        send = self.request_decorator(self.make_request)
+        offset = 0
+        while True:
+            response = send(context, offset)
+            yield response
+            if not response_summary(response).get("hasMore"):
+                return
+            offset += self.page_size
+
+    def _request_changed_transaction_pages(self, context: Optional[dict]) -> Iterable[requests.Response]:
+        """Re-aggregate only the posting periods touched by transactions changed in the window.
+
+        Periods are queried concurrently and their pages yielded in period order, so the
+        rows match what the full query returns for those periods.
+        """
+        since, until = self._parent_window
+        periods = self._touched_posting_periods(since, until)
+        self.logger.info(f"[{self.name}] Re-aggregating {len(periods)} posting periods")
+        workers = self.config.get("trial_balance_workers", 4)
+        period_requests = [self._period_request(period) for period in periods]
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for period, pages in zip(periods, executor.map(self._period_pages, period_requests)):
+                if pages[-1].status_code == 200:
+                    yield from pages
+                    continue
+                try:
+                    # raises unless the stream adjusted its query to recover
+                    self.validate_response(pages[-1])
+                except RetryRequest:
+                    pass
+                self.logger.info(f"[{self.name}] Re-fetching posting period {period} after a failed request")
+                yield from self._serial_period_pages(period)
+
     def prepare_request_payload(self, context, next_page_token):
+        period_filter = ""
+        if context and context.get("posting_periods"):
+            periods = ", ".join(f"'{period}'" for period in context["posting_periods"])
+            period_filter = f"AND Transaction.postingperiod IN ({periods})"
         return {
-            "q": """
+            "q": f"""
             SELECT
                 Account.AcctType account_type,
                 Account.displaynamewithhierarchy as account_name,
@@ -475,6 +615,7 @@ class TrialBalanceReportStream(NetSuiteStream):
                         'OthExpense'
                     )
                 )
+                {period_filter}
             GROUP BY
                 Account.AcctType,
                 Account.displaynamewithhierarchy,
@@ -650,9 +791,9 @@ class ClassificationStream(NetSuiteStream):
         th.Property("externalid", th.StringType),
     ).to_dict()
 
-    def request_records(self, context: Optional[dict]) -> Iterable[dict]:
+    def _request_pages(self, context: Optional[dict]) -> Iterable[requests.Response]:
         try:
-            yield from super().request_records(context)
+            yield from super()._request_pages(context)
         except Exception as e:
             if "Record 'classification' was not found" in str(e):
                 self.logger.warning(
@@ -707,6 +848,7 @@ class ProfitLossReportStream(NetSuiteStream):
     start_date_f = None
     end_date = None
     primary_keys = ["id"]
+    parquet_partition_key = "postingperiod"
     select = """
         Entity.altname as name, Entity.firstname, Entity.lastname, Subsidiary.fullname as subsidiary, Transaction.tranid, Transaction.externalid, Transaction.abbrevtype as TransactionType, Transaction.postingperiod, Transaction.memo, Transaction.journaltype, Account.accountsearchdisplayname as split, Account.displaynamewithhierarchy as Categories, AccountingPeriod.PeriodName, TO_CHAR (AccountingPeriod.StartDate, 'YYYY-MM-DD HH24:MI:SS') as StartDate, Account.AcctType, TO_CHAR (Transaction.TranDate, 'YYYY-MM-DD HH24:MI:SS') as Date, Account.acctnumber as Num, TransactionLine.amount, Department.name as department, CONCAT(CONCAT(Transaction.id, '_'), TransactionLine.id) as id
         """
@@ -746,14 +888,15 @@ class ProfitLossReportStream(NetSuiteStream):
 
     def get_next_page_token(self, response, previous_token):
         """Return a token for identifying next page or None if no more pages."""
-        has_next = next(extract_jsonpath("$.hasMore", response.json()))
-        offset = next(extract_jsonpath("$.offset", response.json()))
+        summary = response_summary(response)
+        has_next = next(extract_jsonpath("$.hasMore", summary))
+        offset = next(extract_jsonpath("$.offset", summary))
         offset += self.page_size
 
         if has_next:
             return offset
 
-        totalResults = next(extract_jsonpath("$.totalResults", response.json()))
+        totalResults = next(extract_jsonpath("$.totalResults", summary))
 
         if offset >= totalResults:
             self.query_date = (parse(self.end_date) + timedelta(1)).replace(tzinfo=None)
@@ -786,6 +929,33 @@ class GeneralLedgerReportStream(ProfitLossReportStream):
     join = "INNER JOIN TransactionLine ON (TransactionLine.transaction = Transaction.id) INNER JOIN TransactionAccountingLine ON (TransactionAccountingLine.Transaction = Transaction.id AND TransactionAccountingLine.TransactionLine = TransactionLine.id) LEFT JOIN AccountingBook ON AccountingBook.id = TransactionAccountingLine.accountingBook LEFT JOIN department ON (TransactionLine.department = department.id) INNER JOIN Account ON (Account.id = TransactionAccountingLine.account) INNER JOIN AccountingPeriod ON (AccountingPeriod.id = Transaction.postingperiod) LEFT JOIN Entity AS HeaderEntity ON (Transaction.entity = HeaderEntity.id) LEFT JOIN Entity AS LineEntity ON (TransactionLine.entity = LineEntity.id) LEFT JOIN subsidiary ON (Transactionline.subsidiary = Subsidiary.id) INNER JOIN Currency ON (Currency.ID = Subsidiary.Currency) LEFT JOIN Classification ON (Transactionline.class = Classification.id) LEFT JOIN Location ON (Transactionline.location = Location.id) LEFT JOIN Employee ON (Transaction.employee = Employee.id)"
     order_by = "ORDER BY Transaction.id ASC, TransactionLine.id ASC, TransactionAccountingLine.accountingBook ASC"
     replication_key = "postingdate"
+    parent_transaction_column = "id"
+    _changed_transaction_ids_filter = None
+    _dimensions = None
+
+    # with gl_resolve_dimensions the query selects foreign keys only and names are
+    # filled in from the tap's lookup cache
+    resolved_select = "TransactionAccountingLine.account as accountid, COALESCE(HeaderEntity.altname, LineEntity.altname) as name, COALESCE(HeaderEntity.firstname, LineEntity.firstname) as firstname, COALESCE(HeaderEntity.lastname, LineEntity.lastname) as lastname, COALESCE(HeaderEntity.id, LineEntity.id) as entityid, COALESCE(HeaderEntity.Type, LineEntity.Type) as entitytype, (Transaction.id || '_' || TransactionLine.id) AS id, Transaction.tranid, Transaction.externalid, Transaction.abbrevtype as transactiontype, TO_CHAR(Transaction.TranDate, 'YYYY-MM-DD HH24:MI:SS') as date, Transaction.transactionnumber, Transaction.trandisplayname, Transaction.memo as memo, Transaction.journaltype, TransactionLine.memo as linememo, TransactionAccountingLine.accountingBook as accountingbook, CASE WHEN TransactionAccountingLine.credit IS NOT NULL THEN 'Credit' ELSE 'Debit' END entrytype, TransactionAccountingLine.amount, TransactionAccountingLine.credit creditamount, TransactionAccountingLine.debit debitamount, TransactionLine.department as departmentid, TransactionLine.location as locationid, Transaction.currency as transactioncurrencyid, TransactionAccountingLine.exchangeRate as exchangerate, TransactionLine.subsidiary as subsidiaryid, TransactionLine.class as classid, CASE WHEN Transaction.TranDate BETWEEN AccountingPeriod.StartDate AND AccountingPeriod.EndDate THEN TO_CHAR(Transaction.TranDate, 'YYYY-MM-DD HH24:MI:SS') ELSE TO_CHAR(AccountingPeriod.StartDate, 'YYYY-MM-DD HH24:MI:SS') END AS postingDate, Transaction.postingperiod, AccountingPeriod.periodname, TO_CHAR(AccountingPeriod.StartDate, 'YYYY-MM-DD HH24:MI:SS') as startdate, TO_CHAR(AccountingPeriod.EndDate, 'YYYY-MM-DD HH24:MI:SS') as enddate, Transaction.employee as employeeid"
+    resolved_join = "INNER JOIN TransactionLine ON (TransactionLine.transaction = Transaction.id) INNER JOIN TransactionAccountingLine ON (TransactionAccountingLine.Transaction = Transaction.id AND TransactionAccountingLine.TransactionLine = TransactionLine.id) INNER JOIN AccountingPeriod ON (AccountingPeriod.id = Transaction.postingperiod) LEFT JOIN Entity AS HeaderEntity ON (Transaction.entity = HeaderEntity.id) LEFT JOIN Entity AS LineEntity ON (TransactionLine.entity = LineEntity.id)"
+    # (table, id field, {field: table column}, whether the id itself came from the joined table)
+    dimension_fields = [
+        ("account", "accountid", {"split": "accountsearchdisplayname", "categories": "displaynamewithhierarchy", "accttype": "accttype", "num": "acctnumber"}, True),
+        ("department", "departmentid", {"department": "fullname"}, True),
+        ("classification", "classid", {"class": "name"}, True),
+        ("location", "locationid", {"locationname": "name"}, False),
+        ("subsidiary", "subsidiaryid", {"subsidiary": "fullname", "currencyid": "currency"}, False),
+        ("currency", "currencyid", {"currency": "name", "currencysymbol": "symbol"}, True),
+        ("employee", "employeeid", {"employee": "entityid"}, False),
+    ]
+
+    def __init__(self, tap, *args, **kwargs):
+        if tap.config.get("gl_resolve_dimensions"):
+            self.select = self.resolved_select
+            self.join = self.resolved_join
+            if tap.config.get("gl_use_only_primary_accounting_book"):
+                # the primary book filter needs the table
+                self.join += " LEFT JOIN AccountingBook ON AccountingBook.id = TransactionAccountingLine.accountingBook"
+        super().__init__(tap, *args, **kwargs)
 
 
     entities_fallback = [
@@ -830,16 +1000,33 @@ class GeneralLedgerReportStream(ProfitLossReportStream):
     def gl_use_only_primary_accounting_book(self):
         return self.config.get("gl_use_only_primary_accounting_book", False)
 
+    def _parent_incremental(self) -> bool:
+        return super()._parent_incremental() and not self.config.get("gl_full_sync")
+
+    def _request_changed_transaction_pages(self, context: Optional[dict]) -> Iterable[requests.Response]:
+        """Yield every GL line of the transactions changed in the window, whatever their posting date."""
+        since, until = self._parent_window
+        try:
+            for ids in self._changed_transaction_ids(since, until):
+                ids = ", ".join(ids)
+                self._changed_transaction_ids_filter = f"Transaction.id IN ({ids})"
+                yield from self._request_query_pages(context)
+        finally:
+            self._changed_transaction_ids_filter = None
+
     @property
     def custom_filter(self):
-        _filter = (
-            "( CASE WHEN Transaction.TranDate BETWEEN AccountingPeriod.StartDate "
-            "AND AccountingPeriod.EndDate THEN Transaction.TranDate "
-            "ELSE AccountingPeriod.StartDate END "
-            "BETWEEN TO_DATE( '{start_date}', 'YYYY-MM-DD' ) "
-            "AND TO_DATE( '{end_date}', 'YYYY-MM-DD' ) ) "
-            "AND ( Transaction.Posting = 'T' ) AND TransactionAccountingLine.amount != 0"
-        )
+        if self._changed_transaction_ids_filter:
+            _filter = self._changed_transaction_ids_filter
+        else:
+            _filter = (
+                "( CASE WHEN Transaction.TranDate BETWEEN AccountingPeriod.StartDate "
+                "AND AccountingPeriod.EndDate THEN Transaction.TranDate "
+                "ELSE AccountingPeriod.StartDate END "
+                "BETWEEN TO_DATE( '{start_date}', 'YYYY-MM-DD' ) "
+                "AND TO_DATE( '{end_date}', 'YYYY-MM-DD' ) )"
+            )
+        _filter += " AND ( Transaction.Posting = 'T' ) AND TransactionAccountingLine.amount != 0"
 
 
         if self.gl_use_only_primary_accounting_book():
@@ -855,12 +1042,16 @@ class GeneralLedgerReportStream(ProfitLossReportStream):
         When the window is exhausted, advances query_date by one day and returns it as the token to trigger a new window.
         Returns None when all windows are done.
         """
-        data = response.json()
+        data = response_summary(response)
         has_next = next(extract_jsonpath("$.hasMore", data))
 
         if has_next:
             return self._id_cursor_from_last_item(data.get("items", []))
 
+        if self._changed_transaction_ids_filter:
+            # the batch of changed transactions is done, there are no date windows to advance
+            return None
+
         self.query_date = (parse(self.end_date) + timedelta(1)).replace(tzinfo=None)
         report_end_date = (
             parse(self.config.get("report_end_date")).replace(tzinfo=None)
@@ -893,9 +1084,38 @@ TransactionAccountingLine.accountingBook) and uniquely identifies a row, since.
         """Always fetch from offset 0; pagination position is encoded in the WHERE clause."""
         return {"offset": 0, "limit": self.page_size}
 
+    def _selected_columns(self) -> Set[str]:
+        """Return the selected properties plus the columns pagination and post_process rely on."""
+        # the resolved selection, properties are usually only selected by default
+        selected = {
+            key[1]
+            for key, is_selected in self.mask.items()
+            if len(key) == 2 and key[0] == "properties" and is_selected
+        }
+        selected.update(["id", "accountingbook", self.replication_key], self.primary_keys or [])
+        if self.config.get("gl_resolve_dimensions"):
+            # foreign keys cost no join and _resolve_dimensions needs them
+            selected.update(id_field for _, id_field, _, _ in self.dimension_fields)
+        for scriptid in self.custom_segment_field_scriptids or []:
+            if f"custom_segment_{scriptid}" in selected:
+                selected.add(f"{scriptid}_value_id")
+        return selected
+
+    def _pruned_query_parts(self) -> Tuple[str, str]:
+        """Return the SELECT and JOIN clauses reduced to the selected columns."""
+        expressions = suiteql.selected_expressions(self.select, self._selected_columns())
+        texts = expressions + [self.custom_filter, self.order_by]
+        joins = suiteql.prune_joins(suiteql.split_joins(self.join), texts)
+        return ", ".join(expressions), " ".join(joins)
+
     def prepare_request_payload(self, context, next_page_token):
         """Inject the ID cursor into the query WHERE clause when paginating within a window."""
-        payload = super().prepare_request_payload(context, next_page_token)
+        select, join = self.select, self.join
+        self.select, self.join = self._pruned_query_parts()
+        try:
+            payload = super().prepare_request_payload(context, next_page_token)
+        finally:
+            self.select, self.join = select, join
         if isinstance(next_page_token, tuple):
             payload["q"] = self._inject_id_cursor(payload["q"], next_page_token)
         return payload
@@ -932,6 +1152,9 @@ TransactionAccountingLine.accountingBook) and uniquely identifies a row, since.
 
         The `customsegment` list can succeed while line-level fields still fail (role, GL impact, etc.).
         """
+        usable = self._tap.capability_profile.get("custom_segments", scriptid)
+        if usable is not None:
+            return usable
         q = (
             f"SELECT TOP 1 TransactionLine.{scriptid}, "
             f"BUILTIN.DF(TransactionLine.{scriptid}) "
@@ -949,44 +1172,38 @@ TransactionAccountingLine.accountingBook) and uniquely identifies a row, since.
         prepared_req.headers.update({"Content-Type": "application/json"})
         probe = session.send(prepared_req, timeout=self.timeout)
         if probe.status_code == 200:
+            self._tap.capability_profile.set("custom_segments", scriptid, True)
             return True
         self.logger.debug(
             f"SuiteQL probe failed for TransactionLine.{scriptid} "
             f"(status={probe.status_code}): {probe.text[:800]}"
         )
+        if probe.status_code == 400:
+            self._tap.capability_profile.set("custom_segments", scriptid, False)
         return False
 
     def get_custom_segment_fields_scriptids(self):
         if self.custom_segment_field_scriptids is None:
             custom_segment_fields = []
+            if self._tap.capability_profile.get("features", "customsegment") is False:
+                self.custom_segment_field_scriptids = []
+                return self.custom_segment_field_scriptids
             try:
                 self.logger.info(f"Getting custom segments for stream: {self.name}")
 
-                s = self.get_session()
-                prepared_req = s.prepare_request(
-                    requests.Request(
-                        method="POST",
-                        url=f"{self.url_base}?limit=1000",
-                        headers=self.http_headers,
-                        json={
-                            "q": "SELECT name, scriptid FROM customsegment"
-                        }
+                raw_fields = self._tap.lookups.custom_segments(self)
+                if raw_fields is None:
+                    self.logger.warning(
+                        "Custom Segments are not queryable in SuiteQL for this account "
+                        "(feature disabled, role permissions, or sandbox limits). "
+                        "general_ledger_report will sync without custom segment columns."
                     )
-                )
-                prepared_req.headers.update({"Content-Type": "application/json"})
-                response = s.send(prepared_req, timeout=self.timeout)
-                if response.status_code == 400:
-                    body = response.text or ""
-                    if "record 'customsegment' was not found" in body.lower():
-                        self.logger.warning(
-                            "Custom Segments are not queryable in SuiteQL for this account "
-                            "(feature disabled, role permissions, or sandbox limits). "
-                            "general_ledger_report will sync without custom segment columns."
-                        )
-                        self.custom_segment_field_scriptids = []
-                        return self.custom_segment_field_scriptids
-                response.raise_for_status()
-                raw_fields = response.json().get("items", [])
+                    self._tap.capability_profile.set("features", "customsegment", False)
+                    self.custom_segment_field_scriptids = []
+                    return self.custom_segment_field_scriptids
+                # the lookup rows are shared, don't change them in place
+                raw_fields = [dict(cs_field) for cs_field in raw_fields]
+                s = self.get_session()
                 for cs_field in raw_fields:
                     # make it lowercase because we'll use it as db field name
                     # and the db will return it lowercase, if it's not lowercase
@@ -1070,7 +1287,46 @@ TransactionAccountingLine.accountingBook) and uniquely identifies a row, since.
         
         return properties_list.to_dict()
 
+    def _dimension_values(self) -> Dict[str, Optional[Dict[str, dict]]]:
+        """Return the lookup tables the rows are resolved against, read from the cache once."""
+        if self._dimensions is None:
+            self._dimensions = {
+                table: self._tap.lookups.table(table, self)
+                for table, _, _, _ in self.dimension_fields
+            }
+        return self._dimensions
+
+    def _resolve_dimensions(self, row: dict) -> Optional[dict]:
+        """Fill in the columns the full query reads through joins, or None if it would drop the row."""
+        dimensions = self._dimension_values()
+        for table, id_field, fields, joined_id in self.dimension_fields:
+            values = dimensions[table]
+            if values is None:
+                # same columns as with the matching entities_fallback
+                if joined_id:
+                    row.pop(id_field, None)
+                continue
+            found = values.get(str(row[id_field])) if row.get(id_field) is not None else None
+            if found is None:
+                if table == "account":
+                    return None
+                if table == "currency" and dimensions["subsidiary"] is not None:
+                    # the full query inner joins the subsidiary currency
+                    return None
+                if joined_id:
+                    row.pop(id_field, None)
+                continue
+            for field, column in fields.items():
+                if found.get(column) is not None:
+                    row[field] = found[column]
+        return row
+
     def post_process(self, row: dict, context: Optional[dict] = None) -> Optional[dict]:
+        if self.config.get("gl_resolve_dimensions"):
+            row = self._resolve_dimensions(row)
+            if row is None:
+                return None
+
         if self.custom_segment_field_scriptids:
             for cs_field_scriptid in self.custom_segment_field_scriptids:
                 # if the value id is not present, remove the custom segment name from the row
@@ -1300,6 +1556,7 @@ class TransactionAccountingLinesStream(NetSuiteStream):
     name = "transaction_accounting_lines"
     select = "*"
     replication_key = None
+    parent_transaction_column = "transaction"
 
     schema = th.PropertiesList(
         th.Property("account", th.StringType),
@@ -1420,31 +1677,6 @@ class SubsidiariesStream(BulkParentStream):
             else [],
         }
 
-    def _suiteql_first_row(self, q: str) -> Optional[Dict[str, Any]]:
-        """Run SuiteQL and return the first row, or None on failure / empty."""
-        session = self.get_session()
-        prepared_req = session.prepare_request(
-            requests.Request(
-                method="POST",
-                url=f"{self.url_base}?limit=1",
-                headers=self.http_headers,
-                json={"q": q},
-            )
-        )
-        prepared_req.headers.update({"Content-Type": "application/json"})
-        response = session.send(prepared_req, timeout=self.timeout)
-        if response.status_code != 200:
-            self.logger.debug(
-                "SuiteQL probe returned %s: %s",
-                response.status_code,
-                (response.text or "")[:500],
-            )
-            return None
-        items = response.json().get("items") or []
-        if not items:
-            return None
-        return {k.lower(): v for k, v in items[0].items()}
-
     def _non_oneworld_subsidiary_placeholder_row(self) -> Dict[str, Any]:
         """Subsidiary list is unavailable; infer id/name from lines and currency from transactions."""
         row: Dict[str, Any] = {
@@ -1464,11 +1696,22 @@ class SubsidiariesStream(BulkParentStream):
             row["name"] = "Parent Subsidiary"
             row["fullname"] = "Parent Subsidiary"
 
-        q = "SELECT currency, BUILTIN.DF(currency) AS currencyname FROM Transaction WHERE currency IS NOT NULL"
+        q = "SELECT currency FROM Transaction WHERE currency IS NOT NULL"
         txn_row = self._suiteql_first_row(q)
         if txn_row:
             row["currency"] = str(txn_row["currency"])
-            row["currencyname"] = txn_row["currencyname"]
+            try:
+                currency = (self._tap.lookups.currencies(self) or {}).get(row["currency"])
+            except Exception as e:
+                self.logger.debug(f"Currency lookup failed: {e}")
+                currency = None
+            if currency:
+                row["currencyname"] = currency.get("name")
+            else:
+                df_row = self._suiteql_first_row(
+                    f"SELECT BUILTIN.DF(currency) AS currencyname FROM Transaction WHERE currency = {row['currency']}"
+                )
+                row["currencyname"] = df_row["currencyname"] if df_row else None
         else:
             row["currency"] = "1"
             row["currencyname"] = "US Dollar"
@@ -1476,6 +1719,10 @@ class SubsidiariesStream(BulkParentStream):
         return row
 
     def request_records(self, context: Optional[dict]) -> Iterable[dict]:
+        if self._tap.capability_profile.get("features", "oneworld") is False:
+            self.logger.info("OneWorld is not enabled for this account (capability profile), inferring the subsidiary row")
+            yield self._non_oneworld_subsidiary_placeholder_row()
+            return
         try:
             yield from super().request_records(context)
         except Exception as e:
@@ -1486,6 +1733,7 @@ class SubsidiariesStream(BulkParentStream):
                     "so the subsidiary record type is not available in SuiteQL. "
                     "Emitting one inferred row from TransactionLine / Transaction."
                 )
+                self._tap.capability_profile.set("features", "oneworld", False)
                 yield self._non_oneworld_subsidiary_placeholder_row()
                 return
             raise
@@ -1715,6 +1963,7 @@ class SalesInvoicedStream(NetSuiteStream):
     name = "sales_invoiced"
     primary_keys = ["id"]
     table = "salesinvoiced"
+    parent_transaction_column = "transaction"
 
     schema = th.PropertiesList(
         th.Property("account", th.StringType),
@@ -1747,6 +1996,7 @@ class SalesOrderedStream(NetSuiteStream):
     name = "sales_ordered"
     primary_keys = ["id"]
     table = "salesordered"
+    parent_transaction_column = "transaction"
 
     schema = th.PropertiesList(
         th.Property("account", th.StringType),
@@ -2375,7 +2625,7 @@ class BillAttachmentsRestletStream(NetsuiteDynamicStream):
         }
 
     def parse_response(self, response: requests.Response) -> Iterable[dict]:
-        data = response.json()
+        data = response_json(response)
         self._current_download_token = data.get("download_token")
         for item in data.get("items", []):
             yield item
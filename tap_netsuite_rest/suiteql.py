@@ -0,0 +1,71 @@
+"""Helpers to take hand-written SuiteQL SELECT and JOIN clauses apart."""
+
+import re
+from typing import Iterable, List, Set
+
+
+JOIN_RE = re.compile(r"\b(INNER|LEFT)\s+JOIN\b", re.IGNORECASE)
+JOIN_NAME_RE = re.compile(r"^\s*(?:INNER|LEFT)\s+JOIN\s+(\w+)(?:\s+AS)?(?:\s+(?!ON\b)(\w+))?", re.IGNORECASE)
+
+
+def split_select(select: str) -> List[str]:
+    """Split a SELECT list on its top-level commas, ignoring those in parentheses or strings."""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, char in enumerate(select):
+        if char == "'":
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(select[start:i].strip())
+            start = i + 1
+    parts.append(select[start:].strip())
+    return [part for part in parts if part]
+
+
+def select_alias(expression: str) -> str:
+    """Return the lowercase column name a SELECT expression comes back as."""
+    last = expression.split()[-1]
+    return last.split(".")[-1].lower()
+
+
+def split_joins(join: str) -> List[str]:
+    """Split a JOIN clause into one clause per joined table."""
+    starts = [match.start() for match in JOIN_RE.finditer(join)]
+    return [join[start:end].strip() for start, end in zip(starts, starts[1:] + [len(join)])]
+
+
+def join_name(join: str) -> str:
+    """Return the alias, or table name, a JOIN clause is referenced by."""
+    match = JOIN_NAME_RE.match(join)
+    return match.group(2) or match.group(1)
+
+
+def references(name: str, texts: Iterable[str]) -> bool:
+    pattern = re.compile(rf"\b{re.escape(name)}\.", re.IGNORECASE)
+    return any(pattern.search(text) for text in texts)
+
+
+def prune_joins(joins: List[str], texts: List[str]) -> List[str]:
+    """Drop LEFT JOINs nothing in texts or in the remaining joins refers to.
+
+    INNER JOINs are kept since they can filter rows. Joins only refer to tables
+    joined before them, so walking the list backwards settles it in one pass.
+    """
+    kept: List[str] = []
+    for join in reversed(joins):
+        if JOIN_RE.match(join).group(1).upper() == "INNER":
+            kept.append(join)
+            continue
+        on_clauses = [j.split(" ON ", 1)[-1] for j in kept]
+        if references(join_name(join), texts + on_clauses):
+            kept.append(join)
+    return list(reversed(kept))
+
+
+def selected_expressions(select: str, aliases: Set[str]) -> List[str]:
+    return [expression for expression in split_select(select) if select_alias(expression) in aliases]
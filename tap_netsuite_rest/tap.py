@@ -1,21 +1,38 @@
 """NetSuite tap class."""
 
-from typing import List, Optional, Union, Dict, Type
+from typing import List, Optional, Set, Union, Dict, Type
 from pathlib import PurePath
 
 from hotglue_singer_sdk import Stream, Tap
 from hotglue_singer_sdk import typing as th  # JSON schema typing helpers
 from hotglue_singer_sdk.helpers.capabilities import AlertingLevel
 from hotglue_singer_sdk.helpers._compat import final
+from hotglue_singer_sdk.exceptions import ConfigValidationError, RetriableAPIError
+import singer
+from singer.messages import Message, RecordMessage, SchemaMessage, StateMessage
 
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+import importlib.util
+import sys
 import inspect 
+import time
 import requests
 
-from tap_netsuite_rest import streams
-from tap_netsuite_rest.client_soap import NetsuiteSOAPClient
+from tap_netsuite_rest import json_utils, streams
+from tap_netsuite_rest.batch import BatchManager
+from tap_netsuite_rest.capabilities import CapabilityProfile
+from tap_netsuite_rest.cache import cache_dir
+from tap_netsuite_rest.change_store import RecordHashStore
+from tap_netsuite_rest.lookups import LookupCache
+from tap_netsuite_rest.schema_registry import SchemaRegistry
+from tap_netsuite_rest.writer import SingerWriter
 import os
 import logging
 
+# cold start is measured from the moment the tap module is imported
+IMPORTED_AT = time.monotonic()
+
 # When a new stream is added or changes in the tap, it would break all existing test suites due to dynamic discover.
 # By allowing caller to include only streams we need we are able to ensure existing tests continue to pass.
 # 1. Get the environment variable INCLUDE_STREAMS and split by commas
@@ -27,6 +44,16 @@ ignore_streams = os.environ.get('IGNORE_STREAMS', "").split(',') if os.environ.g
 logging.info("IGNORE_STREAMS: "+ os.environ.get('IGNORE_STREAMS', ''))
 
 
+# taps whose output sync_all hasn't closed, closed at exit as a fallback (e.g. after discovery)
+_open_taps: Set["TapNetSuite"] = set()
+
+
+@atexit.register
+def _close_open_taps() -> None:
+    for tap in list(_open_taps):
+        tap.close()
+
+
 def get_bill_attachments_stream(config):
     if 'bill_attachments_restlet_url' in config \
         and 'bill_attachments_suitelet_url' in config:
@@ -35,12 +62,40 @@ def get_bill_attachments_stream(config):
     return streams.BillAttachmentsSOAPStream
 
 
+def selected_stream_names(catalog) -> Optional[Set[str]]:
+    """Return the names of the streams selected in a catalog, or None without one."""
+    if not catalog:
+        return None
+    return {
+        entry.tap_stream_id
+        for entry in catalog.streams
+        if entry.metadata.resolve_selection()[()]
+    }
+
+
+def with_parents(stream_classes, selected):
+    """Add the parents of selected stream classes, which have to run for their children."""
+    names = set(selected)
+    by_name = {cls.name: cls for cls in stream_classes}
+    for name in selected:
+        cls = by_name.get(name)
+        while cls is not None and cls.parent_stream_type is not None:
+            cls = cls.parent_stream_type
+            names.add(cls.name)
+    return names
+
+
 # Function to filter streams to be tested
-def streams_to_sync(self, include_streams, ignore_streams):
-    stream_types = []
+def streams_to_sync(self, include_streams, ignore_streams, selected=None):
+    """Instantiate the tap streams.
+
+    With `selected` only those stream names (and their parents) are created, so a
+    sync of a few streams doesn't build the ~150 others and their schemas.
+    """
+    stream_classes = []
 
     if not ((include_streams and 'BillAttachmentsStream' not in include_streams) or 'BillAttachmentsStream' in ignore_streams):
-        stream_types.append(get_bill_attachments_stream(self.config)(self))
+        stream_classes.append(get_bill_attachments_stream(self.config))
 
     for name, cls in inspect.getmembers(streams, inspect.isclass):
         if cls.__module__ == 'tap_netsuite_rest.streams':
@@ -48,8 +103,16 @@ def streams_to_sync(self, include_streams, ignore_streams):
                 continue
             if (include_streams and name not in include_streams) or name in ignore_streams:
                 continue
-            stream_types.append(cls(self))
-    return stream_types
+            stream_classes.append(cls)
+
+    if selected is not None:
+        wanted = with_parents(stream_classes, selected)
+        self.logger.info(
+            f"Instantiating {len([c for c in stream_classes if c.name in wanted])} "
+            f"of {len(stream_classes)} streams selected in the catalog"
+        )
+        stream_classes = [cls for cls in stream_classes if cls.name in wanted]
+    return [cls(self) for cls in stream_classes]
 
 class TapNetSuite(Tap):
     """NetSuite tap class."""
@@ -81,6 +144,202 @@ class TapNetSuite(Tap):
             default=True,
             description="When true, omit streams from catalog discover if a SuiteQL probe against the stream table fails.",
         ),
+        th.Property(
+            "infer_numeric_types",
+            th.BooleanType,
+            default=False,
+            description="When a table's schema is inferred from sampled rows, type fields whose values are all integers or decimals as integer or number instead of string. Primary and replication keys stay as they are.",
+        ),
+        th.Property(
+            "capability_profile_ttl",
+            th.IntegerType,
+            default=0,
+            description="Seconds the account capability profile (inaccessible tables, invalid fields, query fallbacks, custom segments, OneWorld) is reused from cache_dir, so later runs skip the requests that discovered them. It is rebuilt when the credentials or tap version change. 0 disables it.",
+        ),
+        th.Property(
+            "metadata_batch_size",
+            th.IntegerType,
+            default=50,
+            description="Number of record types whose metadata-catalog schemas are requested together during discovery. 1 requests them one table at a time.",
+        ),
+        th.Property(
+            "discovery_workers",
+            th.IntegerType,
+            default=8,
+            description="Number of threads probing table access and fetching schemas concurrently during discovery.",
+        ),
+        th.Property(
+            "probe_group_size",
+            th.IntegerType,
+            default=25,
+            description="Number of tables whose access is checked by a single combined SuiteQL query during discovery. Failing groups are split in half until the inaccessible tables are found. 1 probes every table separately.",
+        ),
+        th.Property(
+            "transform_pool_streams",
+            th.ArrayType(th.StringType),
+            description="Streams whose type conversion and record serialization run in a pool of worker processes. Streams with selected children, custom parsing or stream maps fall back to the regular sync.",
+        ),
+        th.Property(
+            "transform_pool_workers",
+            th.IntegerType,
+            description="Number of worker processes used by transform_pool_streams. Defaults to the CPU count.",
+        ),
+        th.Property(
+            "raw_passthrough",
+            th.BooleanType,
+            default=True,
+            description="When true, streams whose selected fields need no type conversion (other than date-time normalization) are written straight from the response without the per-record SDK processing.",
+        ),
+        th.Property(
+            "json_backend",
+            th.StringType,
+            default="auto",
+            description="JSON decoder used for API responses: auto, orjson or json. auto uses orjson when it is installed and falls back to the standard library.",
+        ),
+        th.Property(
+            "stream_json_pages",
+            th.BooleanType,
+            default=False,
+            description="When true and ijson is installed, SuiteQL pages are parsed while they download and records are yielded one at a time instead of decoding the whole page first.",
+        ),
+        th.Property(
+            "dedup_store",
+            th.StringType,
+            default="set",
+            description="How primary keys are remembered to drop duplicated records: set (every key in memory), window (only keys near the current replication key value), integer (compressed buckets for numeric and two-part numeric ids) or disk (temporary SQLite database).",
+        ),
+        th.Property(
+            "dedup_window_seconds",
+            th.IntegerType,
+            default=3600,
+            description="With dedup_store=window, how far behind the newest replication key value keys are kept.",
+        ),
+        th.Property(
+            "buffered_output",
+            th.BooleanType,
+            default=False,
+            description="When true, Singer messages are serialized and written to stdout in large chunks by a background thread, and STATE messages are coalesced per flush.",
+        ),
+        th.Property(
+            "output_flush_interval",
+            th.NumberType,
+            default=1.0,
+            description="With buffered_output, the maximum number of seconds messages stay buffered before being written.",
+        ),
+        th.Property(
+            "batch_streams",
+            th.ArrayType(th.StringType),
+            description="Streams whose records are written to gzip-compressed JSONL files announced with Singer BATCH messages instead of RECORD messages on stdout.",
+        ),
+        th.Property(
+            "batch_dir",
+            th.StringType,
+            default="batches",
+            description="Directory where batch files are written.",
+        ),
+        th.Property(
+            "batch_max_rows",
+            th.IntegerType,
+            default=1000000,
+            description="Rotate a batch file after this many records.",
+        ),
+        th.Property(
+            "batch_max_bytes",
+            th.IntegerType,
+            default=268435456,
+            description="Rotate a batch file after this many uncompressed bytes.",
+        ),
+        th.Property(
+            "parquet_streams",
+            th.ArrayType(th.StringType),
+            description="Streams (e.g. general_ledger_report, profit_loss_report, trial_balance_report) written as Parquet files partitioned by posting period and announced with Singer BATCH messages. Requires pyarrow (the parquet extra).",
+        ),
+        th.Property(
+            "parquet_dir",
+            th.StringType,
+            default="parquet",
+            description="Directory where Parquet files are written.",
+        ),
+        th.Property(
+            "parquet_row_group_size",
+            th.IntegerType,
+            default=100000,
+            description="Number of rows buffered per partition before a Parquet row group is written.",
+        ),
+        th.Property(
+            "parquet_max_open_files",
+            th.IntegerType,
+            default=64,
+            description="Maximum number of Parquet partition files a stream keeps open. Writing to another partition closes the least recently written one; a partition seen again gets a new part file.",
+        ),
+        th.Property(
+            "cache_dir",
+            th.StringType,
+            description="Directory for the tap's persistent local caches. Defaults to ~/.cache/tap-netsuite-rest.",
+        ),
+        th.Property(
+            "suppress_unchanged_streams",
+            th.ArrayType(th.StringType),
+            description="Streams (typically full-table ones such as accounts or currencies) for which only new or changed records are emitted, based on record hashes kept in a local SQLite file under cache_dir.",
+        ),
+        th.Property(
+            "report_deleted_records",
+            th.BooleanType,
+            default=False,
+            description="With suppress_unchanged_streams, emit a record with _sdc_deleted_at for primary keys that disappeared from a full-table stream.",
+        ),
+        th.Property(
+            "auto_incremental",
+            th.BooleanType,
+            default=False,
+            description="When true, discovery makes full-table streams whose table has a lastmodifieddate or lastmodified column incremental on it. The catalog carries the replication key, so syncs with an older catalog keep their full-table behavior. The first incremental sync of a promoted stream still reads the whole table.",
+        ),
+        th.Property(
+            "parent_incremental_streams",
+            th.ArrayType(th.StringType),
+            description="Transaction-derived streams without a timestamp of their own (transaction_accounting_lines, sales_invoiced, sales_ordered) that, once they have a bookmark, only read rows of transactions whose lastmodifieddate changed since the last sync. general_ledger_report reads every line of those transactions, whatever their posting date, instead of re-reading the last report_periods months (lines removed from a transaction or deleted transactions aren't reported), unless gl_full_sync is set. trial_balance_report re-aggregates only the posting periods of those transactions instead; rows of periods a transaction was moved out of or deleted from aren't refreshed. The bookmark is the newest transaction lastmodifieddate seen when the sync started.",
+        ),
+        th.Property(
+            "parent_incremental_batch_size",
+            th.IntegerType,
+            default=500,
+            description="With parent_incremental_streams, number of changed transaction ids whose rows are fetched per query.",
+        ),
+        th.Property(
+            "trial_balance_workers",
+            th.IntegerType,
+            default=4,
+            description="With trial_balance_report in parent_incremental_streams, number of posting periods re-aggregated concurrently.",
+        ),
+        th.Property(
+            "gl_resolve_dimensions",
+            th.BooleanType,
+            default=False,
+            description="Select only foreign keys in the general_ledger_report query and fill in account, department, class, location, subsidiary, currency and employee names from the lookup cache (see lookup_cache_ttl). Entity names are still joined in the query.",
+        ),
+        th.Property(
+            "fingerprint_skip_streams",
+            th.ArrayType(th.StringType),
+            description="Full-table reference streams (e.g. currencies, accounting_periods) that are skipped when a cheap query of their row count, latest lastmodifieddate and highest id returns the same fingerprint as the last completed sync, which is kept in state. Tables without a lastmodifieddate or lastmodified column are always synced.",
+        ),
+        th.Property(
+            "fingerprint_snapshot",
+            th.BooleanType,
+            default=False,
+            description="With fingerprint_skip_streams, keep the records of each sync in a local snapshot under cache_dir and re-emit them when the stream is skipped.",
+        ),
+        th.Property(
+            "schema_cache_ttl",
+            th.IntegerType,
+            default=0,
+            description="Seconds table metadata (metadata-catalog schemas, sampled fields) is reused from the local cache under cache_dir across runs. 0 fetches it on every run, once per table.",
+        ),
+        th.Property(
+            "lookup_cache_ttl",
+            th.IntegerType,
+            default=0,
+            description="Seconds small lookup tables (accounts, subsidiaries, currencies, departments, classes, locations, periods, custom fields and segments) are reused from the local cache under cache_dir across runs. 0 reads each of them once per run.",
+        ),
     ).to_dict()
 
     def __init__(
@@ -92,35 +351,302 @@ class TapNetSuite(Tap):
         validate_config: bool = True,
     ) -> None:
         super().__init__(config, catalog, state, parse_env_config, validate_config)
-        self.soap_client = NetsuiteSOAPClient(self.config, self.logger)
-    
+        self._check_optional_dependencies()
+        json_utils.set_backend(self.config.get("json_backend", "auto"))
+        self._writer = None
+        self._batches = None
+        self._change_store = None
+        self._soap_client = None
+        self._closed = False
+        self.schema_registry = SchemaRegistry(self.config, self.config.get("schema_cache_ttl", 0))
+        self.lookups = LookupCache(self.config, self.config.get("lookup_cache_ttl", 0))
+        self.capability_profile = CapabilityProfile(
+            self.config, self.plugin_version, self.config.get("capability_profile_ttl", 0)
+        )
+        self._first_record_logged = False
+        _open_taps.add(self)
+
+    def _check_optional_dependencies(self) -> None:
+        """Fail early when the config asks for an extra that isn't installed."""
+        if self.config.get("parquet_streams") and importlib.util.find_spec("pyarrow") is None:
+            raise ConfigValidationError(
+                "parquet_streams requires pyarrow, install tap-netsuite-rest[parquet]"
+            )
+        if self.config.get("json_backend") == "orjson" and importlib.util.find_spec("orjson") is None:
+            raise ConfigValidationError(
+                "json_backend orjson requires orjson, install tap-netsuite-rest[fast]"
+            )
+        if self.config.get("stream_json_pages") and importlib.util.find_spec("ijson") is None:
+            self.logger.warning(
+                "stream_json_pages needs ijson (tap-netsuite-rest[fast]), pages are decoded whole"
+            )
+
+    @property
+    def soap_client(self):
+        """Return the SOAP client, created on first use by the SOAP streams."""
+        if self._soap_client is None:
+            from tap_netsuite_rest.client_soap import NetsuiteSOAPClient
+
+            self._soap_client = NetsuiteSOAPClient(self.config, self.logger)
+        return self._soap_client
+
+    @property
+    def writer(self) -> Optional[SingerWriter]:
+        """Return the buffered Singer writer, or None when buffered_output is off."""
+        if self._writer is None and not self._closed and self.config.get("buffered_output"):
+            self._writer = SingerWriter(flush_interval=self.config.get("output_flush_interval", 1.0))
+        return self._writer
+
+    @property
+    def batches(self) -> Optional[BatchManager]:
+        """Return the batch file manager, or None when no batch_streams are configured."""
+        batch_streams = self.config.get("batch_streams") or []
+        parquet_streams = self.config.get("parquet_streams") or []
+        if self._batches is None and not self._closed and (batch_streams or parquet_streams):
+            self._batches = BatchManager(
+                streams=batch_streams,
+                directory=self.config.get("batch_dir", "batches"),
+                emit=self._emit_message,
+                max_rows=self.config.get("batch_max_rows", 1000000),
+                max_bytes=self.config.get("batch_max_bytes", 268435456),
+                parquet_streams=parquet_streams,
+                parquet_dir=self.config.get("parquet_dir", "parquet"),
+                parquet_partition_keys={
+                    name: getattr(self.streams.get(name), "parquet_partition_key", None)
+                    for name in parquet_streams
+                },
+                parquet_row_group_size=self.config.get("parquet_row_group_size", 100000),
+                parquet_max_open_files=self.config.get("parquet_max_open_files", 64),
+            )
+        return self._batches
+
+    @property
+    def change_store(self) -> RecordHashStore:
+        """Return the record hash store used by suppress_unchanged_streams."""
+        if self._change_store is None:
+            path = os.path.join(cache_dir(self.config), "record_hashes.sqlite")
+            self._change_store = RecordHashStore(path)
+        return self._change_store
+
+    @final
+    def sync_all(self) -> None:
+        """Sync all streams, then close the output stages whether or not the sync failed."""
+        try:
+            super().sync_all()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Close the batch files, flush the writer and close the stores, once.
+
+        Batch files are closed first, their BATCH and held STATE messages still go
+        through the writer.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        _open_taps.discard(self)
+        try:
+            if self._batches is not None:
+                self._batches.close()
+                self._batches = None
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            if self._change_store is not None:
+                self._change_store.close()
+                self._change_store = None
+            self.capability_profile.save()
+            self.schema_registry.log_stats()
+            self.lookups.log_stats()
+
+    def _emit_message(self, message: Union[Message, str]) -> None:
+        if self.writer is not None:
+            self.writer.write(message)
+        elif isinstance(message, str):
+            sys.stdout.write(message + "\n")
+        else:
+            singer.write_message(message)
+
+    def flush_output(self) -> None:
+        """Block until every message written so far reached stdout."""
+        if self._writer is not None:
+            self._writer.flush()
+        else:
+            sys.stdout.flush()
+
+    def write_message(self, message: Union[Message, str], stream_name: Optional[str] = None) -> None:
+        """Write a Singer message from a stream through batch files and the writer."""
+        if not self._first_record_logged and isinstance(message, (RecordMessage, str)):
+            self._first_record_logged = True
+            self.logger.info(
+                f"Time to first record: {time.monotonic() - IMPORTED_AT:.2f}s since import"
+            )
+        batches = self.batches
+        if batches is not None:
+            if isinstance(message, SchemaMessage):
+                batches.register_schema(stream_name, message.schema)
+            if isinstance(message, StateMessage):
+                batches.write_state(message)
+                return
+            if stream_name in batches.streams and isinstance(message, (RecordMessage, str)):
+                batches.write_record(stream_name, message)
+                return
+        self._emit_message(message)
+
+    def _probe_group(self, tables: List[str], probe_streams: Dict[str, Stream]) -> Dict[str, Optional[bool]]:
+        """Probe a group of tables with one query, bisecting it when the query fails."""
+        if len(tables) == 1 or not self._group_probing:
+            return {table: self._probe_table(table, probe_streams) for table in tables}
+        transient = False
+        try:
+            if probe_streams[tables[0]].probe_tables_access(tables):
+                return {table: True for table in tables}
+        except Exception as e:
+            # not retried, the halves are probed right away
+            transient = isinstance(e, (RetriableAPIError, requests.exceptions.RequestException))
+            self.logger.warning(f"Group probe of {tables} failed, probing them separately: {e}")
+        middle = len(tables) // 2
+        result = self._probe_group(tables[:middle], probe_streams)
+        result.update(self._probe_group(tables[middle:], probe_streams))
+        if len(tables) == 2 and all(result.values()) and not transient:
+            # both tables are accessible on their own, combined queries don't work here
+            self.logger.info("Group probing isn't supported by this account, probing tables one by one")
+            self._group_probing = False
+        return result
+
+    def _probe_table(self, table: str, probe_streams: Dict[str, Stream]) -> Optional[bool]:
+        """Probe one table, returning None when the probe gave no definitive answer."""
+        self.logger.info("Probing access for table '%s'", table)
+        try:
+            return probe_streams[table].probe_table_access(table)
+        except Exception as e:
+            self.logger.warning(f"Error probing table {table}, excluding it from this run only: {e}")
+            return None
+
+    def _probe_tables(self, tables: List[str], probe_streams: Dict[str, Stream]) -> Dict[str, bool]:
+        """Probe table access concurrently, in groups of probe_group_size tables."""
+        table_access = {}
+        for table in tables:
+            known = self.capability_profile.get("tables", table)
+            if known is not None:
+                table_access[table] = known
+        tables = [table for table in tables if table not in table_access]
+
+        group_size = max(1, self.config.get("probe_group_size", 25))
+        self._group_probing = group_size > 1
+        groups = [tables[i:i + group_size] for i in range(0, len(tables), group_size)]
+        with ThreadPoolExecutor(max_workers=self.discovery_workers) as executor:
+            for result in executor.map(lambda group: self._probe_group(group, probe_streams), groups):
+                for table, accessible in result.items():
+                    table_access[table] = bool(accessible)
+                    if accessible is not None:
+                        self.capability_profile.set("tables", table, accessible)
+        return table_access
+
+    def _fetch_metadata_group(self, tables: List[str], stream: Stream) -> None:
+        """Fetch metadata-catalog schemas of a group of tables, bisecting failed requests."""
+        registry = self.schema_registry
+        try:
+            schemas = stream.fetch_metadata_catalog_batch(tables)
+        except Exception as e:
+            if len(tables) == 1:
+                registry.fail("metadata", tables[0], e)
+                return
+            middle = len(tables) // 2
+            self._fetch_metadata_group(tables[:middle], stream)
+            self._fetch_metadata_group(tables[middle:], stream)
+            return
+        for table in tables:
+            if table in schemas:
+                registry.put("metadata", table, schemas[table])
+            else:
+                registry.fail(
+                    "metadata", table, Exception(f"{table} is not described by the metadata catalog")
+                )
+
+    def _prefetch_metadata(self, streams: List[Stream]) -> None:
+        """Request metadata-catalog schemas for many tables at once.
+
+        Tables the catalog can't describe are remembered as failed so their
+        streams go straight to SuiteQL sampling in get_schema.
+        """
+        batch_size = self.config.get("metadata_batch_size", 50)
+        if batch_size <= 1:
+            return
+        tables: Dict[str, Stream] = {}
+        for stream in streams:
+            table = getattr(stream, "metadata_table", None)
+            if table and not self.schema_registry.has("metadata", table):
+                tables.setdefault(table, stream)
+        if not tables:
+            return
+        names = sorted(tables)
+        groups = [names[i:i + batch_size] for i in range(0, len(names), batch_size)]
+        self.logger.info(f"Fetching metadata-catalog schemas of {len(names)} tables in {len(groups)} requests")
+        with ThreadPoolExecutor(max_workers=self.discovery_workers) as executor:
+            list(executor.map(lambda group: self._fetch_metadata_group(group, tables[group[0]]), groups))
+
+    def _prefetch_schemas(self, streams: List[Stream]) -> None:
+        """Build stream schemas concurrently so discovery waits for the slowest table only."""
+        self._prefetch_metadata(streams)
+
+        def build(stream):
+            try:
+                stream.schema
+            except Exception as e:
+                # raised again when the catalog is built
+                self.logger.debug(f"Prefetching schema for {stream.name} failed: {e}")
+
+        with ThreadPoolExecutor(max_workers=self.discovery_workers) as executor:
+            list(executor.map(build, streams))
+
+    def _promote_replication_keys(self, streams: List[Stream]) -> None:
+        """Advertise full-table streams with a modification timestamp as incremental."""
+        if not self.config.get("auto_incremental"):
+            return
+        promoted = [
+            stream.name
+            for stream in streams
+            if hasattr(stream, "promote_replication_key") and stream.promote_replication_key()
+        ]
+        if promoted:
+            self.logger.info(f"Promoted {len(promoted)} streams to incremental replication: {promoted}")
+
+    @property
+    def discovery_workers(self) -> int:
+        return max(1, self.config.get("discovery_workers", 8))
 
     def discover_streams(self) -> List[Stream]:
         """Return a list of discovered streams."""
-        streams = streams_to_sync(self, include_streams, ignore_streams)
+        streams = streams_to_sync(
+            self, include_streams, ignore_streams, selected_stream_names(self.input_catalog)
+        )
         # flag add for test back compatibility also not run probe table during get, only during discover
-        if not self.config.get("remove_unauthorized_streams") or self.input_catalog:
+        if self.input_catalog:
+            return streams
+        if not self.config.get("remove_unauthorized_streams"):
+            self._prefetch_schemas(streams)
+            self._promote_replication_keys(streams)
             return streams
 
-        accessible = []
-        table_access_cache: dict[str, bool] = {}
-
+        started = time.monotonic()
+        stream_tables = {}
+        probe_streams: Dict[str, Stream] = {}
         for stream in streams:
             probe_table_name = getattr(stream, "_probe_table_name", None)
-            if probe_table_name is None:
-                accessible.append(stream)
-                continue
-
-            table = probe_table_name()
-            if table is None:
-                accessible.append(stream)
-                continue
+            table = probe_table_name() if probe_table_name is not None else None
+            stream_tables[stream.name] = table
+            if table is not None:
+                probe_streams.setdefault(table, stream)
 
-            if table not in table_access_cache:
-                self.logger.info("Probing access for table '%s'", table)
-                table_access_cache[table] = stream.probe_table_access(table)
+        table_access_cache = self._probe_tables(sorted(probe_streams), probe_streams)
 
-            if table_access_cache[table]:
+        accessible = []
+        for stream in streams:
+            table = stream_tables[stream.name]
+            if table is None or table_access_cache[table]:
                 accessible.append(stream)
             else:
                 self.logger.info(
@@ -129,6 +655,12 @@ class TapNetSuite(Tap):
                     table,
                 )
 
+        self._prefetch_schemas(accessible)
+        self._promote_replication_keys(accessible)
+        self.logger.info(
+            f"Discovered {len(accessible)} of {len(streams)} streams "
+            f"({len(table_access_cache)} tables probed) in {time.monotonic() - started:.1f}s"
+        )
         return accessible
 
     @final
@@ -0,0 +1,84 @@
+"""Tests records are diverted to rotating batch files and STATE waits for them."""
+
+import gzip
+import json
+
+from singer.messages import BatchMessage, RecordMessage, StateMessage
+
+from tap_netsuite_rest.batch import BatchManager
+
+
+def record_line(stream, i):
+    return json.dumps({"type": "RECORD", "stream": stream, "record": {"id": str(i)}})
+
+
+def batch_manager(tmp_path, **kwargs):
+    emitted = []
+    manager = BatchManager(streams=["invoices"], directory=str(tmp_path), emit=emitted.append, **kwargs)
+    return manager, emitted
+
+
+def batch_ids(message):
+    with gzip.open(message.filepath, "rt") as f:
+        return [json.loads(line)["record"]["id"] for line in f]
+
+
+def test_files_rotate_at_max_rows(tmp_path):
+    manager, emitted = batch_manager(tmp_path, max_rows=2)
+    for i in range(5):
+        manager.write_record("invoices", record_line("invoices", i))
+    manager.close()
+
+    assert all(isinstance(message, BatchMessage) for message in emitted)
+    assert [message.batch_size for message in emitted] == [2, 2, 1]
+    assert [batch_ids(message) for message in emitted] == [["0", "1"], ["2", "3"], ["4"]]
+    assert len({message.filepath for message in emitted}) == 3
+
+
+def test_files_rotate_at_max_bytes(tmp_path):
+    # every line and its newline count, so three lines fill a file
+    manager, emitted = batch_manager(tmp_path, max_bytes=(len(record_line("invoices", 0)) + 1) * 3)
+    for i in range(7):
+        manager.write_record("invoices", record_line("invoices", i))
+    manager.close()
+    assert [message.batch_size for message in emitted] == [3, 3, 1]
+
+
+def test_record_messages_are_serialized(tmp_path):
+    manager, emitted = batch_manager(tmp_path)
+    manager.write_record("invoices", RecordMessage(stream="invoices", record={"id": "7"}))
+    manager.close()
+    assert batch_ids(emitted[0]) == ["7"]
+
+
+def test_state_is_held_until_open_files_are_closed(tmp_path):
+    manager, emitted = batch_manager(tmp_path, max_rows=10)
+    manager.write_state(StateMessage(value={"bookmarks": {"invoices": {"step": 0}}}))
+    assert emitted[-1].value["bookmarks"]["invoices"]["step"] == 0
+
+    manager.write_record("invoices", record_line("invoices", 1))
+    state = {"bookmarks": {"invoices": {"step": 1}}}
+    manager.write_state(StateMessage(value=state))
+    state["bookmarks"]["invoices"]["step"] = 2
+    manager.write_state(StateMessage(value=state))
+    state["bookmarks"]["invoices"]["step"] = 3
+    assert len(emitted) == 1
+
+    manager.close()
+    assert isinstance(emitted[1], BatchMessage)
+    assert isinstance(emitted[2], StateMessage)
+    assert emitted[2].value["bookmarks"]["invoices"]["step"] == 2
+    assert len(emitted) == 3
+
+
+def test_state_waits_for_every_stream(tmp_path):
+    emitted = []
+    manager = BatchManager(streams=["invoices", "bills"], directory=str(tmp_path), emit=emitted.append)
+    manager.write_record("invoices", record_line("invoices", 1))
+    manager.write_record("bills", record_line("bills", 1))
+    manager.write_state(StateMessage(value={"bookmarks": {}}))
+
+    manager.close_stream("invoices")
+    assert [type(message) for message in emitted] == [BatchMessage]
+    manager.close_stream("bills")
+    assert [type(message) for message in emitted] == [BatchMessage, BatchMessage, StateMessage]
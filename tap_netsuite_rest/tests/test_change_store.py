@@ -0,0 +1,77 @@
+"""Tests unchanged-record suppression and delete reporting."""
+
+import io
+import json
+
+from singer import RecordMessage, StateMessage
+
+from tap_netsuite_rest.change_store import RecordHashStore, record_key
+from tap_netsuite_rest.writer import SingerWriter
+
+STREAM = "customers"
+
+
+def sync(store, records, complete=True, forget_deleted=False):
+    """Run one sync of records, returning the ids that were emitted."""
+    run_id = store.start_run(STREAM)
+    emitted = [
+        record["id"]
+        for record in records
+        if store.changed(STREAM, record_key(record, ["id"]), record, run_id)
+    ]
+    deleted = [values[0] for values in store.deleted(STREAM, run_id)]
+    if complete:
+        store.complete_run(STREAM, run_id, forget_deleted=forget_deleted)
+    return emitted, deleted
+
+
+def test_unchanged_records_are_suppressed(tmp_path):
+    store = RecordHashStore(str(tmp_path / "hashes.sqlite"))
+    records = [{"id": "1", "name": "a"}, {"id": "2", "name": "b"}]
+    assert sync(store, records) == (["1", "2"], [])
+    assert sync(store, records) == ([], [])
+    assert sync(store, [{"id": "1", "name": "a"}, {"id": "2", "name": "c"}]) == (["2"], [])
+
+
+def test_hashes_of_an_incomplete_run_are_not_kept(tmp_path):
+    path = str(tmp_path / "hashes.sqlite")
+    store = RecordHashStore(path)
+    sync(store, [{"id": "1", "name": "a"}])
+    # the run dies before its output is confirmed
+    assert sync(store, [{"id": "1", "name": "b"}], complete=False) == (["1"], [])
+    store.close()
+
+    store = RecordHashStore(path)
+    assert sync(store, [{"id": "1", "name": "b"}]) == (["1"], [])
+    assert sync(store, [{"id": "1", "name": "b"}]) == ([], [])
+
+
+def test_duplicate_keys_within_a_run(tmp_path):
+    store = RecordHashStore(str(tmp_path / "hashes.sqlite"))
+    records = [{"id": "1", "name": "a"}, {"id": "1", "name": "a"}, {"id": "1", "name": "b"}]
+    assert sync(store, records) == (["1", "1"], [])
+
+
+def test_deleted_records_are_reported_once(tmp_path):
+    store = RecordHashStore(str(tmp_path / "hashes.sqlite"))
+    sync(store, [{"id": "1"}, {"id": "2"}, {"id": "3"}], forget_deleted=True)
+    assert sync(store, [{"id": "1"}, {"id": "3", "name": "new"}], forget_deleted=True) == (["3"], ["2"])
+    assert sync(store, [{"id": "1"}, {"id": "3", "name": "new"}], forget_deleted=True) == ([], [])
+
+
+def test_deletes_of_an_incomplete_run_are_reported_again(tmp_path):
+    store = RecordHashStore(str(tmp_path / "hashes.sqlite"))
+    sync(store, [{"id": "1"}, {"id": "2"}], forget_deleted=True)
+    assert sync(store, [{"id": "1"}], complete=False) == ([], ["2"])
+    assert sync(store, [{"id": "1"}], forget_deleted=True) == ([], ["2"])
+
+
+def test_writer_flush_writes_queued_records_and_state():
+    output = io.StringIO()
+    writer = SingerWriter(flush_interval=60, output=output)
+    writer.write(RecordMessage(stream=STREAM, record={"id": "1"}))
+    writer.write(StateMessage(value={"bookmarks": {STREAM: {}}}))
+    writer.flush()
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [line["type"] for line in lines] == ["RECORD", "STATE"]
+    writer.close()
@@ -0,0 +1,65 @@
+"""Tests the primary-key dedup stores."""
+
+import pytest
+
+from tap_netsuite_rest.dedup import DiskStore, IntegerStore, SetStore, WindowStore, make_store
+
+KEYS = [
+    1, "1", 1, "1",
+    "0012", "12", 12,
+    "10-20", "20-10", "10-20",
+    "1-2-3", "1-2-3",
+    2 ** 40, str(2 ** 40), 2 ** 40,
+    ("a", 1), ("a", 1),
+    None, None,
+]
+
+
+@pytest.mark.parametrize("store_class", [WindowStore, IntegerStore, DiskStore])
+def test_stores_agree_with_the_set_store(store_class):
+    expected = SetStore()
+    store = store_class()
+    for key in KEYS:
+        assert store.seen(key) == expected.seen(key), key
+    assert len(store) == len(expected)
+
+
+def test_integer_store_bitmap_buckets():
+    store = IntegerStore()
+    keys = list(range(0, 20000, 3)) + [str(key) for key in range(0, 20000, 7)]
+    assert not any(store.seen(key) for key in keys)
+    assert all(store.seen(key) for key in keys)
+    assert not store.seen(1)
+    assert not store.seen("1")
+    assert len(store) == len(keys) + 2
+    assert any(isinstance(bucket, bytearray) for bucket in store._buckets.values())
+
+
+def test_window_store_forgets_keys_past_the_window():
+    store = WindowStore(window_seconds=60)
+    assert not store.seen("a", "2024-01-01T00:00:00")
+    assert store.seen("a", "2024-01-01T00:00:30")
+    assert not store.seen("b", "2024-01-01T00:02:00")
+    assert not store.seen("a", "2024-01-01T00:02:00")
+    assert len(store) == 2
+
+
+def test_window_store_keeps_evicting_after_keys_without_bookmark():
+    store = WindowStore(window_seconds=60)
+    assert not store.seen("no-bookmark", None)
+    for minute in range(10):
+        store.seen(f"key-{minute}", f"2024-01-01T00:{minute:02d}:00")
+    assert store.seen("no-bookmark", "2024-01-01T00:10:00")
+    assert len(store._order) == 2
+    assert len(store) == 3
+
+
+def test_make_store():
+    assert isinstance(make_store({}), SetStore)
+    assert isinstance(make_store({"dedup_store": "integer"}), IntegerStore)
+    assert isinstance(make_store({"dedup_store": "disk"}), DiskStore)
+    window = make_store({"dedup_store": "window", "dedup_window_seconds": 10})
+    assert isinstance(window, WindowStore)
+    assert window.window.total_seconds() == 10
+    with pytest.raises(ValueError):
+        make_store({"dedup_store": "bloom"})
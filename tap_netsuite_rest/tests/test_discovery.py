@@ -0,0 +1,117 @@
+"""Tests table probing only remembers definitive answers."""
+
+import pytest
+import requests
+from hotglue_singer_sdk.exceptions import RetriableAPIError
+
+from tap_netsuite_rest.streams import GeneralLedgerReportStream
+from tap_netsuite_rest.tap import TapNetSuite
+
+SAMPLE_CONFIG = {
+    "ns_account": "123_SB1",
+    "ns_consumer_key": "key",
+    "ns_consumer_secret": "secret",
+    "ns_token_key": "token",
+    "ns_token_secret": "token_secret",
+    "start_date": "2024-01-01",
+    "probe_group_size": 1,
+}
+
+
+class FakeResponse:
+    def __init__(self, status_code, text=""):
+        self.status_code = status_code
+        self.text = text
+
+
+class FakeSession:
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.sent = 0
+
+    def prepare_request(self, request):
+        return request
+
+    def send(self, request, timeout=None):
+        self.sent += 1
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+class FakeProbeStream:
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+
+    def probe_table_access(self, table):
+        outcome = self.outcomes[table]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def tap():
+    tap = TapNetSuite(config=SAMPLE_CONFIG)
+    tap.capability_profile.set("features", "customsegment", False)
+    return tap
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    monkeypatch.setattr("backoff._sync.time.sleep", lambda seconds: None)
+
+
+def probe_stream(tap, monkeypatch, outcome):
+    stream = GeneralLedgerReportStream(tap=tap)
+    session = FakeSession(outcome)
+    monkeypatch.setattr(stream, "get_session", lambda: session)
+    return stream, session
+
+
+def test_timed_out_probe_is_not_remembered(tap):
+    stream = FakeProbeStream({
+        "account": True,
+        "customer": False,
+        "vendor": requests.exceptions.Timeout("read timed out"),
+    })
+    probe_streams = {table: stream for table in stream.outcomes}
+    access = tap._probe_tables(sorted(probe_streams), probe_streams)
+
+    assert access == {"account": True, "customer": False, "vendor": False}
+    assert tap.capability_profile.get("tables", "account") is True
+    assert tap.capability_profile.get("tables", "customer") is False
+    assert tap.capability_profile.get("tables", "vendor") is None
+
+
+def test_probe_answers(tap, monkeypatch):
+    stream, _ = probe_stream(tap, monkeypatch, FakeResponse(200, "{}"))
+    assert stream.probe_table_access("account") is True
+
+    not_found = FakeResponse(400, "Search error occurred: Record 'account' was not found.")
+    stream, _ = probe_stream(tap, monkeypatch, not_found)
+    assert stream.probe_table_access("account") is False
+
+
+def test_probe_retries_server_errors(tap, monkeypatch, no_sleep):
+    stream, session = probe_stream(tap, monkeypatch, FakeResponse(503, "Service Unavailable"))
+    with pytest.raises(RetriableAPIError):
+        stream.probe_table_access("account")
+    assert session.sent > 1
+
+    stream, session = probe_stream(tap, monkeypatch, requests.exceptions.Timeout("read timed out"))
+    with pytest.raises(requests.exceptions.Timeout):
+        stream.probe_table_access("account")
+    assert session.sent > 1
+
+
+def test_suspect_fields_are_skipped_but_not_remembered(tap, monkeypatch):
+    stream = GeneralLedgerReportStream(tap=tap)
+    verdicts = {"memo": "invalid", "amount": "suspect"}
+    monkeypatch.setattr(stream, "_probe_suiteql_select", lambda select, where=None: len(select) == 1)
+    monkeypatch.setattr(stream, "_selected_field_names", lambda: ["memo", "amount", "tranid"])
+    monkeypatch.setattr(stream, "_probe_suiteql_field", lambda name, where=None: verdicts.get(name, "valid"))
+
+    assert stream._identify_and_skip_invalid_suiteql_field()
+    assert {"memo", "amount"} <= set(stream.invalid_fields)
+    assert tap.capability_profile.get("invalid_fields", stream.name) == ["memo"]
@@ -0,0 +1,48 @@
+"""Tests unchanged tables are only skipped when edits can be detected."""
+
+import pytest
+
+from tap_netsuite_rest.streams import TermStream
+from tap_netsuite_rest.tap import TapNetSuite
+
+SAMPLE_CONFIG = {
+    "ns_account": "123_SB1",
+    "ns_consumer_key": "key",
+    "ns_consumer_secret": "secret",
+    "ns_token_key": "token",
+    "ns_token_secret": "token_secret",
+    "start_date": "2024-01-01",
+    "fingerprint_skip_streams": ["term"],
+}
+
+FINGERPRINT = {"row_count": 3, "max_modified": "2024-03-01 10:00:00", "max_id": 7}
+
+
+def term_stream(monkeypatch, *columns):
+    # a fixed schema, building the dynamic one would query NetSuite
+    schema = {"type": "object", "properties": {column: {"type": ["string", "null"]} for column in columns}}
+    monkeypatch.setattr(TermStream, "schema", schema)
+    monkeypatch.setattr(TermStream, "replication_key", None)
+    stream = TermStream(tap=TapNetSuite(config=SAMPLE_CONFIG))
+    queries = []
+
+    def first_row(q):
+        queries.append(q)
+        return dict(FINGERPRINT)
+
+    monkeypatch.setattr(stream, "_suiteql_first_row", first_row)
+    stream.stream_state["fingerprint"] = dict(FINGERPRINT)
+    return stream, queries
+
+
+@pytest.mark.parametrize("column", ["lastmodifieddate", "lastmodified"])
+def test_unchanged_table_is_skipped(monkeypatch, column):
+    stream, queries = term_stream(monkeypatch, "id", column)
+    assert stream._skip_unchanged_table(None)
+    assert f"MAX(term.{column})" in queries[0]
+
+
+def test_table_without_modification_column_is_never_skipped(monkeypatch):
+    stream, queries = term_stream(monkeypatch, "id", "name")
+    assert not stream._skip_unchanged_table(None)
+    assert queries == []
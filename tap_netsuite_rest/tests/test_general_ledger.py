@@ -0,0 +1,67 @@
+"""Tests the General Ledger query is pruned to the catalog selection."""
+
+from tap_netsuite_rest.streams import GeneralLedgerReportStream
+from tap_netsuite_rest.tap import TapNetSuite
+
+SAMPLE_CONFIG = {
+    "ns_account": "123_SB1",
+    "ns_consumer_key": "key",
+    "ns_consumer_secret": "secret",
+    "ns_token_key": "token",
+    "ns_token_secret": "token_secret",
+    "start_date": "2024-01-01",
+}
+
+
+def general_ledger_stream(deselected=()):
+    """Build the GL stream from a catalog whose properties are only selected by default."""
+    schema = GeneralLedgerReportStream.schema.fget(
+        type("Stream", (), {"get_custom_segment_fields_scriptids": lambda self: []})()
+    )
+    metadata = [{"breadcrumb": [], "metadata": {"selected": True}}]
+    metadata += [
+        {"breadcrumb": ["properties", name], "metadata": {"inclusion": "available", "selected-by-default": True}}
+        for name in schema["properties"]
+        if name not in deselected
+    ]
+    metadata += [
+        {"breadcrumb": ["properties", name], "metadata": {"inclusion": "available", "selected": False}}
+        for name in deselected
+    ]
+    entry = {
+        "tap_stream_id": "general_ledger_report",
+        "stream": "general_ledger_report",
+        "schema": schema,
+        "metadata": metadata,
+    }
+    tap = TapNetSuite(config=SAMPLE_CONFIG, catalog={"streams": [entry]})
+    tap.capability_profile.set("features", "customsegment", False)
+    return tap.streams["general_ledger_report"]
+
+
+def general_ledger_query(stream):
+    return stream.prepare_request_payload(None, None)["q"]
+
+
+def test_selected_by_default_columns_are_queried():
+    query = general_ledger_query(general_ledger_stream())
+    assert "TransactionAccountingLine.amount" in query
+    assert "Account.id as accountid" in query
+    assert "Account.acctnumber as num" in query
+    assert "Classification.name as class" in query
+    assert "LEFT JOIN Classification" in query
+
+
+def test_deselected_columns_drop_their_joins():
+    query = general_ledger_query(general_ledger_stream(deselected=("class", "classid", "employeeid")))
+    assert "TransactionAccountingLine.amount" in query
+    assert "Classification" not in query
+    assert "employeeid" not in query
+
+
+def test_query_without_key_properties():
+    stream = general_ledger_stream()
+    stream.primary_keys = None
+    query = general_ledger_query(stream)
+    assert "TransactionAccountingLine.amount" in query
+    assert "AS id" in query
@@ -0,0 +1,98 @@
+"""Tests SuiteQL pages streamed from the response body."""
+
+import io
+import json
+
+import pytest
+import requests
+
+from tap_netsuite_rest import json_utils
+from tap_netsuite_rest.json_utils import PageChangedError, iter_response_items
+
+pytest.importorskip("ijson")
+
+ITEMS = [{"id": str(i), "amount": i * 1.5} for i in range(5)]
+
+
+def body(items, has_more=True):
+    # pagination fields after the items, as NetSuite sends them
+    return json.dumps({"links": [], "items": items, "hasMore": has_more, "offset": 0, "totalResults": 9}).encode()
+
+
+class Raw(io.BytesIO):
+    decode_content = False
+
+
+def streamed(content, cut=None):
+    """Return a response read from the network, its body cut after `cut` bytes."""
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.raw = Raw(content if cut is None else content[:cut])
+    resp._content = False
+    resp._content_consumed = False
+    return resp
+
+
+def read(content):
+    resp = requests.Response()
+    resp.status_code = 200
+    resp._content = content
+    resp._content_consumed = True
+    return resp
+
+
+def cut_after(content, items):
+    """Return a byte offset in the middle of the record following the first `items`."""
+    return content.index(json.dumps(ITEMS[items])[:-1].encode()) + 5
+
+
+def test_items_and_summary_are_streamed():
+    resp = streamed(body(ITEMS))
+    assert list(iter_response_items(resp)) == ITEMS
+    summary = json_utils.response_summary(resp)
+    assert (summary["hasMore"], summary["offset"], summary["totalResults"]) == (True, 0, 9)
+    assert summary["items"] == [ITEMS[-1]]
+
+
+def test_consumer_stopping_early_still_gets_the_summary():
+    resp = streamed(body(ITEMS, has_more=False))
+    items = iter_response_items(resp)
+    assert next(items) == ITEMS[0]
+    items.close()
+    assert json_utils.response_summary(resp)["hasMore"] is False
+
+
+def test_truncated_body_without_refetch_raises():
+    content = body(ITEMS)
+    with pytest.raises(json_utils._read_errors()):
+        list(iter_response_items(streamed(content, cut_after(content, 2))))
+
+
+@pytest.mark.parametrize("retry", [streamed, read], ids=["streamed", "read"])
+def test_truncated_body_is_refetched(retry):
+    content = body(ITEMS)
+    refetches = []
+
+    def refetch():
+        refetches.append(1)
+        return retry(content)
+
+    resp = streamed(content, cut_after(content, 2))
+    assert list(iter_response_items(resp, refetch=refetch)) == ITEMS
+    assert refetches == [1]
+    assert json_utils.response_summary(resp)["totalResults"] == 9
+
+
+@pytest.mark.parametrize("retry", [streamed, read], ids=["streamed", "read"])
+@pytest.mark.parametrize("refetched", [
+    [{"id": "new", "amount": 0}] + ITEMS,
+    [ITEMS[0], dict(ITEMS[1], amount=99)] + ITEMS[2:],
+    ITEMS[:1],
+], ids=["shifted", "edited", "shorter"])
+def test_changed_page_is_not_resumed(retry, refetched):
+    content = body(ITEMS)
+    resp = streamed(content, cut_after(content, 2))
+    items = iter_response_items(resp, refetch=lambda: retry(body(refetched)))
+    assert [next(items), next(items)] == ITEMS[:2]
+    with pytest.raises(PageChangedError):
+        next(items)
@@ -0,0 +1,87 @@
+"""Tests the tap closes its output stages when the sync ends."""
+
+import atexit
+import json
+
+import pytest
+import requests
+
+from tap_netsuite_rest import tap as tap_module
+from tap_netsuite_rest.tap import TapNetSuite
+
+SAMPLE_CONFIG = {
+    "ns_account": "123_SB1",
+    "ns_consumer_key": "key",
+    "ns_consumer_secret": "secret",
+    "ns_token_key": "token",
+    "ns_token_secret": "token_secret",
+    "start_date": "2024-01-01",
+    "buffered_output": True,
+    "batch_streams": ["term"],
+}
+
+CATALOG = {"streams": [{
+    "tap_stream_id": "term",
+    "stream": "term",
+    "schema": {"type": "object", "properties": {"id": {"type": ["string", "null"]}}},
+    "metadata": [{"breadcrumb": [], "metadata": {"selected": True}}],
+}]}
+
+
+def one_page(context):
+    resp = requests.Response()
+    resp.status_code = 200
+    resp._content = json.dumps({"items": [{"id": "1"}], "hasMore": False}).encode()
+    resp._content_consumed = True
+    yield resp
+
+
+def failing_pages(context):
+    raise RuntimeError("sync failed")
+    yield
+
+
+@pytest.fixture
+def tap(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tap = TapNetSuite(config=dict(SAMPLE_CONFIG, cache_dir=str(tmp_path)), catalog=CATALOG)
+    yield tap
+    tap.close()
+
+
+@pytest.mark.parametrize("pages", [one_page, failing_pages], ids=["success", "failure"])
+def test_sync_all_closes_the_output_stages(tap, monkeypatch, capsys, pages):
+    monkeypatch.setattr(tap.streams["term"], "_request_pages", pages)
+    writer, batches, change_store = tap.writer, tap.batches, tap.change_store
+    closed = []
+    monkeypatch.setattr(batches, "close", lambda: closed.append("batches"))
+    monkeypatch.setattr(change_store, "close", lambda: closed.append("change_store"))
+
+    if pages is failing_pages:
+        with pytest.raises(RuntimeError):
+            tap.sync_all()
+    else:
+        tap.sync_all()
+
+    assert closed == ["batches", "change_store"]
+    assert writer._closed
+    assert tap.writer is None and tap.batches is None
+    assert tap not in tap_module._open_taps
+
+
+def test_taps_register_no_exit_handlers(tmp_path):
+    handlers = atexit._ncallbacks()
+    for _ in range(3):
+        tap = TapNetSuite(config=dict(SAMPLE_CONFIG, cache_dir=str(tmp_path)))
+        _ = tap.writer, tap.change_store
+        tap.close()
+    assert atexit._ncallbacks() == handlers
+
+
+def test_exit_fallback_closes_open_taps(tmp_path):
+    tap = TapNetSuite(config=dict(SAMPLE_CONFIG, cache_dir=str(tmp_path)))
+    writer = tap.writer
+    assert tap in tap_module._open_taps
+    tap_module._close_open_taps()
+    assert writer._closed
+    assert tap not in tap_module._open_taps
@@ -0,0 +1,101 @@
+"""Tests the lookup cache never keeps a failed or partial fetch."""
+
+import json
+import os
+
+import pytest
+import requests
+from hotglue_singer_sdk.exceptions import FatalAPIError, RetriableAPIError
+
+from tap_netsuite_rest.streams import TermStream
+from tap_netsuite_rest.tap import TapNetSuite
+
+
+def response(status_code, body):
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp._content = json.dumps(body).encode() if isinstance(body, dict) else body.encode()
+    return resp
+
+
+def page(offset, has_more, *fields):
+    items = [{"scriptid": scriptid.upper(), "fieldvaluetype": kind} for scriptid, kind in fields]
+    return response(200, {"items": items, "hasMore": has_more, "offset": offset, "totalResults": 2})
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = responses
+
+    def prepare_request(self, request):
+        return request
+
+    def send(self, request, timeout=None):
+        return self.responses.pop(0)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr("backoff._sync.time.sleep", lambda seconds: None)
+
+
+@pytest.fixture
+def tap(tmp_path):
+    tap = TapNetSuite(config={
+        "ns_account": "123_SB1",
+        "ns_consumer_key": "key",
+        "ns_consumer_secret": "secret",
+        "ns_token_key": "token",
+        "ns_token_secret": "token_secret",
+        "start_date": "2024-01-01",
+        "cache_dir": str(tmp_path),
+        "lookup_cache_ttl": 3600,
+    })
+    tap.capability_profile.set("features", "customsegment", False)
+    return tap
+
+
+def lookup_stream(tap, monkeypatch, responses):
+    # a fixed schema, building the dynamic one would query NetSuite
+    monkeypatch.setattr(TermStream, "schema", {"type": "object", "properties": {"id": {"type": ["string"]}}})
+    stream = TermStream(tap=tap)
+    stream.page_size = 1
+    session = FakeSession(responses)
+    monkeypatch.setattr(stream, "get_session", lambda: session)
+    return stream
+
+
+def cached_files(tmp_path):
+    return [name for _, _, names in os.walk(tmp_path) for name in names]
+
+
+def test_custom_fields_are_fetched_from_every_page(tap, monkeypatch, tmp_path):
+    stream = lookup_stream(tap, monkeypatch, [
+        page(0, True, ("custbody_a", "Date")),
+        response(503, "Service Unavailable"),
+        page(1, False, ("custbody_b", "Integer Number")),
+    ])
+    assert tap.lookups.custom_fields(stream) == {"custbody_a": "Date", "custbody_b": "Integer Number"}
+    assert cached_files(tmp_path) == ["customfields-customfield.json"]
+
+
+def test_failed_custom_fields_fetch_is_not_cached(tap, monkeypatch, tmp_path):
+    stream = lookup_stream(tap, monkeypatch, [page(0, True, ("custbody_a", "Date"))] + [
+        response(503, "Service Unavailable") for _ in range(10)
+    ])
+    with pytest.raises(RetriableAPIError):
+        tap.lookups.custom_fields(stream)
+    assert cached_files(tmp_path) == []
+
+    stream = lookup_stream(tap, monkeypatch, [
+        page(0, True, ("custbody_a", "Date")),
+        page(1, False, ("custbody_b", "Integer Number")),
+    ])
+    assert tap.lookups.custom_fields(stream) == {"custbody_a": "Date", "custbody_b": "Integer Number"}
+
+
+def test_forbidden_custom_fields_fetch_raises(tap, monkeypatch, tmp_path):
+    stream = lookup_stream(tap, monkeypatch, [response(400, "Record 'customfield' was not found.")])
+    with pytest.raises(FatalAPIError):
+        tap.lookups.custom_fields(stream)
+    assert cached_files(tmp_path) == []
@@ -0,0 +1,64 @@
+"""Tests bulk parent streams bookmark the transaction window they synced."""
+
+import json
+
+import pytest
+import requests
+
+from tap_netsuite_rest.streams import CustomSegmentsStream
+from tap_netsuite_rest.tap import TapNetSuite
+
+SAMPLE_CONFIG = {
+    "ns_account": "123_SB1",
+    "ns_consumer_key": "key",
+    "ns_consumer_secret": "secret",
+    "ns_token_key": "token",
+    "ns_token_secret": "token_secret",
+    "start_date": "2024-01-01",
+}
+
+
+def empty_page():
+    resp = requests.Response()
+    resp.status_code = 200
+    resp._content = json.dumps({"items": [], "hasMore": False, "offset": 0, "totalResults": 0}).encode()
+    resp._content_consumed = True
+    return resp
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    def build(**config):
+        tap = TapNetSuite(config=dict(SAMPLE_CONFIG, **config))
+        stream = CustomSegmentsStream(tap=tap)
+        stream.parent_transaction_column = "transaction"
+        monkeypatch.setattr(
+            stream, "_suiteql_rows", lambda q, limit=1000: [{"max_modified": "2024-03-01 10:00:00"}]
+        )
+        windows = []
+
+        def request_pages(context):
+            windows.append(stream._parent_window)
+            yield empty_page()
+
+        monkeypatch.setattr(stream, "_request_pages", request_pages)
+        return stream, windows
+    return build
+
+
+def test_bulk_parent_bookmarks_the_synced_window(stream):
+    stream, windows = stream(parent_incremental_streams=["custom_segments"])
+    stream.sync()
+    assert windows == [(None, "2024-03-01 10:00:00")]
+    assert stream.stream_state["parent_replication_key_value"] == "2024-03-01 10:00:00"
+
+    stream.sync()
+    assert windows[-1] == ("2024-03-01 10:00:00", "2024-03-01 10:00:00")
+
+
+def test_bulk_parent_without_parent_incremental_keeps_no_bookmark(stream):
+    stream, windows = stream()
+    stream._parent_window = ("2024-01-01 00:00:00", "2024-02-01 00:00:00")
+    stream.sync()
+    assert windows == [None]
+    assert "parent_replication_key_value" not in stream.stream_state
@@ -0,0 +1,73 @@
+"""Tests Parquet output is chunked into row groups and partitioned by one column."""
+
+import os
+
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from tap_netsuite_rest.parquet import NULL_PARTITION, ParquetPartition, ParquetStreamWriter  # noqa: E402
+
+SCHEMA = {
+    "properties": {
+        "id": {"type": ["string", "null"]},
+        "amount": {"type": ["number", "null"]},
+        "quantity": {"type": ["integer", "null"]},
+        "posted": {"type": ["boolean", "null"]},
+        "period": {"type": ["string", "null"]},
+    }
+}
+
+
+def record(i, period="Jan 2024"):
+    # SuiteQL values arrive as strings
+    return {"id": str(i), "amount": f"{i}.5", "quantity": str(i), "posted": "T" if i % 2 else "F", "period": period}
+
+
+def test_rows_are_converted_in_chunks_and_written_in_row_groups(tmp_path, monkeypatch):
+    monkeypatch.setattr(ParquetPartition, "CHUNK_SIZE", 3)
+    writer = ParquetStreamWriter("gl", SCHEMA, str(tmp_path), None, row_group_size=5)
+    for i in range(12):
+        writer.write(record(i))
+        partition = writer._partitions[None]
+        assert len(partition._pending) < 3
+        assert partition._batched_rows < 5
+    (message,) = writer.close()
+
+    assert message.batch_size == 12
+    metadata = pq.ParquetFile(message.filepath).metadata
+    row_groups = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+    assert sum(row_groups) == 12 and max(row_groups) <= 5
+    table = pq.read_table(message.filepath).to_pylist()
+    assert [row["id"] for row in table] == [str(i) for i in range(12)]
+    assert table[3] == {"id": "3", "amount": 3.5, "quantity": 3, "posted": True, "period": "Jan 2024"}
+
+
+def test_null_and_empty_partition_values_share_the_null_partition(tmp_path):
+    writer = ParquetStreamWriter("gl", SCHEMA, str(tmp_path), "period")
+    writer.write(record(1, None))
+    writer.write(record(2, "Feb/2024"))
+    writer.write(record(3, ""))
+    messages = writer.close()
+
+    directories = sorted(os.path.relpath(os.path.dirname(message.filepath), tmp_path) for message in messages)
+    assert directories == [
+        os.path.join("gl", "period_Feb_2024"),
+        os.path.join("gl", f"period_{NULL_PARTITION}"),
+        os.path.join("gl", f"period_{NULL_PARTITION}"),
+    ]
+    rows = [row for message in messages for row in pq.read_table(message.filepath).to_pylist()]
+    assert sorted(row["id"] for row in rows) == ["1", "2", "3"]
+
+
+def test_least_recently_written_partition_is_closed(tmp_path):
+    writer = ParquetStreamWriter("gl", SCHEMA, str(tmp_path), "period", max_open_files=2)
+    for period in ("a", "b", "a", "c", "b"):
+        writer.write(record(1, period))
+    messages = writer.close()
+
+    assert sorted(os.path.basename(os.path.dirname(message.filepath)) for message in messages) == [
+        "period_a", "period_b", "period_b", "period_c",
+    ]
+    assert sum(message.batch_size for message in messages) == 5
+    assert all(os.path.exists(message.filepath) for message in messages)
@@ -0,0 +1,113 @@
+"""Tests table metadata is fetched once per run and cached on disk until it expires."""
+
+import threading
+import time
+
+import pytest
+from hotglue_singer_sdk.exceptions import FatalAPIError, RetriableAPIError
+
+from tap_netsuite_rest import schema_registry
+from tap_netsuite_rest.schema_registry import SchemaRegistry
+
+
+@pytest.fixture
+def config(tmp_path):
+    return {"ns_account": "123_SB1", "cache_dir": str(tmp_path)}
+
+
+class Fetch:
+    def __init__(self, *values, wait=None):
+        self.values = list(values)
+        self.calls = 0
+        self.wait = wait
+
+    def __call__(self):
+        self.calls += 1
+        if self.wait is not None:
+            assert self.wait.wait(timeout=5)
+        value = self.values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+def test_concurrent_callers_share_one_fetch(config):
+    registry = SchemaRegistry(config)
+    release = threading.Event()
+    fetch = Fetch(["id", "name"], wait=release)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get("fields", "customer", fetch)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert fetch.calls == 1
+    assert results == [["id", "name"]] * 8
+    assert registry.stats["fetched"] == 1 and registry.stats["memory_hits"] == 7
+
+
+def test_different_tables_are_fetched_in_parallel(config):
+    registry = SchemaRegistry(config)
+    vendor_started = threading.Event()
+    customer = Fetch(["id"], wait=vendor_started)
+
+    def vendor():
+        vendor_started.set()
+        return ["id"]
+
+    thread = threading.Thread(target=lambda: registry.get("fields", "customer", customer))
+    thread.start()
+    assert registry.get("fields", "vendor", vendor) == ["id"]
+    thread.join()
+    assert customer.calls == 1
+
+
+def test_disk_cache_is_reused_until_it_expires(config, monkeypatch):
+    fetch = Fetch(["id"], ["id"], ["id", "memo"])
+    assert SchemaRegistry(config, ttl=60).get("fields", "customer", fetch) == ["id"]
+
+    registry = SchemaRegistry(config, ttl=60)
+    assert registry.has("fields", "customer")
+    assert registry.get("fields", "customer", fetch) == ["id"]
+    assert fetch.calls == 1 and registry.stats["disk_hits"] == 1
+
+    now = time.time()
+    monkeypatch.setattr(schema_registry.time, "time", lambda: now + 61)
+    registry = SchemaRegistry(config, ttl=60)
+    assert not registry.has("fields", "customer")
+    assert registry.get("fields", "customer", fetch) == ["id"]
+    assert registry.stats["changed"] == 0
+
+    monkeypatch.setattr(schema_registry.time, "time", lambda: now + 122)
+    registry = SchemaRegistry(config, ttl=60)
+    assert registry.get("fields", "customer", fetch) == ["id", "memo"]
+    assert fetch.calls == 3 and registry.stats["changed"] == 1
+
+
+def test_without_ttl_nothing_is_read_from_disk(config):
+    fetch = Fetch(["id"], ["id", "memo"])
+    SchemaRegistry(config, ttl=60).get("fields", "customer", fetch)
+    registry = SchemaRegistry(config)
+    assert registry.get("fields", "customer", fetch) == ["id", "memo"]
+    assert fetch.calls == 2
+
+
+def test_only_definitive_errors_are_remembered(config):
+    registry = SchemaRegistry(config, ttl=60)
+    fetch = Fetch(RetriableAPIError("503"), ["id"])
+    with pytest.raises(RetriableAPIError):
+        registry.get("fields", "customer", fetch)
+    assert registry.get("fields", "customer", fetch) == ["id"]
+
+    fetch = Fetch(FatalAPIError("400"), ["id"])
+    for _ in range(2):
+        with pytest.raises(FatalAPIError):
+            registry.get("fields", "vendor", fetch)
+    assert fetch.calls == 1
+    assert not SchemaRegistry(config, ttl=60).has("fields", "vendor")
@@ -0,0 +1,107 @@
+"""Startup benchmark: cold start from import to the first record of a one-stream sync.
+
+Run it directly to time repeated cold starts, each in a fresh interpreter:
+
+    python -m tap_netsuite_rest.tests.test_startup [runs]
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+
+from tap_netsuite_rest.tap import TapNetSuite
+
+SAMPLE_CONFIG = {
+    "ns_account": "123_SB1",
+    "ns_consumer_key": "key",
+    "ns_consumer_secret": "secret",
+    "ns_token_key": "token",
+    "ns_token_secret": "token_secret",
+    "start_date": "2024-01-01",
+}
+
+STRING = {"type": ["string", "null"]}
+
+
+def catalog(*names):
+    return {"streams": [
+        {
+            "tap_stream_id": name,
+            "stream": name,
+            "schema": {"type": "object", "properties": {"id": STRING, "lastmodifieddate": STRING}},
+            "metadata": [{"breadcrumb": [], "metadata": {"selected": True}}],
+        }
+        for name in names
+    ]}
+
+
+# runs in a fresh interpreter, so module imports are part of the measurement
+COLD_START = """
+import json, sys, time
+started = time.perf_counter()
+from tap_netsuite_rest.tap import TapNetSuite
+imported = time.perf_counter()
+import requests
+
+config, catalog = json.loads(sys.argv[1]), json.loads(sys.argv[2])
+tap = TapNetSuite(config=config, catalog=catalog)
+stream = tap.streams[catalog["streams"][0]["stream"]]
+built = time.perf_counter()
+
+def pages(context):
+    resp = requests.Response()
+    resp.status_code = 200
+    resp._content = json.dumps({"items": [{"id": "1"}], "hasMore": False}).encode()
+    resp._content_consumed = True
+    yield resp
+
+first_record = []
+
+def write_message(message):
+    if not first_record and '"RECORD"' in (message if isinstance(message, str) else json.dumps(message.asdict())):
+        first_record.append(time.perf_counter())
+
+stream._request_pages = pages
+stream._write_message = write_message
+stream.sync()
+print(json.dumps({
+    "import": imported - started,
+    "build": built - imported,
+    "first_record": first_record[0] - started,
+    "streams": sorted(tap.streams),
+    "soap_client": tap._soap_client is not None,
+    "heavy_modules": sorted(name for name in ("pyarrow", "xmltodict") if name in sys.modules),
+}))
+"""
+
+
+def cold_start(*names) -> dict:
+    """Run one cold start of a sync of the named streams and return its timings."""
+    result = subprocess.run(
+        [sys.executable, "-c", COLD_START, json.dumps(SAMPLE_CONFIG), json.dumps(catalog(*names))],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_cold_start_builds_only_the_selected_stream():
+    result = cold_start("term")
+    assert result["streams"] == ["term"]
+    assert not result["soap_client"]
+    assert result["heavy_modules"] == []
+    assert 0 < result["import"] < result["first_record"]
+
+
+def test_selected_child_streams_bring_their_parent():
+    tap = TapNetSuite(config=SAMPLE_CONFIG, catalog=catalog("vendor_credit_lines"))
+    assert sorted(tap.streams) == ["vendor_credit_lines", "vendor_credits"]
+
+
+if __name__ == "__main__":
+    runs = [cold_start("term") for _ in range(int(sys.argv[1]) if len(sys.argv) > 1 else 5)]
+    for measure in ("import", "build", "first_record"):
+        values = [run[measure] for run in runs]
+        print(f"{measure:>12}: median {statistics.median(values):.3f}s, min {min(values):.3f}s over {len(values)} runs")
@@ -0,0 +1,162 @@
+"""Tests the record conversion shared by streams and the transform pool."""
+
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+import requests
+
+from tap_netsuite_rest import json_utils
+from tap_netsuite_rest.streams import TermStream, VendorBillsStream
+from tap_netsuite_rest.tap import TapNetSuite
+from tap_netsuite_rest.transform import TransformSpec, init_worker, transform_page
+
+SCHEMA = {
+    "properties": {
+        "id": {"type": ["string", "null"]},
+        "amount": {"type": ["number", "null"]},
+    }
+}
+
+
+def spec(**kwargs):
+    return TransformSpec(
+        stream_name="transactions",
+        stream_alias="transactions",
+        schema=SCHEMA,
+        mask={(): True, ("properties", "id"): True, ("properties", "amount"): True},
+        steps=(TransformSpec.TYPES,),
+        primary_keys=["id"],
+        replication_key=None,
+        **kwargs,
+    )
+
+
+def test_spawned_workers_convert_pages():
+    content = json.dumps({"items": [{"id": "1", "amount": "2.5"}]}).encode()
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=("json", spec()),
+    ) as executor:
+        (pk, bookmark, line), = executor.submit(transform_page, content).result()
+    assert pk == "1"
+    assert json.loads(line)["record"] == {"id": "1", "amount": 2.5}
+
+
+def test_pool_workers_use_the_configured_json_backend():
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=("json", None),
+    ) as executor:
+        assert executor.submit(json_utils.backend).result() == "json"
+
+
+SAMPLE_CONFIG = {
+    "ns_account": "123_SB1",
+    "ns_consumer_key": "key",
+    "ns_consumer_secret": "secret",
+    "ns_token_key": "token",
+    "ns_token_secret": "token_secret",
+    "start_date": "2024-01-01",
+    "stream_json_pages": False,
+}
+
+STRING_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "id": {"type": ["string", "null"]},
+        "lastmodifieddate": {"type": ["string", "null"], "format": "date-time"},
+        "trandate": {"type": ["string", "null"], "format": "date-time"},
+        "memo": {"type": ["string", "null"]},
+        "custbody_due": {"type": ["string", "null"], "format": "date-time"},
+        "custbody_ref": {"type": ["string", "null"]},
+        "shippingaddress": {"type": ["string", "null"]},
+    },
+}
+
+TYPED_SCHEMA = {
+    "type": "object",
+    "properties": dict(
+        STRING_SCHEMA["properties"],
+        amount={"type": ["number", "null"]},
+        quantity={"type": ["integer", "null"]},
+        isclosed={"type": ["boolean", "null"]},
+        custbody_flag={"type": ["boolean", "null"]},
+        custbody_rate={"type": ["number", "null"]},
+    ),
+}
+
+ROWS = [
+    {
+        "id": "1", "lastmodifieddate": "2024-01-02T03:04:05Z", "trandate": "1/2/2024", "memo": "a",
+        "amount": "12.50", "quantity": "3", "isclosed": "F", "custbody_due": "2024-01-05",
+        "custbody_flag": "T", "custbody_rate": "0.5", "custbody_ref": 12,
+        "shippingaddress": "A, , , B, ", "links": [],
+    },
+    {
+        "id": "2", "lastmodifieddate": "2024-01-04T00:00:00Z", "trandate": "2024-01-03 10:00:00", "memo": None,
+        "amount": "-1", "quantity": 4, "isclosed": "T", "custbody_flag": "F", "shippingaddress": ", , ",
+        "extra": "x",
+    },
+    {"id": "1", "lastmodifieddate": "2024-01-02T03:04:05Z", "trandate": "1/2/2024", "memo": "a"},
+]
+
+
+def page_response(rows):
+    resp = requests.Response()
+    resp.status_code = 200
+    resp._content = json.dumps({"items": rows, "hasMore": False, "offset": 0, "totalResults": len(rows)}).encode()
+    resp._content_consumed = True
+    return resp
+
+
+def synced_messages(stream_class, schema, monkeypatch, **config):
+    """Sync one page through a stream.
+
+    Returns its RECORD messages, the final STATE and whether the records were
+    written as pre-serialized lines.
+    """
+    # a fixed schema, building the dynamic one would query NetSuite
+    monkeypatch.setattr(stream_class, "schema", schema)
+    stream = stream_class(tap=TapNetSuite(config=dict(SAMPLE_CONFIG, **config)))
+    stream._request_pages = lambda context: iter([page_response(json.loads(json.dumps(ROWS)))])
+    written = []
+    stream._write_message = written.append
+    stream.sync()
+    messages = [json.loads(message) if isinstance(message, str) else message.asdict() for message in written]
+    records = [message for message in messages if message["type"] == "RECORD"]
+    for record in records:
+        record.pop("time_extracted", None)
+    states = [message["value"] for message in messages if message["type"] == "STATE"]
+    return records, states[-1], any(isinstance(message, str) for message in written)
+
+
+def test_passthrough_matches_the_sdk_records(monkeypatch):
+    records, state, serialized = synced_messages(TermStream, STRING_SCHEMA, monkeypatch, raw_passthrough=False)
+    assert len(records) == 2 and not serialized
+    assert synced_messages(TermStream, STRING_SCHEMA, monkeypatch) == (records, state, True)
+
+
+@pytest.mark.parametrize("stream_class, schema", [
+    (TermStream, TYPED_SCHEMA),
+    # address collapsing is only replayed by the pool
+    (VendorBillsStream, STRING_SCHEMA),
+])
+def test_passthrough_leaves_converted_records_to_the_sdk(stream_class, schema, monkeypatch):
+    assert not synced_messages(stream_class, schema, monkeypatch)[2]
+
+
+@pytest.mark.parametrize("schema", [STRING_SCHEMA, TYPED_SCHEMA], ids=["strings", "typed"])
+@pytest.mark.parametrize("stream_class", [TermStream, VendorBillsStream])
+def test_transform_pool_matches_the_sdk_records(stream_class, schema, monkeypatch):
+    records, state, _ = synced_messages(stream_class, schema, monkeypatch, raw_passthrough=False)
+    pooled = synced_messages(
+        stream_class, schema, monkeypatch,
+        raw_passthrough=False, transform_pool_streams=[stream_class.name], transform_pool_workers=1,
+    )
+    assert pooled == (records, state, True)
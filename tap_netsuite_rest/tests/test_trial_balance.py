@@ -0,0 +1,104 @@
+"""Tests trial balance periods are re-aggregated by isolated workers."""
+
+import json
+import re
+import threading
+
+import pytest
+import requests
+
+from tap_netsuite_rest.client import RetryRequest
+from tap_netsuite_rest.streams import TrialBalanceReportStream
+from tap_netsuite_rest.tap import TapNetSuite
+
+SAMPLE_CONFIG = {
+    "ns_account": "123_SB1",
+    "ns_consumer_key": "key",
+    "ns_consumer_secret": "secret",
+    "ns_token_key": "token",
+    "ns_token_secret": "token_secret",
+    "start_date": "2024-01-01",
+    "trial_balance_workers": 3,
+}
+
+
+def response(status_code, body):
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp._content = json.dumps(body).encode()
+    return resp
+
+
+class FakeSession:
+    """Answer period queries from pages[period], one list entry per offset."""
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def prepare_request(self, request):
+        return request
+
+    def send(self, request, timeout=None):
+        period = re.search(r"postingperiod IN \('(\w+)'\)", request.json["q"]).group(1)
+        return self.pages[period][request.params["offset"]]
+
+    def close(self):
+        pass
+
+
+def page(period, offset, has_more):
+    return response(200, {"items": [{"posting_period": period, "offset": offset}], "hasMore": has_more})
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    stream = TrialBalanceReportStream(tap=TapNetSuite(config=SAMPLE_CONFIG))
+    stream.page_size = 1
+    stream._parent_window = ("2024-01-01 00:00:00", "2024-02-01 00:00:00")
+    monkeypatch.setattr(stream, "_touched_posting_periods", lambda since, until: ["1", "2", "3"])
+    main_thread = threading.current_thread()
+
+    def on_main_thread(method):
+        def wrapper(*args, **kwargs):
+            assert threading.current_thread() is main_thread
+            return method(*args, **kwargs)
+        return wrapper
+
+    for name in ("prepare_request", "prepare_request_payload", "validate_response", "make_request"):
+        monkeypatch.setattr(stream, name, on_main_thread(getattr(stream, name)))
+    return stream
+
+
+def items(pages):
+    return [(item["posting_period"], item["offset"]) for resp in pages for item in resp.json()["items"]]
+
+
+def test_periods_are_paged_in_order(stream, monkeypatch):
+    session = FakeSession({
+        "1": [page("1", 0, False)],
+        "2": [page("2", 0, True), page("2", 1, True), page("2", 2, False)],
+        "3": [page("3", 0, False)],
+    })
+    monkeypatch.setattr(stream, "get_session", lambda: session)
+    pages = list(stream._request_changed_transaction_pages(None))
+    assert items(pages) == [("1", 0), ("2", 0), ("2", 1), ("2", 2), ("3", 0)]
+
+
+def test_failed_period_is_validated_and_refetched_on_the_main_thread(stream, monkeypatch):
+    session = FakeSession({
+        "1": [page("1", 0, False)],
+        "2": [page("2", 0, True), response(400, {"o:errorDetails": [{"detail": "Invalid search query"}]})],
+        "3": [page("3", 0, False)],
+    })
+    monkeypatch.setattr(stream, "get_session", lambda: session)
+    validated = []
+
+    def validate_response(resp):
+        validated.append(resp.status_code)
+        raise RetryRequest(resp.text)
+
+    monkeypatch.setattr(stream, "validate_response", validate_response)
+    monkeypatch.setattr(stream, "_serial_period_pages", lambda period: [page(period, "serial", False)])
+    pages = list(stream._request_changed_transaction_pages(None))
+    assert validated == [400]
+    assert items(pages) == [("1", 0), ("2", "serial"), ("3", 0)]
@@ -0,0 +1,56 @@
+"""Tests single-pass type inference over sampled SuiteQL rows."""
+
+import pendulum
+from pendulum import parse
+
+from tap_netsuite_rest.type_inference import infer_types
+
+ITEMS = [
+    {
+        "id": "1", "trandate": "1/31/2024", "createddate": None, "duedate": "", "lastmodifieddate": "2024-01-02 03:04:05",
+        "custbody_date": "2024-01-05", "custrecord_date": "2024-01-05", "isinactive": "F", "posted": "T",
+        "memo": "F", "mandate": "not a date", "amount": "12.50", "quantity": "3", "code": "007", "links": [],
+    },
+    {
+        "id": "2", "trandate": "2/1/2024", "createddate": "2024-02-01", "duedate": "2024-03-01", "isinactive": "T",
+        "posted": None, "memo": "a note", "amount": "-1", "quantity": "4", "code": "12", "approved": False,
+    },
+    {"id": "3", "isinactive": "T", "memo": None, "amount": "1e3", "quantity": 5, "extra": "T"},
+]
+
+
+def baseline_types(items):
+    """The date and boolean inference as get_schema did it before infer_types."""
+    fields = set()
+    for item in items:
+        fields.update(set(item.keys()))
+    date_fields = []
+    for f in [f for f in fields if "date" in f and "custbody" not in f and "custrecord" not in f]:
+        match = [i for i in items if i.get(f)]
+        if len(match) > 0:
+            try:
+                try:
+                    parse(match[0][f])
+                except Exception:
+                    pendulum.from_format(match[0][f], "MM/DD/YYYY")
+                date_fields.append(f)
+            except Exception:
+                pass
+    bool_fields = [f for f in fields if len([i for i in items if i.get(f) in ["T", "F", None]]) == len(items)]
+    return fields, date_fields, bool_fields
+
+
+def test_without_numeric_inference_types_match_the_baseline():
+    fields, date_fields, bool_fields = baseline_types(ITEMS)
+    types = infer_types(ITEMS, infer_numeric=False)
+    assert set(types["fields"]) == fields
+    assert set(types["date_fields"]) == set(date_fields) == {"trandate", "createddate", "duedate", "lastmodifieddate"}
+    assert set(types["bool_fields"]) == set(bool_fields) == {"isinactive", "posted", "extra"}
+    assert types["integer_fields"] == types["float_fields"] == []
+
+
+def test_numeric_inference():
+    types = infer_types(ITEMS, infer_numeric=True, min_samples=3, exclude=["id"])
+    assert types["integer_fields"] == ["quantity"]
+    assert types["float_fields"] == ["amount"]
+    assert infer_types(ITEMS, infer_numeric=True, min_samples=4)["integer_fields"] == []
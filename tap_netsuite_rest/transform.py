@@ -0,0 +1,318 @@
+"""Record conversion helpers shared by streams and the transform process pool."""
+
+import json
+import logging
+import re
+from datetime import datetime
+from typing import Any, Iterable, List, Optional, Tuple
+
+import pendulum
+from pendulum import parse
+
+# the SDK goes first: it points singer's logging config at SDK classes, so a pool
+# worker importing singer first would import the SDK from half-initialized singer
+from hotglue_singer_sdk.helpers._catalog import pop_deselected_record_properties
+from hotglue_singer_sdk.helpers._typing import (
+    conform_record_data_types,
+    to_json_compatible,
+)
+from hotglue_singer_sdk.helpers._util import utc_now
+from singer import RecordMessage
+from singer import utils as singer_utils
+from singer.messages import format_message
+
+from tap_netsuite_rest import json_utils
+
+
+logger = logging.getLogger(__name__)
+
+
+def process_number(field, value, logger=logger):
+    return_value = value
+    # Attempt to cast to float only if the value is a string with decimals
+    if isinstance(value, str) and "." in value:
+        try:
+            return_value = float(value)
+        except ValueError:
+            logger.error(
+                f"Could not cast {field} : `{value}` to number"
+            )
+            raise Exception(ValueError)
+    # only parse if it's a string
+    elif isinstance(value, str):
+        # Attempt to cast to int if there are no decimals
+        try:
+            return_value = int(value)
+        except ValueError:
+            logger.error(f"Could not cast {field} : `{value}` to integer")
+            raise Exception(ValueError)
+    return return_value
+
+
+def parse_datetime_value(value):
+    """Parse a SuiteQL date-time string, keeping values already in ISO format."""
+    try:
+        # Attempt to parse string as date-time
+        # If successful, no need to cast
+        _ = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ")
+        return value
+    except ValueError:
+        # If parsing fails, consider it as a type mismatch and attempt to cast
+        try:
+            return parse(value)
+        except:
+            return pendulum.from_format(value, "MM/DD/YYYY")
+
+
+def process_types(row, schema, logger=logger): # noqa: C901
+    """Cast SuiteQL string values in row to the types declared in schema properties."""
+    for field, value in row.items():
+        if field not in schema:
+            # Skip fields not found in the schema
+            continue
+
+        field_info = schema[field]
+        field_type = field_info.get("type", ["null"])[0]
+        # Process nested properties
+        if "properties" in field_info:
+            row[field] = process_types(value, field_info["properties"], logger)
+        # Process nested properties
+        if "items" in field_info:
+            if isinstance(value, list):
+                row[field] = [
+                    process_types(v, field_info["items"].get("properties"), logger)
+                    for v in value
+                ]
+        field_format = field_info.get("format", None)
+        if field_type == "string" and field_format == "date-time":
+            # if it's already correctly a datetime, don't need to do anything
+            if isinstance(value, datetime):
+                row[field] = value
+                continue
+            row[field] = parse_datetime_value(value)
+        elif field_type == "boolean":
+            if not isinstance(value, bool):
+                # Attempt to cast to boolean
+                if value.lower() in ["true", "t"]:
+                    row[field] = True
+                elif value.lower() in ["false", "f"]:
+                    row[field] = False
+                else:
+                    # No need to raise an error, just continue with the loop
+                    continue
+
+        elif field_type == "number" or field_type == "integer":
+            if isinstance(value, str):
+                row[field] = process_number(field, value, logger)
+
+        elif field_type == "string":
+            if not isinstance(value, str):
+                # Attempt to cast to string
+                row[field] = str(value)
+        elif field_type == "array":
+            array_types = field_info.get("type", ["null"])
+            if isinstance(value, list):
+                continue
+            else:
+                for array_type in array_types:
+                    if array_type == "string":
+                        try:
+                            # Attempt to cast to JSON
+                            parsed_value = json.loads(value)
+                            if isinstance(parsed_value, list):
+                                row[field] = parsed_value
+                            else:
+                                # We only want valid lists
+                                raise ValueError
+                        except (ValueError, json.JSONDecodeError, TypeError):
+                            if not isinstance(value, str):
+                                # Attempt to cast to string
+                                row[field] = str(value)
+                    if array_type == "number" or array_type == "integer":
+                        row[field] = process_number(field, value, logger)
+
+        else:
+            # Unsupported type
+            # No need to raise an error, just continue with the loop
+            continue
+    return row
+
+
+def collapse_address_fields(row):
+    """Collapse the duplicate separators left behind by empty address parts."""
+    if row.get("shippingaddress"):
+        row["shippingaddress"] = re.sub(r'(, )+', ', ', row["shippingaddress"]).strip(', ')
+        if row["shippingaddress"] == "":
+            row.pop("shippingaddress")
+    if row.get("billingaddress"):
+        row["billingaddress"] = re.sub(r'(, )+', ', ', row["billingaddress"]).strip(', ')
+        if row["billingaddress"] == "":
+            row.pop("billingaddress")
+    return row
+
+
+def record_primary_key(row, primary_keys):
+    """Return the dedup key used by request_records for a post-processed row."""
+    if not primary_keys:
+        return None
+    if len(primary_keys) == 1:
+        return row[primary_keys[0]]
+    return "-".join([str(row[key]) for key in primary_keys])
+
+
+class RecordPlan:
+    """Compiled shortcut for streams whose rows need (almost) no conversion.
+
+    A row is reduced to its selected fields and only the listed date-time fields
+    are normalized, which matches what process_types and the SDK would produce.
+    """
+
+    def __init__(self, fields, date_fields=(), string_fields=()) -> None:
+        self.fields = frozenset(fields)
+        self.date_fields = tuple(date_fields)
+        self.string_fields = tuple(string_fields)
+
+    def apply(self, item):
+        record = {key: value for key, value in item.items() if key in self.fields}
+        for field in self.string_fields:
+            value = record.get(field, "")
+            if not isinstance(value, str):
+                record[field] = str(value)
+        for field in self.date_fields:
+            if field in record:
+                record[field] = to_json_compatible(parse_datetime_value(record[field]))
+        return record
+
+
+def compile_record_plan(schema, mask, steps) -> Optional[RecordPlan]:  # noqa: C901
+    """Return a RecordPlan if rows only need field selection and date patching.
+
+    Returns None as soon as a selected property needs a real conversion
+    (booleans, numbers, nested objects or arrays) or a row-level step is required.
+    """
+    if TransformSpec.ADDRESSES in steps:
+        return None
+    typed = TransformSpec.TYPES in steps
+    fields, date_fields, string_fields = [], [], []
+    for name, info in schema["properties"].items():
+        if not mask[("properties", name)]:
+            continue
+        types = info.get("type", ["null"])
+        if isinstance(types, str):
+            types = [types]
+        if "anyOf" in info or "properties" in info or "items" in info or "boolean" in types:
+            return None
+        fields.append(name)
+        if not typed:
+            continue
+        if types[0] == "string":
+            if info.get("format") == "date-time":
+                date_fields.append(name)
+            else:
+                string_fields.append(name)
+        elif types[0] != "null":
+            return None
+    return RecordPlan(fields, date_fields, string_fields)
+
+
+class TransformSpec:
+    """Picklable description of how a stream converts and serializes its records.
+
+    Built by the stream in the main process and handed once to each worker
+    process, which has no access to the tap or the stream object.
+    """
+
+    # post_process steps a worker knows how to replay without the stream
+    TYPES = "types"
+    ADDRESSES = "addresses"
+
+    def __init__(
+        self,
+        stream_name: str,
+        stream_alias: str,
+        schema: dict,
+        mask: dict,
+        steps: Tuple[str, ...],
+        primary_keys: Optional[List[str]],
+        replication_key: Optional[str],
+        records_key: str = "items",
+        plan: Optional[RecordPlan] = None,
+    ) -> None:
+        self.stream_name = stream_name
+        self.stream_alias = stream_alias
+        self.schema = schema
+        self.mask = mask
+        self.steps = steps
+        self.primary_keys = primary_keys
+        self.replication_key = replication_key
+        self.records_key = records_key
+        self.plan = plan
+
+    def post_process(self, row):
+        if self.TYPES in self.steps:
+            row = process_types(row, self.schema["properties"])
+        if self.ADDRESSES in self.steps:
+            row = collapse_address_fields(row)
+        return row
+
+    def serialize(self, row) -> Tuple[Any, Any, str]:
+        """Return (primary key, bookmark value, Singer RECORD line) for a raw row."""
+        row = self.post_process(row)
+        pk = record_primary_key(row, self.primary_keys)
+        bookmark = None
+        if self.replication_key:
+            bookmark = to_json_compatible(row.get(self.replication_key))
+        pop_deselected_record_properties(row, self.schema, self.mask, logger)
+        record = conform_record_data_types(
+            stream_name=self.stream_name,
+            row=row,
+            schema=self.schema,
+            logger=logger,
+        )
+        message = RecordMessage(
+            stream=self.stream_alias,
+            record=record,
+            version=None,
+            time_extracted=utc_now(),
+        )
+        return pk, bookmark, format_message(message)
+
+    def passthrough(self, items: Iterable[dict]) -> List[Tuple[Any, Any, str]]:
+        """Serialize a page with the compiled plan, sharing one RECORD envelope."""
+        time_extracted = singer_utils.strftime(utc_now())
+        prefix = '{"type": "RECORD", "stream": %s, "record": ' % json.dumps(self.stream_alias)
+        suffix = ', "time_extracted": "%s"}' % time_extracted
+        rows = []
+        for item in items:
+            record = self.plan.apply(item)
+            pk = record_primary_key(record, self.primary_keys)
+            bookmark = record.get(self.replication_key) if self.replication_key else None
+            rows.append((pk, bookmark, prefix + json.dumps(record) + suffix))
+        return rows
+
+    def serialize_page(self, items: Iterable[dict]) -> List[Tuple[Any, Any, str]]:
+        if self.plan is not None:
+            return self.passthrough(items)
+        return [self.serialize(item) for item in items]
+
+
+# the spec of the stream a pool worker converts pages for, set once by init_worker
+_worker_spec: Optional[TransformSpec] = None
+
+
+def init_worker(json_backend: str, spec: Optional[TransformSpec] = None) -> None:
+    """Set up a spawned pool worker, which starts without the tap's settings."""
+    global _worker_spec
+    json_utils.set_backend(json_backend)
+    _worker_spec = spec
+
+
+def transform_page(content: bytes, spec: Optional[TransformSpec] = None) -> List[Tuple[Any, Any, str]]:
+    """Decode a raw SuiteQL page and serialize every item to a RECORD line.
+
+    Runs inside a worker process with the spec given to init_worker, or inline
+    with an explicit spec; the result keeps the order of the page items.
+    """
+    spec = spec or _worker_spec
+    items: Iterable[dict] = json_utils.loads(content).get(spec.records_key) or []
+    return spec.serialize_page(items)
@@ -0,0 +1,122 @@
+"""Single-pass type inference over rows sampled from a SuiteQL table."""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+import pendulum
+from pendulum import parse
+
+
+BOOL_VALUES = ("T", "F")
+# no leading zeros, those values are codes and must stay strings
+INTEGER_RE = re.compile(r"^-?(0|[1-9]\d*)$")
+NUMBER_RE = re.compile(r"^-?((0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?|\.\d+)$")
+
+
+def is_date(value: Any) -> bool:
+    try:
+        try:
+            parse(value)
+        except Exception:
+            pendulum.from_format(value, "MM/DD/YYYY")
+        return True
+    except Exception:
+        return False
+
+
+class FieldStats:
+    """Counts accumulated for one field while walking the sample."""
+
+    __slots__ = ("name", "values", "non_bool", "integers", "numbers", "first_value")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.values = 0
+        self.non_bool = 0
+        self.integers = 0
+        self.numbers = 0
+        self.first_value = None
+
+    def add(self, value: Any) -> None:
+        if value is None:
+            return
+        self.values += 1
+        if value not in BOOL_VALUES:
+            self.non_bool += 1
+        if self.first_value is None and value:
+            self.first_value = value
+        if isinstance(value, bool):
+            return
+        if isinstance(value, int):
+            self.integers += 1
+            self.numbers += 1
+        elif isinstance(value, float):
+            self.numbers += 1
+        elif isinstance(value, str):
+            if INTEGER_RE.match(value):
+                self.integers += 1
+                self.numbers += 1
+            elif NUMBER_RE.match(value):
+                self.numbers += 1
+
+
+def collect_stats(items: Iterable[dict]) -> Dict[str, FieldStats]:
+    """Walk the sample once and return per-field statistics."""
+    stats: Dict[str, FieldStats] = {}
+    for item in items:
+        for name, value in item.items():
+            field = stats.get(name)
+            if field is None:
+                field = stats[name] = FieldStats(name)
+            field.add(value)
+    return stats
+
+
+def infer_types(
+    items: List[dict],
+    infer_numeric: bool = False,
+    min_samples: int = 5,
+    confidence: float = 1.0,
+    exclude: Optional[Iterable[str]] = None,
+) -> dict:
+    """Infer field names and types from sampled rows.
+
+    A field is a date field when its name contains "date" (custom body and
+    record fields excluded) and its first non-empty value parses as a date, and a
+    boolean field when every value is T, F or null. With infer_numeric, fields
+    with at least min_samples values of which a `confidence` share are integers
+    (or numbers) are typed as such; fields in `exclude` (keys) stay strings.
+    """
+    stats = collect_stats(items)
+    fields = sorted(stats)
+
+    date_fields = [
+        name
+        for name in fields
+        if "date" in name
+        and "custbody" not in name
+        and "custrecord" not in name
+        and stats[name].first_value is not None
+        and is_date(stats[name].first_value)
+    ]
+    bool_fields = [name for name in fields if stats[name].non_bool == 0]
+
+    integer_fields, float_fields = [], []
+    if infer_numeric:
+        skip = set(date_fields) | set(bool_fields) | set(exclude or [])
+        for name in fields:
+            field = stats[name]
+            if name in skip or field.values < min_samples:
+                continue
+            if field.integers / field.values >= confidence:
+                integer_fields.append(name)
+            elif field.numbers / field.values >= confidence:
+                float_fields.append(name)
+
+    return {
+        "fields": fields,
+        "date_fields": date_fields,
+        "bool_fields": bool_fields,
+        "integer_fields": integer_fields,
+        "float_fields": float_fields,
+    }
@@ -0,0 +1,179 @@
+"""Buffered background writer for Singer messages."""
+
+import copy
+import logging
+import queue
+import sys
+import threading
+import time
+from typing import Any, Optional, Union
+
+from singer.messages import Message, StateMessage, format_message
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class _Flush:
+    """Queue marker: write out everything queued before it, then set done."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+def serialize_message(message: Message) -> str:
+    """Serialize a Singer message, with orjson when it can encode the payload."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(message.asdict()).decode()
+        except TypeError:
+            # Decimals, big ints or non-str keys: keep singer's exact encoding
+            pass
+    return format_message(message)
+
+
+class SingerWriter:
+    """Serialize and write Singer messages from a dedicated thread.
+
+    Messages are handed over on a bounded queue, serialized in the writer thread
+    and written to stdout in large chunks. STATE messages are coalesced: only the
+    latest one is written, after every record queued before it, on each flush.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 10000,
+        flush_bytes: int = 1024 * 1024,
+        flush_interval: float = 1.0,
+        output=None,
+    ) -> None:
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.output = output or sys.stdout
+        self.timings = {
+            "producer_blocked": 0.0,
+            "serialize": 0.0,
+            "write": 0.0,
+        }
+        self.counts = {"messages": 0, "states_written": 0, "states_coalesced": 0}
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="singer-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message: Union[Message, str]) -> None:
+        """Queue a Singer message or an already serialized message line."""
+        if self._closed:
+            raise RuntimeError("Singer writer is closed")
+        if isinstance(message, StateMessage):
+            # the tap keeps mutating its state dict after emitting it
+            message = StateMessage(value=copy.deepcopy(message.value))
+        self._put(message)
+
+    def _put(self, item: Any) -> None:
+        started = time.perf_counter()
+        while True:
+            self._raise_writer_error()
+            try:
+                self._queue.put(item, timeout=1)
+                break
+            except queue.Full:
+                continue
+        self.timings["producer_blocked"] += time.perf_counter() - started
+
+    def _raise_writer_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("Singer writer thread failed") from self._error
+
+    def _run(self) -> None:
+        buffer, size = [], 0
+        pending_state = None
+        last_flush = time.monotonic()
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    item = None
+
+                flush = isinstance(item, _Flush)
+                if item is not None and item is not _STOP and not flush:
+                    self.counts["messages"] += 1
+                    if isinstance(item, StateMessage):
+                        if pending_state is not None:
+                            self.counts["states_coalesced"] += 1
+                        pending_state = item
+                    else:
+                        started = time.perf_counter()
+                        line = item if isinstance(item, str) else serialize_message(item)
+                        self.timings["serialize"] += time.perf_counter() - started
+                        buffer.append(line)
+                        size += len(line) + 1
+
+                due = time.monotonic() - last_flush >= self.flush_interval
+                if item is None or item is _STOP or flush or size >= self.flush_bytes or due:
+                    if pending_state is not None:
+                        buffer.append(serialize_message(pending_state))
+                        self.counts["states_written"] += 1
+                        pending_state = None
+                    self._flush(buffer)
+                    buffer, size = [], 0
+                    last_flush = time.monotonic()
+                if flush:
+                    item.done.set()
+                if item is _STOP:
+                    return
+        except BaseException as e:
+            self._error = e
+            logger.exception("Singer writer thread failed")
+
+    def _flush(self, lines) -> None:
+        if not lines:
+            return
+        started = time.perf_counter()
+        self.output.write("\n".join(lines) + "\n")
+        self.output.flush()
+        self.timings["write"] += time.perf_counter() - started
+
+    def flush(self) -> None:
+        """Block until every message queued so far, the latest STATE included, is written."""
+        if self._closed or not self._thread.is_alive():
+            self._raise_writer_error()
+            return
+        marker = _Flush()
+        self._put(marker)
+        while not marker.done.wait(timeout=1):
+            self._raise_writer_error()
+            if not self._thread.is_alive():
+                raise RuntimeError("Singer writer thread stopped before flushing")
+
+    def close(self) -> None:
+        """Write everything still queued and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            self._put(_STOP)
+            self._thread.join()
+        self.log_timings()
+        self._raise_writer_error()
+
+    def log_timings(self) -> None:
+        logger.info(
+            "Output stage: %s messages, %s STATE written (%s coalesced), "
+            "serialize %.2fs, write %.2fs, tap blocked on output %.2fs",
+            self.counts["messages"],
+            self.counts["states_written"],
+            self.counts["states_coalesced"],
+            self.timings["serialize"],
+            self.timings["write"],
+            self.timings["producer_blocked"],
+        )